@@ -0,0 +1,124 @@
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+import numpy as np
+
+from config import AGGREGATION_CONFIDENCE_PRIOR, AGGREGATION_WEIGHTING
+from data.models import SentimentRecord, TextSentiment, sentiment_label
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+WEIGHTINGS: Final[tuple[str, ...]] = ("log", "linear", "none")
+
+
+def engagement_by_text(posts: Any) -> Dict[str, float]:
+    """Map every post and comment ``id`` of an LLM input batch to its upvote score."""
+    scores: Dict[str, float] = {}
+    if not isinstance(posts, list):
+        return scores
+    for post in posts:
+        if not isinstance(post, dict):
+            continue
+        if post.get("id"):
+            scores[str(post["id"])] = float(post.get("score") or 0)
+        for comment in post.get("comments") or []:
+            if isinstance(comment, dict) and comment.get("id"):
+                scores[str(comment["id"])] = float(comment.get("score") or 0)
+    return scores
+
+
+def posts_by_text(posts: Any) -> Dict[str, Tuple[str, Optional[float]]]:
+    """Map every post and comment ``id`` of an LLM input batch to ``(post id, post created_utc)``."""
+    owners: Dict[str, Tuple[str, Optional[float]]] = {}
+    if not isinstance(posts, list):
+        return owners
+    for post in posts:
+        if not isinstance(post, dict) or not post.get("id"):
+            continue
+        created = post.get("created_utc")
+        owner = (str(post["id"]), float(created) if isinstance(created, (int, float)) else None)
+        owners[owner[0]] = owner
+        for comment in post.get("comments") or []:
+            if isinstance(comment, dict) and comment.get("id"):
+                owners[str(comment["id"])] = owner
+    return owners
+
+
+def engagement_weights(upvotes: np.ndarray, weighting: str = AGGREGATION_WEIGHTING) -> np.ndarray:
+    """Turn upvote scores into weights (>= 1; downvoted texts count as 0 upvotes)."""
+    upvotes = np.maximum(upvotes, 0.0)
+    if weighting == "log":
+        return 1.0 + np.log1p(upvotes)
+    if weighting == "linear":
+        return 1.0 + upvotes
+    if weighting == "none":
+        return np.ones_like(upvotes)
+    raise ValueError(f"Invalid AGGREGATION_WEIGHTING: {weighting}. Available options: {list(WEIGHTINGS)}")
+
+
+def aggregate_text_sentiments(
+    items: List[TextSentiment],
+    engagement: Dict[str, float],
+    weighting: str = AGGREGATION_WEIGHTING,
+    confidence_prior: float = AGGREGATION_CONFIDENCE_PRIOR,
+) -> List[SentimentRecord]:
+    """Combine per-text sentiments into one :class:`SentimentRecord` per symbol.
+
+    Each text is weighted by ``engagement_weights(upvotes) × confidence``:
+
+    * ``sentiment_score``: weighted mean sentiment.
+    * ``sentiment_confidence``: engagement-weighted mean confidence, scaled
+      by agreement (1 - weighted std of the sentiments) and by volume
+      ``n / (n + confidence_prior)``.
+    * source text, snippet and rationale come from the strongest driver,
+      the text with the largest ``weight × |sentiment|``.
+
+    Texts whose ID is not in *engagement* (e.g. mistyped by the LLM) count
+    as 0 upvotes.
+    """
+    if not items:
+        return []
+
+    symbols, idx = np.unique([item.symbol.strip().upper() for item in items], return_inverse=True)
+    sentiment = np.fromiter((item.sentiment_score for item in items), np.float64, len(items))
+    confidence = np.fromiter((item.sentiment_confidence for item in items), np.float64, len(items))
+    upvotes = np.fromiter((engagement.get(item.text_id, 0.0) for item in items), np.float64, len(items))
+    unknown = sum(item.text_id not in engagement for item in items)
+    if unknown:
+        log.debug(f"{unknown} per-text result(s) reference IDs missing from the input; weighted as 0 upvotes.")
+
+    eng = engagement_weights(upvotes, weighting)
+    weight = eng * np.maximum(confidence, 0.01)  # 0-confidence texts still count, barely
+    n_symbols = len(symbols)
+
+    def _sum(values: np.ndarray) -> np.ndarray:
+        return np.bincount(idx, values, minlength=n_symbols)
+
+    weight_sum = _sum(weight)
+    score = _sum(weight * sentiment) / weight_sum
+    spread = np.sqrt(_sum(weight * (sentiment - score[idx]) ** 2) / weight_sum)
+    mean_conf = _sum(eng * confidence) / _sum(eng)
+    counts = np.bincount(idx, minlength=n_symbols)
+    upvote_totals = _sum(np.maximum(upvotes, 0.0))
+    conf = mean_conf * (1.0 - np.minimum(spread, 1.0)) * counts / (counts + confidence_prior)
+
+    # Strongest driver per symbol: first row of each group ordered by strength.
+    order = np.lexsort((-(weight * np.abs(sentiment)), idx))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = idx[order][1:] != idx[order][:-1]
+    drivers = order[first]
+
+    records: List[SentimentRecord] = []
+    for k, symbol in enumerate(symbols.tolist()):
+        driver = items[drivers[k]]
+        summary = f"{counts[k]} text(s), {int(upvote_totals[k])} upvotes"
+        records.append(SentimentRecord(
+            symbol=symbol,
+            sentiment_score=round(float(np.clip(score[k], -1.0, 1.0)), 4),
+            sentiment_confidence=round(float(np.clip(conf[k], 0.0, 1.0)), 4),
+            sentiment_label=sentiment_label(float(score[k])),
+            key_rationale=f"{driver.rationale} ({summary})" if driver.rationale else summary,
+            source_text_id=driver.text_id,
+            source_text_snippet=driver.snippet,
+        ))
+    return records
@@ -4,7 +4,9 @@ import re
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 
-from data.models import SentimentRecord
+from data.models import SentimentRecord, TextSentiment
+from data.ticker_universe import get_ticker_universe
+from LLM.aggregation import aggregate_text_sentiments, engagement_by_text
 from utils.logger import get_logger
 from utils.rate_limiter import RateLimiter
 from config import PROMPT_FILE
@@ -87,6 +89,63 @@ def validate_stock_sentiment_json(data: Any) -> List[SentimentRecord]:
     return records
 
 
+def is_text_level_output(data: Any) -> bool:
+    """True if *data* holds per-text results (``text_id`` keys) rather than per-symbol records."""
+    items = [data] if isinstance(data, dict) else data
+    return isinstance(items, list) and any(
+        isinstance(item, dict) and "text_id" in item for item in items
+    )
+
+
+def validate_text_sentiment_json(data: Any) -> List[TextSentiment]:
+    """Validates per-text LLM output into :class:`~data.models.TextSentiment` objects.
+
+    Items that are not dicts or fail coercion are dropped with a warning.
+    """
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list):
+        log.warning(f"Expected list of objects, got {type(data)}")
+        return []
+
+    items: List[TextSentiment] = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        try:
+            items.append(TextSentiment.from_dict(item))
+        except (KeyError, ValueError, TypeError) as exc:
+            log.warning(f"Dropping item that failed TextSentiment coercion: {exc} — {item}")
+    return items
+
+
+def records_from_llm_output(data: Any, input_text: Optional[str] = None) -> List[SentimentRecord]:
+    """Turn decoded LLM output into per-symbol :class:`~data.models.SentimentRecord` objects.
+
+    Per-text output is aggregated locally, weighted by the upvote scores
+    found in *input_text* (the JSON batch that was sent to the LLM).
+    Per-symbol output from older prompts is validated as is. Symbols are
+    normalised against the ticker universe (if configured) first, so
+    aliases such as "$AAPL" and "Apple" aggregate together and unknown
+    symbols never reach the database.
+    """
+    universe = get_ticker_universe()
+    if not is_text_level_output(data):
+        records = validate_stock_sentiment_json(data)
+        return universe.filter(records) if universe else records
+
+    items = validate_text_sentiment_json(data)
+    if universe:
+        items = universe.filter(items)
+    engagement: Dict[str, float] = {}
+    if input_text:
+        try:
+            engagement = engagement_by_text(json.loads(input_text))
+        except json.JSONDecodeError:
+            log.warning("LLM input is not JSON; aggregating without engagement weights.")
+    return aggregate_text_sentiments(items, engagement)
+
+
 # ---------------------------------------------------------------------------
 # Abstract base class
 # ---------------------------------------------------------------------------
@@ -147,7 +206,7 @@ class BaseLLM(ABC):
     # ------------------------------------------------------------------
 
     async def get_response(self, input_text: str) -> Optional[List[SentimentRecord]]:
-        """Orchestrate a full request: rate-limit → call → parse → validate → coerce.
+        """Orchestrate a full request: rate-limit → call → parse → validate → aggregate.
 
         Returns:
             A validated list of :class:`~data.models.SentimentRecord` objects,
@@ -179,7 +238,7 @@ class BaseLLM(ABC):
                 clean_str = content_str.strip()
                 
             data = json.loads(clean_str)
-            records = validate_stock_sentiment_json(data)
+            records = records_from_llm_output(data, input_text)
 
             log.info(f"Produced {len(records)} SentimentRecord(s) from {self.provider_name}.")
             return records
@@ -0,0 +1,171 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Final, List, Optional, Sequence, Tuple
+
+import numpy as np
+import psycopg
+
+from analytics.db import asset_ids_by_ticker, copy_upsert
+from analytics.prices import PriceStore, get_price_fetcher
+from analytics.rolling import load_frame
+from config import (
+    CORRELATION_LAGS,
+    CORRELATION_MIN_OBS,
+    POSTGRES_DSN,
+    PRICE_FETCHER,
+    PRICE_HISTORY_DAYS,
+    PRICE_STORE_DIR,
+)
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+TABLE_PRICES: Final[str] = "asset_prices"
+TABLE_CORRELATIONS: Final[str] = "sentiment_price_correlations"
+
+_PRICE_COLUMNS: Final[tuple[str, ...]] = ("asset_id", "date", "open", "high", "low", "close", "volume")
+_CORRELATION_COLUMNS: Final[tuple[str, ...]] = (
+    "asset_id", "lag_days", "correlation", "n_obs", "window_days",
+)
+
+
+# ---------------------------------------------------------------------------
+# Vectorised statistics (every asset at once, along the day axis)
+# ---------------------------------------------------------------------------
+
+def daily_log_returns(closes: np.ndarray) -> np.ndarray:
+    """Log return of each bar against the previous bar of the same row.
+
+    *closes* is an ``(n, days)`` calendar-day grid with NaN on days without
+    a bar; the result is NaN on those days too, so a Monday's return spans
+    the weekend.
+    """
+    have = np.isfinite(closes)
+    last = np.where(have, np.arange(closes.shape[1]), -1)
+    np.maximum.accumulate(last, axis=1, out=last)
+    prev_idx = np.concatenate([np.full((closes.shape[0], 1), -1), last[:, :-1]], axis=1)
+    prev = np.take_along_axis(closes, np.maximum(prev_idx, 0), axis=1)
+
+    returns = np.full(closes.shape, np.nan)
+    valid = have & (prev_idx >= 0)
+    np.log(closes / prev, out=returns, where=valid)
+    return returns
+
+
+def lagged_correlations(
+    sentiment: np.ndarray,
+    returns: np.ndarray,
+    lags: Sequence[int] = CORRELATION_LAGS,
+    min_obs: int = CORRELATION_MIN_OBS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pearson correlation of ``sentiment[t]`` with ``returns[t + lag]`` per row.
+
+    Only days where both values are finite count. Returns
+    ``(correlations, n_obs)``, each ``(n, len(lags))``; correlations are
+    NaN with fewer than *min_obs* pairs or a constant series.
+    """
+    n, days = sentiment.shape
+    corr = np.full((n, len(lags)), np.nan)
+    n_obs = np.zeros((n, len(lags)), dtype=np.int64)
+
+    for k, lag in enumerate(lags):
+        if lag >= days:
+            continue
+        s = sentiment[:, : days - lag]
+        r = returns[:, lag:]
+        mask = np.isfinite(s) & np.isfinite(r)
+        count = mask.sum(axis=1)
+        s = np.where(mask, s, 0.0)
+        r = np.where(mask, r, 0.0)
+
+        safe = np.maximum(count, 1)
+        ds = np.where(mask, s - (s.sum(axis=1) / safe)[:, None], 0.0)
+        dr = np.where(mask, r - (r.sum(axis=1) / safe)[:, None], 0.0)
+        cov = (ds * dr).sum(axis=1)
+        den = np.sqrt((ds ** 2).sum(axis=1) * (dr ** 2).sum(axis=1))
+
+        ok = (count >= min_obs) & (den > 0)
+        np.divide(cov, den, out=corr[:, k], where=ok)
+        n_obs[:, k] = count
+    return corr, n_obs
+
+
+# ---------------------------------------------------------------------------
+# Job
+# ---------------------------------------------------------------------------
+
+def _price_rows(store: PriceStore, asset_ids: Dict[str, int], start: date):
+    for ticker, asset_id in asset_ids.items():
+        bars = store.load(ticker)
+        bars = bars[bars["date"] >= np.datetime64(start, "D")]
+        for bar in bars.tolist():
+            yield (asset_id, *bar)
+
+
+def _daily_sentiment(conn, tickers: List[str], asset_ids: Dict[str, int], start: date, end: date):
+    """``(len(tickers), days)`` confidence-weighted daily sentiment, NaN on days without mentions."""
+    since = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+    until = datetime(end.year, end.month, end.day, tzinfo=timezone.utc)
+    frame = load_frame(conn, since, until, "day", tickers)
+
+    sentiment = np.full((len(tickers), frame.counts.shape[1]), np.nan)
+    row_of = {int(a): i for i, a in enumerate(frame.asset_ids.tolist())}
+    for i, ticker in enumerate(tickers):
+        j = row_of.get(asset_ids[ticker])
+        if j is not None:
+            np.divide(
+                frame.weighted_sum[j], frame.weight_sum[j],
+                out=sentiment[i], where=frame.weight_sum[j] != 0,
+            )
+    return sentiment
+
+
+def refresh_price_correlations(
+    dsn: str = POSTGRES_DSN,
+    tickers: Optional[List[str]] = None,
+    days: int = PRICE_HISTORY_DAYS,
+    lags: Sequence[int] = CORRELATION_LAGS,
+    fetcher_name: str = PRICE_FETCHER,
+    store_dir: str = PRICE_STORE_DIR,
+) -> int:
+    """Sync the local price store, publish it and recompute sentiment/price correlations.
+
+    Only date ranges missing from the store are fetched. Prices for the
+    last *days* are upserted into ``asset_prices`` so the dashboard reads
+    them from the database, and one correlation per asset and lag is
+    written to ``sentiment_price_correlations``. Returns the number of
+    assets with at least one correlation.
+    """
+    end = datetime.now(timezone.utc).date()
+    start = end - timedelta(days=days)
+    store = PriceStore(store_dir)
+    fetcher = get_price_fetcher(fetcher_name)
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        asset_ids = asset_ids_by_ticker(conn, tickers)
+        if not asset_ids:
+            log.warning("No assets to sync prices for.")
+            return 0
+        names = sorted(asset_ids)
+        store.update_many(names, fetcher, start, end)
+
+        written = copy_upsert(conn, TABLE_PRICES, _PRICE_COLUMNS, ("asset_id", "date"),
+                              _price_rows(store, asset_ids, start))
+        log.info(f"Wrote {written} rows to '{TABLE_PRICES}'.")
+
+        _, closes = store.close_matrix(names, start, end)
+        returns = daily_log_returns(closes)
+        sentiment = _daily_sentiment(conn, names, asset_ids, start, end)
+        corr, n_obs = lagged_correlations(sentiment, returns, lags)
+
+        rows = [
+            (asset_ids[t], lag, None if np.isnan(corr[i, k]) else round(float(corr[i, k]), 6),
+             int(n_obs[i, k]), days)
+            for i, t in enumerate(names)
+            for k, lag in enumerate(lags)
+        ]
+        copy_upsert(conn, TABLE_CORRELATIONS, _CORRELATION_COLUMNS, ("asset_id", "lag_days"),
+                    rows, touch_column="computed_at")
+
+    correlated = int(np.isfinite(corr).any(axis=1).sum())
+    log.info(f"Correlations computed for {correlated}/{len(names)} assets (lags {list(lags)}).")
+    return correlated
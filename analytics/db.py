@@ -0,0 +1,46 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def asset_ids_by_ticker(conn: Any, tickers: Optional[List[str]] = None) -> Dict[str, int]:
+    """Return ``ticker → asset_id`` for *tickers* (None = every asset)."""
+    rows = conn.execute(
+        "SELECT ticker, asset_id FROM assets "
+        "WHERE %(tickers)s::text[] IS NULL OR ticker = ANY(%(tickers)s::text[])",
+        {"tickers": tickers},
+    ).fetchall()
+    return dict(rows)
+
+
+def copy_upsert(
+    conn: Any,
+    table: str,
+    columns: Sequence[str],
+    key_columns: Sequence[str],
+    rows: Iterable[Tuple[Any, ...]],
+    touch_column: Optional[str] = None,
+) -> int:
+    """Bulk-upsert *rows* into *table* via ``COPY`` into a temp staging table.
+
+    One transaction: the rows are streamed into a copy of *table*, then
+    merged with ``INSERT … ON CONFLICT (key_columns) DO UPDATE``. If
+    *touch_column* is given it is set to ``now()`` on updated rows.
+    Returns the number of rows written.
+    """
+    stage = f"{table}_stage"
+    cols = ", ".join(columns)
+    updates = [f"{c} = EXCLUDED.{c}" for c in columns if c not in key_columns]
+    if touch_column:
+        updates.append(f"{touch_column} = now()")
+
+    written = 0
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        with cur.copy(f"COPY {stage} ({cols}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                written += 1
+        cur.execute(
+            f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} "
+            f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {', '.join(updates)}"
+        )
+    return written
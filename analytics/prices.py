@@ -0,0 +1,237 @@
+import json
+import os
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Final, Iterable, List, Tuple
+
+import numpy as np
+
+from config import PRICE_FETCHER, PRICE_REFETCH_DAYS, PRICE_STORE_DIR, PRICE_SYMBOL_OVERRIDES
+from utils.logger import get_logger
+
+try:
+    import yfinance
+except ImportError:  # Only required for PRICE_FETCHER = "yahoo"
+    yfinance = None
+
+log = get_logger(__name__)
+
+PRICE_DTYPE: Final[np.dtype] = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+
+# ---------------------------------------------------------------------------
+# Fetchers
+# ---------------------------------------------------------------------------
+
+class PriceFetcher(ABC):
+    """Source of daily OHLCV bars."""
+
+    @abstractmethod
+    def fetch(self, symbol: str, start: date, end: date) -> np.ndarray:
+        """Return the bars for *symbol* between *start* and *end* (inclusive) as :data:`PRICE_DTYPE`."""
+
+
+class YahooFetcher(PriceFetcher):
+    """Daily bars from Yahoo Finance via ``yfinance``."""
+
+    def __init__(self) -> None:
+        if yfinance is None:
+            raise ImportError("PRICE_FETCHER 'yahoo' requires the 'yfinance' package.")
+
+    def fetch(self, symbol: str, start: date, end: date) -> np.ndarray:
+        history = yfinance.Ticker(symbol).history(
+            start=start.isoformat(),
+            end=(end + timedelta(days=1)).isoformat(),
+            interval="1d",
+            auto_adjust=False,
+        )
+        bars = np.zeros(len(history), dtype=PRICE_DTYPE)
+        if len(history):
+            bars["date"] = history.index.tz_localize(None).values.astype("datetime64[D]")
+            for field in ("open", "high", "low", "close", "volume"):
+                bars[field] = history[field.capitalize()].to_numpy(dtype=np.float64)
+        return bars
+
+
+class StubFetcher(PriceFetcher):
+    """Deterministic synthetic business-day prices, for offline development and tests.
+
+    Each symbol follows its own seeded random walk from a fixed epoch, so
+    any date range always yields the same bars.
+    """
+
+    EPOCH: Final[np.datetime64] = np.datetime64("2000-01-03", "D")
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, date, date]] = []
+
+    def fetch(self, symbol: str, start: date, end: date) -> np.ndarray:
+        self.calls.append((symbol, start, end))
+        days = np.arange(self.EPOCH, np.datetime64(end, "D") + 1, dtype="datetime64[D]")
+        days = days[np.is_busday(days)]
+        rng = np.random.default_rng(zlib.crc32(symbol.encode("utf-8")))
+        close = 100.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(days))))
+        spread = np.abs(rng.normal(0, 0.01, len(days))) * close
+        volume = rng.integers(1_000_000, 10_000_000, len(days)).astype(np.float64)
+
+        keep = days >= np.datetime64(start, "D")
+        bars = np.zeros(int(keep.sum()), dtype=PRICE_DTYPE)
+        bars["date"] = days[keep]
+        bars["close"] = close[keep]
+        bars["open"] = (close - spread / 2)[keep]
+        bars["high"] = (close + spread)[keep]
+        bars["low"] = (close - spread)[keep]
+        bars["volume"] = volume[keep]
+        return bars
+
+
+FETCHERS: Final[Dict[str, type]] = {"yahoo": YahooFetcher, "stub": StubFetcher}
+
+
+def get_price_fetcher(name: str = PRICE_FETCHER) -> PriceFetcher:
+    if name not in FETCHERS:
+        raise ValueError(f"Invalid PRICE_FETCHER: {name}. Available options: {list(FETCHERS)}")
+    return FETCHERS[name]()
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+Interval = Tuple[date, date]
+
+
+def _merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort inclusive date intervals and merge the overlapping or adjacent ones."""
+    merged: List[Interval] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+class PriceStore:
+    """Local daily OHLCV history, one memory-mappable ``.npy`` file per ticker.
+
+    ``coverage.json`` records the date intervals already requested per
+    ticker (not just the dates returned, so weekends, holidays and
+    pre-listing days are never asked for twice); :meth:`update` fetches
+    only the gaps. The last :data:`~config.PRICE_REFETCH_DAYS` days are
+    never marked covered, so today's partial bar and late revisions are
+    replaced on the next update.
+    """
+
+    def __init__(self, directory: str = PRICE_STORE_DIR) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._coverage_path = self.directory / "coverage.json"
+        self.coverage: Dict[str, List[Interval]] = {}
+        if self._coverage_path.exists():
+            try:
+                raw = json.loads(self._coverage_path.read_text(encoding="utf-8"))
+                self.coverage = {
+                    ticker: _merge_intervals(
+                        (date.fromisoformat(lo), date.fromisoformat(hi))
+                        # Older files hold a single [lo, hi] span per ticker.
+                        for lo, hi in (spans if isinstance(spans[0], list) else [spans])
+                    )
+                    for ticker, spans in raw.items() if spans
+                }
+            except (OSError, ValueError, TypeError) as e:
+                log.warning(f"Could not read price coverage '{self._coverage_path}', refetching: {e}")
+
+    def _path(self, ticker: str) -> Path:
+        return self.directory / f"{ticker}.npy"
+
+    def load(self, ticker: str) -> np.ndarray:
+        """Return the stored bars of *ticker*, sorted by date (memory-mapped)."""
+        path = self._path(ticker)
+        if not path.exists():
+            return np.zeros(0, dtype=PRICE_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def missing_ranges(self, ticker: str, start: date, end: date) -> List[Interval]:
+        """Date ranges within ``[start, end]`` that have not been fetched yet."""
+        ranges: List[Interval] = []
+        cursor = start
+        for lo, hi in self.coverage.get(ticker, []):
+            if hi < cursor:
+                continue
+            if lo > end:
+                break
+            if lo > cursor:
+                ranges.append((cursor, lo - timedelta(days=1)))
+            cursor = hi + timedelta(days=1)
+        if cursor <= end:
+            ranges.append((cursor, end))
+        return ranges
+
+    def update(self, ticker: str, fetcher: PriceFetcher, start: date, end: date) -> int:
+        """Fetch the missing parts of ``[start, end]`` for *ticker*; return the new bar count."""
+        ranges = self.missing_ranges(ticker, start, end)
+        if not ranges:
+            return 0
+        symbol = PRICE_SYMBOL_OVERRIDES.get(ticker, ticker)
+        fetched = [fetcher.fetch(symbol, a, b) for a, b in ranges]
+
+        bars = np.concatenate([np.asarray(self.load(ticker)), *fetched])
+        _, first = np.unique(bars["date"][::-1], return_index=True)  # newest fetch wins
+        bars = bars[::-1][first]  # np.unique sorts by date
+        new = len(bars) - len(self.load(ticker))
+
+        tmp = self._path(ticker).with_suffix(".tmp.npy")
+        np.save(tmp, bars)
+        os.replace(tmp, self._path(ticker))
+
+        settled = date.today() - timedelta(days=PRICE_REFETCH_DAYS)
+        fetched_ranges = [(a, min(b, settled)) for a, b in ranges if a <= settled]
+        if fetched_ranges:
+            self.coverage[ticker] = _merge_intervals(self.coverage.get(ticker, []) + fetched_ranges)
+            self._save_coverage()
+        return new
+
+    def update_many(
+        self, tickers: Iterable[str], fetcher: PriceFetcher, start: date, end: date
+    ) -> Dict[str, int]:
+        """:meth:`update` each ticker, logging and skipping the ones that fail."""
+        added: Dict[str, int] = {}
+        for ticker in tickers:
+            try:
+                added[ticker] = self.update(ticker, fetcher, start, end)
+            except Exception as e:
+                log.error(f"Failed to update prices for '{ticker}': {e}")
+        log.info(f"Price store updated: {sum(added.values())} new bars for {len(added)} tickers.")
+        return added
+
+    def close_matrix(
+        self, tickers: List[str], start: date, end: date
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(days, closes)``: a calendar-day grid and an ``(n, days)`` close array (NaN = no bar)."""
+        days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]")
+        closes = np.full((len(tickers), len(days)), np.nan)
+        for i, ticker in enumerate(tickers):
+            bars = self.load(ticker)
+            idx = (bars["date"] - days[0]).astype(np.int64) if len(bars) else np.zeros(0, dtype=np.int64)
+            keep = (idx >= 0) & (idx < len(days))
+            closes[i, idx[keep]] = bars["close"][keep]
+        return days, closes
+
+    def _save_coverage(self) -> None:
+        tmp = self._coverage_path.with_suffix(".tmp")
+        coverage = {
+            ticker: [[lo.isoformat(), hi.isoformat()] for lo, hi in spans]
+            for ticker, spans in self.coverage.items()
+        }
+        tmp.write_text(json.dumps(coverage), encoding="utf-8")
+        os.replace(tmp, self._coverage_path)
@@ -0,0 +1,244 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Final, List, Optional, Sequence
+
+import numpy as np
+import psycopg
+
+from analytics.db import copy_upsert
+from config import (
+    ANALYTICS_EMA_FAST_SPAN,
+    ANALYTICS_EMA_SLOW_SPAN,
+    ANALYTICS_LOOKBACK_DAYS,
+    ANALYTICS_ROLLING_WINDOW,
+    POSTGRES_DSN,
+)
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+TABLE_ANALYTICS: Final[str] = "sentiment_analytics"
+RESOLUTIONS: Final[Dict[str, timedelta]] = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Rollups summed over platforms, per asset and bucket. The rollup tables are
+# already aggregated, so loading never touches asset_mentions.
+SQL_LOAD_BUCKETS: Final[str] = """
+    SELECT r.asset_id, r.bucket, sum(r.mention_count),
+           sum(r.weighted_sentiment_sum), sum(r.confidence_sum)
+    FROM {table} r
+    JOIN assets a ON a.asset_id = r.asset_id
+    WHERE r.bucket >= %(since)s
+      AND (%(tickers)s::text[] IS NULL OR a.ticker = ANY(%(tickers)s::text[]))
+    GROUP BY r.asset_id, r.bucket
+"""
+
+METRIC_COLUMNS: Final[tuple[str, ...]] = (
+    "avg_sentiment",
+    "rolling_sentiment",
+    "ema_fast",
+    "ema_slow",
+    "momentum",
+    "volume_zscore",
+)
+_KEY_COLUMNS: Final[tuple[str, ...]] = ("asset_id", "resolution", "bucket")
+_WRITE_COLUMNS: Final[tuple[str, ...]] = _KEY_COLUMNS + ("mention_count",) + METRIC_COLUMNS
+
+
+@dataclass
+class SentimentFrame:
+    """Dense per-asset time series: one row per asset, one column per bucket.
+
+    ``weighted_sum`` is Σ sentiment × confidence and ``weight_sum`` is
+    Σ confidence, so any window's confidence-weighted mean is the ratio of
+    their sums over that window. Empty buckets are zeros.
+    """
+
+    asset_ids: np.ndarray      # (n,)
+    buckets: np.ndarray        # (m,) datetime64[s], UTC
+    counts: np.ndarray         # (n, m)
+    weighted_sum: np.ndarray   # (n, m)
+    weight_sum: np.ndarray     # (n, m)
+
+    @classmethod
+    def from_rows(
+        cls, rows: Sequence[Sequence[Any]], start: datetime, end: datetime, step: timedelta
+    ) -> "SentimentFrame":
+        """Pivot ``(asset_id, bucket, count, weighted_sum, weight_sum)`` rows onto a bucket grid."""
+        step_s = int(step.total_seconds())
+        start_s = int(start.timestamp()) // step_s * step_s
+        n_buckets = max(0, (int(end.timestamp()) - start_s) // step_s + 1)
+        buckets = (start_s + np.arange(n_buckets, dtype=np.int64) * step_s).astype("datetime64[s]")
+
+        if not rows:
+            empty = np.zeros((0, n_buckets))
+            return cls(np.zeros(0, dtype=np.int64), buckets, empty, empty.copy(), empty.copy())
+
+        columns = list(zip(*rows))
+        asset_ids, asset_idx = np.unique(np.asarray(columns[0], dtype=np.int64), return_inverse=True)
+        seconds = np.fromiter((b.timestamp() for b in columns[1]), dtype=np.float64, count=len(rows))
+        bucket_idx = ((seconds - start_s) // step_s).astype(np.int64)
+        keep = (bucket_idx >= 0) & (bucket_idx < n_buckets)
+
+        shape = (len(asset_ids), n_buckets)
+        frame = cls(asset_ids, buckets, np.zeros(shape), np.zeros(shape), np.zeros(shape))
+        for target, values in (
+            (frame.counts, columns[2]),
+            (frame.weighted_sum, columns[3]),
+            (frame.weight_sum, columns[4]),
+        ):
+            np.add.at(target, (asset_idx[keep], bucket_idx[keep]), np.asarray(values, dtype=np.float64)[keep])
+        return frame
+
+
+# ---------------------------------------------------------------------------
+# Vectorised metrics (every asset at once, along the bucket axis)
+# ---------------------------------------------------------------------------
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den, NaN where den is 0."""
+    out = np.full(num.shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def trailing_sum(x: np.ndarray, window: int, *, exclude_current: bool = False) -> np.ndarray:
+    """Sum of the last *window* buckets per row (fewer at the start of the series)."""
+    csum = np.concatenate([np.zeros((x.shape[0], 1)), np.cumsum(x, axis=1)], axis=1)
+    end = np.arange(x.shape[1]) + (0 if exclude_current else 1)
+    begin = np.maximum(end - window, 0)
+    return csum[:, end] - csum[:, begin]
+
+
+def weighted_ema(weighted_sum: np.ndarray, weight_sum: np.ndarray, span: int) -> np.ndarray:
+    """Confidence-weighted EMA: EMA of Σ(s·c) over EMA of Σc.
+
+    Empty buckets decay both terms equally, so the value carries forward
+    unchanged until new mentions arrive (no forward-fill needed downstream).
+    """
+    alpha = 2.0 / (span + 1)
+    num = np.zeros(weighted_sum.shape[0])
+    den = np.zeros(weighted_sum.shape[0])
+    out = np.empty_like(weighted_sum)
+    for t in range(weighted_sum.shape[1]):
+        num = alpha * weighted_sum[:, t] + (1 - alpha) * num
+        den = alpha * weight_sum[:, t] + (1 - alpha) * den
+        out[:, t] = _ratio(num, den)
+    return out
+
+
+def compute_metrics(
+    frame: SentimentFrame,
+    window: int = ANALYTICS_ROLLING_WINDOW,
+    fast_span: int = ANALYTICS_EMA_FAST_SPAN,
+    slow_span: int = ANALYTICS_EMA_SLOW_SPAN,
+) -> Dict[str, np.ndarray]:
+    """Return each of :data:`METRIC_COLUMNS` as an ``(n_assets, n_buckets)`` array.
+
+    * ``avg_sentiment``: confidence-weighted mean of the bucket.
+    * ``rolling_sentiment``: the same over the trailing *window* buckets.
+    * ``ema_fast`` / ``ema_slow``: confidence-weighted EMAs.
+    * ``momentum``: ``ema_fast - ema_slow``.
+    * ``volume_zscore``: mention count against the mean and standard
+      deviation of the *window* buckets before it.
+    """
+    ema_fast = weighted_ema(frame.weighted_sum, frame.weight_sum, fast_span)
+    ema_slow = weighted_ema(frame.weighted_sum, frame.weight_sum, slow_span)
+
+    prior_n = np.minimum(np.arange(frame.counts.shape[1]), window).astype(np.float64)
+    prior_sum = trailing_sum(frame.counts, window, exclude_current=True)
+    prior_sq = trailing_sum(frame.counts ** 2, window, exclude_current=True)
+    mean = _ratio(prior_sum, np.broadcast_to(prior_n, prior_sum.shape))
+    var = _ratio(prior_sq, np.broadcast_to(prior_n, prior_sq.shape)) - mean ** 2
+    std = np.sqrt(np.clip(var, 0.0, None))
+    std[:, prior_n < 2] = np.nan
+
+    return {
+        "avg_sentiment": _ratio(frame.weighted_sum, frame.weight_sum),
+        "rolling_sentiment": _ratio(
+            trailing_sum(frame.weighted_sum, window), trailing_sum(frame.weight_sum, window)
+        ),
+        "ema_fast": ema_fast,
+        "ema_slow": ema_slow,
+        "momentum": ema_fast - ema_slow,
+        "volume_zscore": _ratio(frame.counts - mean, std),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Database I/O
+# ---------------------------------------------------------------------------
+
+def load_frame(
+    conn: Any,
+    start: datetime,
+    end: datetime,
+    resolution: str = "day",
+    tickers: Optional[List[str]] = None,
+) -> SentimentFrame:
+    """Load the rollups between *start* and *end* for *tickers* (None = all)."""
+    table = "sentiment_rollup_hourly" if resolution == "hour" else "sentiment_rollup_daily"
+    rows = conn.execute(
+        SQL_LOAD_BUCKETS.format(table=table), {"since": start, "tickers": tickers}
+    ).fetchall()
+    return SentimentFrame.from_rows(rows, start, end, RESOLUTIONS[resolution])
+
+
+def _nullable(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else round(v, 6) for v in values.tolist()]  # NaN -> NULL
+
+
+def write_metrics(
+    conn: Any,
+    frame: SentimentFrame,
+    metrics: Dict[str, np.ndarray],
+    resolution: str,
+    since: datetime,
+) -> int:
+    """Upsert the metric rows for buckets at or after *since*; return the row count."""
+    first = int(np.searchsorted(frame.buckets, np.datetime64(int(since.timestamp()), "s")))
+    buckets = [
+        datetime.fromtimestamp(int(b), timezone.utc) for b in frame.buckets[first:].astype(np.int64)
+    ]
+    if not buckets or not len(frame.asset_ids):
+        return 0
+
+    def _rows():
+        for i, asset_id in enumerate(frame.asset_ids.tolist()):
+            counts = frame.counts[i, first:].astype(np.int64).tolist()
+            series = [_nullable(metrics[c][i, first:]) for c in METRIC_COLUMNS]
+            for j, bucket in enumerate(buckets):
+                yield (asset_id, resolution, bucket, counts[j], *(s[j] for s in series))
+
+    return copy_upsert(
+        conn, TABLE_ANALYTICS, _WRITE_COLUMNS, _KEY_COLUMNS, _rows(), touch_column="computed_at"
+    )
+
+
+def refresh_analytics(
+    dsn: str = POSTGRES_DSN,
+    tickers: Optional[List[str]] = None,
+    days: int = ANALYTICS_LOOKBACK_DAYS,
+    resolution: str = "day",
+) -> int:
+    """Recompute ``sentiment_analytics`` for the last *days* and return the rows written.
+
+    Extra buckets before the window are loaded so the slow EMA and the
+    rolling window are warmed up at its first bucket.
+    """
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Invalid resolution: {resolution}. Options: {list(RESOLUTIONS)}")
+
+    step = RESOLUTIONS[resolution]
+    end = datetime.now(timezone.utc)
+    since = end - timedelta(days=days)
+    warmup = step * (3 * max(ANALYTICS_EMA_SLOW_SPAN, ANALYTICS_ROLLING_WINDOW))
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        frame = load_frame(conn, since - warmup, end, resolution, tickers)
+        log.info(
+            f"Loaded {frame.counts.shape[0]} assets × {frame.counts.shape[1]} {resolution} buckets."
+        )
+        metrics = compute_metrics(frame)
+        written = write_metrics(conn, frame, metrics, resolution, since)
+    log.info(f"Wrote {written} rows to '{TABLE_ANALYTICS}' ({resolution}).")
+    return written
@@ -0,0 +1,312 @@
+import json
+import math
+import os
+import urllib.request
+from abc import ABC, abstractmethod
+from dataclasses import asdict, astuple, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Final, Iterable, List, Optional, Tuple
+
+from config import (
+    SPIKE_ALERT_FILE,
+    SPIKE_ALERT_SINK,
+    SPIKE_BUCKET_MINUTES,
+    SPIKE_HALF_LIFE_BUCKETS,
+    SPIKE_MIN_MENTIONS,
+    SPIKE_STATE_FILE,
+    SPIKE_WARMUP_BUCKETS,
+    SPIKE_WEBHOOK_URL,
+    SPIKE_ZSCORE,
+)
+from data.models import SentimentRecord
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+SENTIMENT_STD_FLOOR: Final[float] = 0.05  # Keeps near-constant sentiment from alerting on noise
+
+
+@dataclass
+class SpikeAlert:
+    ticker: str
+    kind: str              # "volume" or "sentiment"
+    bucket_start: datetime
+    mentions: int
+    value: float           # Bucket mention count or mean sentiment
+    baseline: float        # Decayed mean it is compared with
+    zscore: float
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["bucket_start"] = self.bucket_start.isoformat()
+        return data
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+
+class AlertSink(ABC):
+    """Destination of spike alerts."""
+
+    @abstractmethod
+    def emit(self, alert: SpikeAlert) -> None:
+        ...
+
+
+class LogAlertSink(AlertSink):
+    def emit(self, alert: SpikeAlert) -> None:
+        log.warning(
+            f"Spike: {alert.ticker} {alert.kind} {alert.value:.3f} vs {alert.baseline:.3f} "
+            f"(z={alert.zscore:.1f}, {alert.mentions} mentions)"
+        )
+
+
+class FileAlertSink(AlertSink):
+    """Appends each alert as a JSON line."""
+
+    def __init__(self, path: str = SPIKE_ALERT_FILE) -> None:
+        self.path = Path(path)
+
+    def emit(self, alert: SpikeAlert) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(alert.to_dict()) + "\n")
+        except OSError as e:
+            log.error(f"Failed to write spike alert to '{self.path}': {e}")
+
+
+class WebhookAlertSink(AlertSink):
+    """POSTs each alert as JSON to *url* (e.g. a Slack/Discord relay)."""
+
+    def __init__(self, url: Optional[str] = SPIKE_WEBHOOK_URL, timeout: float = 5.0) -> None:
+        if not url:
+            raise ValueError("SPIKE_ALERT_SINK 'webhook' requires SPIKE_WEBHOOK_URL.")
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, alert: SpikeAlert) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(alert.to_dict()).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except OSError as e:
+            log.error(f"Failed to post spike alert for {alert.ticker}: {e}")
+
+
+ALERT_SINKS: Final[Dict[str, type]] = {
+    "file": FileAlertSink,
+    "webhook": WebhookAlertSink,
+    "log": LogAlertSink,
+}
+
+
+def get_alert_sink(name: str = SPIKE_ALERT_SINK) -> AlertSink:
+    if name not in ALERT_SINKS:
+        raise ValueError(f"Invalid SPIKE_ALERT_SINK: {name}. Available options: {list(ALERT_SINKS)}")
+    return ALERT_SINKS[name]()
+
+
+# ---------------------------------------------------------------------------
+# Detector
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _TickerState:
+    """Fixed-size state of one ticker: the open bucket plus decayed baselines."""
+
+    bucket: int                 # Index of the open bucket
+    count: float = 0.0          # Mentions in the open bucket
+    weighted_sum: float = 0.0   # Σ sentiment × confidence in the open bucket
+    weight_sum: float = 0.0     # Σ confidence in the open bucket
+    count_mean: float = 0.0     # Decayed mean / variance of closed-bucket counts
+    count_var: float = 0.0
+    sent_mean: float = 0.0      # Decayed mean / variance of closed-bucket sentiment
+    sent_var: float = 0.0
+    buckets: int = 0            # Closed buckets folded into the count baseline
+    sent_buckets: int = 0       # Closed non-empty buckets folded into the sentiment baseline
+    alerted: int = 0            # Alert kinds already raised for the open bucket (bit flags)
+
+
+_VOLUME: Final[int] = 1
+_SENTIMENT: Final[int] = 2
+
+
+def _ew_update(mean: float, var: float, x: float, alpha: float) -> Tuple[float, float]:
+    """One step of an exponentially weighted mean/variance."""
+    diff = x - mean
+    incr = alpha * diff
+    return mean + incr, (1 - alpha) * (var + diff * incr)
+
+
+class SpikeDetector:
+    """Online mention-volume and sentiment spike detector.
+
+    Records are counted per ticker in buckets of *bucket_minutes*. When a
+    bucket closes, its mention count (empty buckets count as 0) and mean
+    sentiment are folded into exponentially decayed means and variances
+    with a half-life of *half_life* buckets, so each ticker costs a fixed
+    handful of floats however long it has been tracked.
+
+    The open bucket is compared with those baselines as records arrive; a
+    ticker alerts at most once per kind and bucket. The volume deviation is
+    floored at a Poisson ``sqrt(mean)`` so quiet tickers don't alert on a
+    couple of extra mentions.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[AlertSink] = None,
+        bucket_minutes: float = SPIKE_BUCKET_MINUTES,
+        half_life: float = SPIKE_HALF_LIFE_BUCKETS,
+        zscore: float = SPIKE_ZSCORE,
+        min_mentions: int = SPIKE_MIN_MENTIONS,
+        warmup: int = SPIKE_WARMUP_BUCKETS,
+        path: Optional[Path] = None,
+    ) -> None:
+        self.sink = sink or LogAlertSink()
+        self.bucket_seconds = int(bucket_minutes * 60)
+        self.alpha = 1 - 0.5 ** (1 / half_life)
+        # After this many empty buckets a baseline has decayed to ~0, so
+        # longer gaps are not replayed one by one.
+        self.max_gap = math.ceil(10 * half_life)
+        self.zscore = zscore
+        self.min_mentions = min_mentions
+        self.warmup = warmup
+        self.path = path
+        self._states: Dict[str, _TickerState] = {}
+        if self.path:
+            self._load()
+
+    @classmethod
+    def from_config(cls) -> "SpikeDetector":
+        """Build the detector with the configured sink, file-backed if ``SPIKE_STATE_FILE`` is set."""
+        path = Path(SPIKE_STATE_FILE) if SPIKE_STATE_FILE else None
+        return cls(sink=get_alert_sink(), path=path)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _close_bucket(self, state: _TickerState, new_bucket: int) -> None:
+        state.count_mean, state.count_var = _ew_update(
+            state.count_mean, state.count_var, state.count, self.alpha
+        )
+        if state.weight_sum > 0:
+            sentiment = state.weighted_sum / state.weight_sum
+            if state.sent_buckets:
+                state.sent_mean, state.sent_var = _ew_update(
+                    state.sent_mean, state.sent_var, sentiment, self.alpha
+                )
+            else:
+                state.sent_mean = sentiment
+            state.sent_buckets += 1
+
+        gap = new_bucket - state.bucket - 1
+        for _ in range(min(gap, self.max_gap)):
+            state.count_mean, state.count_var = _ew_update(
+                state.count_mean, state.count_var, 0.0, self.alpha
+            )
+        state.buckets += 1 + gap
+
+        state.bucket = new_bucket
+        state.count = state.weighted_sum = state.weight_sum = 0.0
+        state.alerted = 0
+
+    def observe(self, record: SentimentRecord) -> List[SpikeAlert]:
+        """Count *record* and return (and emit) any alerts it triggers."""
+        ticker = record.symbol.upper()
+        created = record.created_at or datetime.now(timezone.utc)
+        bucket = int(created.timestamp()) // self.bucket_seconds
+
+        state = self._states.get(ticker)
+        if state is None:
+            state = self._states[ticker] = _TickerState(bucket=bucket)
+        elif bucket > state.bucket:
+            self._close_bucket(state, bucket)
+        # Late records (older than the open bucket) are counted in it.
+
+        state.count += record.mention_count
+        state.weighted_sum += record.sentiment_score * record.sentiment_confidence * record.mention_count
+        state.weight_sum += record.sentiment_confidence * record.mention_count
+
+        alerts = self._check(ticker, state)
+        for alert in alerts:
+            self.sink.emit(alert)
+        return alerts
+
+    def observe_many(self, records: Iterable[SentimentRecord]) -> List[SpikeAlert]:
+        alerts: List[SpikeAlert] = []
+        for record in records:
+            alerts.extend(self.observe(record))
+        if alerts:
+            log.info(f"Spike detector raised {len(alerts)} alert(s).")
+        return alerts
+
+    def _check(self, ticker: str, state: _TickerState) -> List[SpikeAlert]:
+        if state.buckets < self.warmup or state.count < self.min_mentions:
+            return []
+        start = datetime.fromtimestamp(state.bucket * self.bucket_seconds, timezone.utc)
+        alerts = []
+
+        if not state.alerted & _VOLUME:
+            std = max(math.sqrt(state.count_var), math.sqrt(max(state.count_mean, 1.0)))
+            z = (state.count - state.count_mean) / std
+            if z >= self.zscore:
+                state.alerted |= _VOLUME
+                alerts.append(SpikeAlert(
+                    ticker, "volume", start, int(state.count), state.count, state.count_mean, z
+                ))
+
+        if not state.alerted & _SENTIMENT and state.sent_buckets >= self.warmup and state.weight_sum > 0:
+            value = state.weighted_sum / state.weight_sum
+            z = (value - state.sent_mean) / max(math.sqrt(state.sent_var), SENTIMENT_STD_FLOOR)
+            if abs(z) >= self.zscore:
+                state.alerted |= _SENTIMENT
+                alerts.append(SpikeAlert(
+                    ticker, "sentiment", start, int(state.count), value, state.sent_mean, z
+                ))
+        return alerts
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+            self._states = {ticker: _TickerState(*values) for ticker, values in raw.items()}
+        except (OSError, json.JSONDecodeError, TypeError) as e:
+            log.warning(f"Could not read spike detector state '{self.path}', starting empty: {e}")
+            self._states = {}
+
+    def save(self) -> None:
+        """Write the per-ticker state to its file (if any).
+
+        Tickers idle for longer than the decay horizon are dropped; their
+        baselines have decayed to nothing and they restart from warm-up.
+        """
+        if not self.path:
+            return
+        if self._states:
+            latest = max(s.bucket for s in self._states.values())
+            self._states = {
+                t: s for t, s in self._states.items() if latest - s.bucket <= self.max_gap
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(
+                json.dumps({t: astuple(s) for t, s in self._states.items()}), encoding="utf-8"
+            )
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning(f"Failed to save spike detector state '{self.path}': {e}")
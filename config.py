@@ -6,6 +6,8 @@ from typing import List, Dict, Tuple
 DATA_OUTPUT_DIR = "stock_data/raw_json"  # Raw JSON data from Reddit
 LLM_INPUT_DIR = "stock_data/llm_input"    # Cleaned text files ready for LLM
 LLM_OUTPUT_DIR = "stock_data/llm_output"  # Intermediate per-file debug output
+MANIFEST_FILE = "stock_data/manifest.json"  # Content hashes of already-converted files/posts
+MERGED_CONTEXT_DIR = "stock_data/merged_context"  # FULL_CONTEXT.ndjson + index (kept out of LLM_INPUT_DIR, which is cleaned every run)
 # SENTIMENT_ANALYSIS_OUTPUT_PATH is no longer used — data is written directly to Supabase.
 PROMPT_FILE = "LLM/prompts/system_prompt.txt" # Path to system prompt
 
@@ -32,9 +34,26 @@ LLM_PROVIDERS = {
 }
 
 
-
 RATE_LIMIT_STATE_FILE = "logs/rate_limit_state.json"
 
+# Local aggregation of the LLM's per-text sentiment into one record per symbol
+# (LLM/aggregation.py). Each text is weighted by its upvotes and confidence.
+AGGREGATION_WEIGHTING = "log"        # Options: "log" (1 + ln(1 + upvotes)), "linear" (1 + upvotes), "none"
+AGGREGATION_CONFIDENCE_PRIOR = 1.0   # Pseudo-count shrinking the confidence of thinly mentioned symbols
+SENTIMENT_LABEL_THRESHOLD = 0.2      # BUY above +threshold, SELL below -threshold, else NEUTRAL
+
+# Ticker universe (data/ticker_universe.py): LLM symbols are normalised
+# ("$AAPL" -> AAPL, "Gold" -> XAU) against this file before any database work
+TICKER_UNIVERSE_FILE = "data/universe/tickers.txt"  # None disables validation
+TICKER_UNIVERSE_STRICT = False       # Drop symbols not in the universe (off: keep ticker-shaped ones, logged; the file is not exhaustive)
+
+# Merge a run's records per (symbol, platform, time bucket) into one weighted
+# record before insert (data/consolidation.py). The merged row keeps how many
+# records it stands for and their score sum (asset_mentions.mention_count and
+# sentiment_sum), so the rollups come out the same as without merging.
+CONSOLIDATE_RECORDS = True
+CONSOLIDATION_BUCKET_MINUTES = 60    # Keep at the hourly rollup granularity or a divisor of it
+
 # ==============================================================================
 # 5. SUPABASE CONFIGURATION
 # ==============================================================================
@@ -45,9 +64,108 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Async client HTTP pool (keep-alive connections shared by all queries)
+DB_HTTP_MAX_CONNECTIONS = 10     # Max concurrent requests to Supabase
+DB_HTTP_KEEPALIVE_EXPIRY = 30.0  # Seconds an idle connection is kept open
+DB_HTTP_TIMEOUT = 30.0           # Per-request timeout in seconds
+
+# Database backend for inserts and post dedup
+# Options: "supabase" (PostgREST over HTTP), "postgres" (direct connection, binary COPY)
+DATABASE_BACKEND = "supabase"
+
+# Direct Postgres (e.g. the docker-compose database). Defaults match docker-compose.yml.
+POSTGRES_DSN = os.getenv("POSTGRES_DSN") or (
+    f"postgresql://{os.getenv('POSTGRES_USER', 'user')}:{os.getenv('POSTGRES_PASSWORD', 'password')}"
+    f"@localhost:5432/{os.getenv('POSTGRES_DB', 'stock_db')}"
+)
+POSTGRES_POOL_MIN_SIZE = 1
+POSTGRES_POOL_MAX_SIZE = 4        # Also the number of COPY streams run in parallel
+POSTGRES_COPY_CHUNK_ROWS = 50_000  # Rows per COPY statement (one transaction each)
+MENTION_PARTITION_MONTHS_AHEAD = 3  # Monthly asset_mentions partitions kept created ahead (database/migrate.py)
+
+# ticker → asset_id / platform name → platform_id lookup cache
+ID_CACHE_MAX_SIZE = 10_000  # Entries kept per table (least recently used evicted)
+ID_CACHE_DIR = None         # e.g. "stock_data/id_cache" to persist IDs across runs (None = in-memory)
+
+# processed_posts dedup: only the candidate IDs of a scrape are looked up,
+# in batches, on top of a local cache of recently confirmed IDs
+PROCESSED_POST_LOOKUP_BATCH = 200     # IDs per `post_id IN (...)` request (keeps PostgREST URLs short)
+PROCESSED_POST_CACHE_TTL_DAYS = 7     # Confirmed IDs are trusted locally for this long
+PROCESSED_POST_CACHE_FILE = None      # e.g. "stock_data/processed_posts.json" to keep the cache across runs
+
+# Re-aggregate the hourly/daily sentiment rollups touched by each insert
+# (refresh_sentiment_rollups in database/schema.sql; read by the dashboard RPCs)
+ROLLUP_REFRESH = True
+
+# Precomputed rolling sentiment analytics (analytics/rolling.py, scripts/compute_analytics.py)
+ANALYTICS_LOOKBACK_DAYS = 90       # Days of sentiment_analytics rows rewritten per run
+ANALYTICS_ROLLING_WINDOW = 7       # Buckets in the rolling mean / volume z-score window
+ANALYTICS_EMA_FAST_SPAN = 3        # Buckets; momentum = fast EMA - slow EMA
+ANALYTICS_EMA_SLOW_SPAN = 14
+
+# Daily price history cache and sentiment/return correlations
+# (analytics/prices.py, analytics/correlation.py, scripts/sync_prices.py)
+PRICE_STORE_DIR = "stock_data/prices"  # One memory-mappable .npy file of daily OHLCV per ticker
+PRICE_FETCHER = "yahoo"                # Options: "yahoo" (needs yfinance), "stub" (offline synthetic prices)
+PRICE_HISTORY_DAYS = 365               # Days of prices kept fetched and published to asset_prices
+PRICE_REFETCH_DAYS = 3                 # Trailing days never marked fetched: partial/revised bars are refetched
+PRICE_SYMBOL_OVERRIDES: Dict[str, str] = {  # Asset ticker -> price-source symbol where they differ
+    "BTC": "BTC-USD",
+    "ETH": "ETH-USD",
+    "XAU": "GC=F",
+}
+CORRELATION_LAGS = (0, 1, 2, 3, 5)     # Days between sentiment and the return it is compared with
+CORRELATION_MIN_OBS = 20               # Fewer paired days than this -> correlation left NULL
+
+# asset_mentions bulk inserts
+MENTION_INSERT_CHUNK_ROWS = 500          # Max rows per insert request
+MENTION_INSERT_CHUNK_BYTES = 1_000_000   # Max approx. JSON payload bytes per insert request
+MENTION_INSERT_CONCURRENCY = 4           # Chunks in flight at once
+MENTION_INSERT_RETRIES = 3               # Retries per chunk on transient (network/server) errors
+MENTION_INSERT_BACKOFF = 0.5             # Initial retry delay in seconds, doubled per attempt
+
+# asset_mentions retention (database/retention.py, scripts/apply_retention.py).
+# Older mentions are folded into the daily rollups, their text archived to
+# MENTION_ARCHIVE_DIR and the rows deleted in MENTION_RETENTION_BATCH batches.
+MENTION_RETENTION_DAYS = 90         # Keep individual mentions this long (must exceed the 2-day hourly view)
+MENTION_RETENTION_BATCH = 500       # Rows archived + deleted per statement (short locks)
+MENTION_ARCHIVE_DIR = "stock_data/mention_archive"  # None = drop the text instead of archiving it
+
+# Columnar export of asset_mentions for offline analysis (database/export.py,
+# scripts/export_mentions.py). Needs pyarrow. Files are partitioned by
+# date=/platform= and only mentions not exported yet (by mention_id) are written.
+EXPORT_DIR = "stock_data/exports/mentions"
+EXPORT_FORMAT = "parquet"        # Options: "parquet", "arrow" (uncompressed Arrow IPC, zero-copy memory-mappable)
+EXPORT_COMPRESSION = "zstd"      # Parquet codec (None for uncompressed)
+EXPORT_BATCH_ROWS = 100_000      # Rows per server-side cursor fetch (and at most per written file)
+EXPORT_RESCAN_IDS = 100_000      # Skipped mention_ids this far behind the watermark are re-checked for late commits
+
+# Local write-ahead outbox for analysis batches (database/outbox.py). Every
+# batch is stored here before it is sent and only removed once the database
+# has accepted it, so an outage never loses LLM results.
+OUTBOX_FILE = "stock_data/outbox.sqlite3"
+OUTBOX_BACKOFF = 30.0          # Delay before the first replay of a failed batch, doubled per failure
+OUTBOX_BACKOFF_MAX = 3600.0    # Cap on the replay delay in seconds
+OUTBOX_MAX_ATTEMPTS = 50       # Failed replays before a batch is parked as dead
+OUTBOX_FLUSH_INTERVAL = 60.0   # Seconds between background flusher passes
+
 # Content Optimization
 REMOVE_NON_ASCII = True  # If True, removes emojis/non-English chars to save tokens
-MERGE_LLM_OUTPUT = False  # If True, combines all subreddits into one 'full_context.txt' file
+MERGE_LLM_OUTPUT = False  # If True, appends every subreddit's posts to one append-only 'FULL_CONTEXT.ndjson' file in MERGED_CONTEXT_DIR
+
+# File Conversion (raw JSON -> LLM input)
+# Options: "process" (spreads CPU-bound cleaning across all cores), "thread"
+FILE_PROCESSING_MODE = "process"
+PROCESS_POOL_MIN_FILES = 8   # Below this many files, threads are used (process start-up isn't worth it)
+PROCESS_POOL_CHUNK_SIZE = 0  # Files per worker task (0 = auto, ~4 chunks per worker)
+MANIFEST_RETENTION_DAYS = 30  # Forget file/post hashes not seen for this many days
+
+# Storage Format (stock_data/raw_json and stock_data/llm_input files)
+# Options: "json" (single document), "ndjson" (line per record), "msgpack" (binary)
+STORAGE_FORMAT = "json"
+STORAGE_COMPRESSION = None  # Options: None, "zstd"
+ZSTD_LEVEL = 3              # 1 (fastest) - 19 (smallest); 3 is zstd's default
+STORAGE_WRITER_QUEUE_SIZE = 4  # Scraped batches buffered for the background writer before scraping waits
 
 # ==============================================================================
 # 3. REDDIT SCRAPER CONFIGURATION
@@ -91,6 +209,13 @@ SUBREDDIT_FLAIRS: Dict[str, Tuple[str, ...]] = {
     "ValueInvesting": ("Stock Analysis", "Discussion"),
 }
 
+# Daemon mode (python main.py --daemon): Reddit, LLM and database clients stay
+# open between runs and each subreddit is scraped on its own interval.
+DAEMON_INTERVAL_MINUTES = 60.0   # Default interval between runs of a subreddit
+DAEMON_SUBREDDIT_INTERVALS: Dict[str, float] = {  # Per-subreddit overrides, in minutes
+    "wallstreetbets": 30.0,
+}
+
 # ==============================================================================
 # 4. APPLICATION SETTINGS
 # ==============================================================================
@@ -99,3 +224,16 @@ SAVE_LOGS = True        # Whether to write logs to disk
 KEEP_RAW_JSON = False    # If False, deletes temporary .json files after processing
 KEEP_LLM_INPUT = False   # If False, deletes intermediate .txt files used for LLM input
 KEEP_LLM_OUTPUT = False  # If False, deletes intermediate .csv files from LLM output
+
+# Streaming mention-volume / sentiment spike detection (analytics/spikes.py).
+# Runs on the records of each pipeline run, before the database insert.
+SPIKE_DETECTION = True
+SPIKE_BUCKET_MINUTES = 60        # Mentions are counted per ticker in buckets of this size
+SPIKE_HALF_LIFE_BUCKETS = 24     # Half-life of the decayed per-ticker baseline, in buckets
+SPIKE_ZSCORE = 3.0               # Alert when a bucket is this many std devs above its baseline
+SPIKE_MIN_MENTIONS = 5           # ...and has at least this many mentions
+SPIKE_WARMUP_BUCKETS = 6         # Buckets of history needed before a ticker can alert
+SPIKE_STATE_FILE = "stock_data/spike_state.json"  # Detector state kept across runs (None = in-memory)
+SPIKE_ALERT_SINK = "file"        # Options: "file", "webhook", "log"
+SPIKE_ALERT_FILE = "logs/spike_alerts.jsonl"
+SPIKE_WEBHOOK_URL = None         # POST target of the "webhook" sink
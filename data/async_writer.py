@@ -0,0 +1,79 @@
+import asyncio
+from typing import Any, Callable, Optional, Tuple
+
+from config import STORAGE_WRITER_QUEUE_SIZE
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+_STOP = object()
+
+
+class AsyncStorageWriter:
+    """Run blocking storage writes off the event loop.
+
+    Calls to :meth:`submit` enqueue the arguments for *write_fn* on a bounded
+    queue; a single writer task drains it, running each write in a worker
+    thread so network I/O on the loop is never stalled by disk I/O. A full
+    queue makes :meth:`submit` wait, which bounds memory if the disk falls
+    behind. :meth:`close` (or leaving the ``async with`` block) waits for
+    every pending write to finish.
+
+    Example::
+
+        async with AsyncStorageWriter(data_handler.save_subreddit_data) as writer:
+            async for sub_name, data in reddit_client.process_all_subreddits(...):
+                await writer.submit(sub_name, data)
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[..., Any],
+        max_pending: int = STORAGE_WRITER_QUEUE_SIZE,
+    ) -> None:
+        self._write_fn = write_fn
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.failed = 0
+
+    async def __aenter__(self) -> "AsyncStorageWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="storage-writer")
+
+    async def submit(self, *args: Any) -> None:
+        """Queue a write of *args*, waiting only if the buffer is full."""
+        if self._task is None:
+            self.start()
+        await self._queue.put(args)
+
+    async def close(self) -> None:
+        """Flush all pending writes and stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        log.debug(f"Storage writer flushed ({self.written} written, {self.failed} failed).")
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            await self._write(item)
+
+    async def _write(self, args: Tuple[Any, ...]) -> None:
+        try:
+            await asyncio.to_thread(self._write_fn, *args)
+            self.written += 1
+        except Exception as e:
+            self.failed += 1
+            log.error(f"Background storage write failed: {e}")
@@ -0,0 +1,106 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Final, Iterable, List, Optional, Tuple
+
+from config import CONSOLIDATION_BUCKET_MINUTES
+from data.models import SentimentRecord, sentiment_label
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+SOURCE_ID_MAX_LENGTH: Final[int] = 255   # asset_mentions.source_id
+MENTION_COUNT_MAX: Final[int] = 32_767   # asset_mentions.mention_count (SMALLINT)
+
+
+def compact_source_ids(source_ids: Iterable[Optional[str]]) -> Optional[str]:
+    """Join the distinct *source_ids* into one ``source_id`` value.
+
+    The sorted IDs are comma-joined when that fits the column; otherwise the
+    first ID is kept with the number of others and a digest of all of them
+    (``first+12#3f1c…``), which is still unique per set of sources.
+    """
+    ids = sorted({s for s in source_ids if s})
+    if not ids:
+        return None
+    joined = ",".join(ids)
+    if len(joined) <= SOURCE_ID_MAX_LENGTH:
+        return joined
+    suffix = f"+{len(ids) - 1}#{hashlib.sha1(joined.encode('utf-8')).hexdigest()[:12]}"
+    return ids[0][: SOURCE_ID_MAX_LENGTH - len(suffix)] + suffix
+
+
+def _sentiment_sum(record: SentimentRecord) -> float:
+    if record.sentiment_sum is not None:
+        return record.sentiment_sum
+    return record.sentiment_score * record.mention_count
+
+
+def _merge(records: List[SentimentRecord], bucket_start: datetime) -> SentimentRecord:
+    """Merge one group so the rollup sums of the result equal those of its parts.
+
+    The score is the confidence-weighted mean (count-weighted if every
+    confidence is zero) and the confidence the mean confidence, so
+    ``score * confidence * mention_count`` and ``confidence * mention_count``
+    reproduce the weighted and confidence sums; the plain score sum is
+    carried in ``sentiment_sum``.
+    """
+    weights = [r.sentiment_confidence * r.mention_count for r in records]
+    if not any(weights):
+        weights = [float(r.mention_count) for r in records]
+    total = sum(weights)
+    score = sum(w * r.sentiment_score for w, r in zip(weights, records)) / total
+    mentions = sum(r.mention_count for r in records)
+    confidence = sum(r.sentiment_confidence * r.mention_count for r in records) / mentions
+    driver = max(zip(weights, records), key=lambda wr: wr[0] * abs(wr[1].sentiment_score))[1]
+
+    return SentimentRecord(
+        symbol=driver.symbol.upper(),
+        sentiment_score=round(min(max(score, -1.0), 1.0), 4),
+        sentiment_confidence=round(min(max(confidence, 0.0), 1.0), 4),
+        sentiment_label=sentiment_label(score),
+        key_rationale=driver.key_rationale,
+        source_text_id=driver.source_text_id,
+        source_text_snippet=driver.source_text_snippet,
+        created_at=bucket_start,
+        source_id=compact_source_ids(r.source_id for r in records),
+        source_name=driver.source_name,
+        mention_count=min(mentions, MENTION_COUNT_MAX),
+        sentiment_sum=round(sum(_sentiment_sum(r) for r in records), 4),
+    )
+
+
+def consolidate_records(
+    records: List[SentimentRecord],
+    bucket_minutes: float = CONSOLIDATION_BUCKET_MINUTES,
+) -> List[SentimentRecord]:
+    """Merge *records* sharing a (symbol, platform, time bucket) into one record each.
+
+    A merged record carries the confidence-weighted mean sentiment, the
+    mean confidence, the snippet and rationale of its strongest driver,
+    the contributing source IDs (:func:`compact_source_ids`), the number
+    of records it replaces as ``mention_count`` and the sum of their scores
+    as ``sentiment_sum``. Its ``created_at`` is the bucket start, so it
+    lands in the same rollup bucket as its parts, and
+    ``refresh_sentiment_rollups`` produces the same sums as for the
+    unmerged records (up to the 4-decimal rounding of the stored values).
+    Records alone in their bucket are returned unchanged.
+    """
+    bucket_seconds = int(bucket_minutes * 60)
+    now = datetime.now(timezone.utc)
+    groups: Dict[Tuple[str, Optional[str], int], List[SentimentRecord]] = {}
+    for record in records:
+        created = record.created_at or now
+        bucket = int(created.timestamp()) // bucket_seconds
+        groups.setdefault((record.symbol.upper(), record.source_name, bucket), []).append(record)
+
+    consolidated: List[SentimentRecord] = []
+    for (_, _, bucket), group in groups.items():
+        if len(group) == 1:
+            consolidated.append(group[0])
+        else:
+            start = datetime.fromtimestamp(bucket * bucket_seconds, timezone.utc)
+            consolidated.append(_merge(group, start))
+
+    if len(consolidated) < len(records):
+        log.info(f"Consolidated {len(records)} records into {len(consolidated)}.")
+    return consolidated
@@ -1,9 +1,17 @@
 import json
 import os
-import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from data.manifest import ManifestSnapshot, ProcessingManifest
+from data.merged_context import MergedContext
+from data.storage import Storage
 from utils.logger import get_logger
 from config import (
     DATA_OUTPUT_DIR,
@@ -12,19 +20,76 @@ from config import (
     MERGE_LLM_OUTPUT,
     REMOVE_NON_ASCII,
     COMMENT_LIMIT,
+    MANIFEST_FILE,
+    MERGED_CONTEXT_DIR,
+    FILE_PROCESSING_MODE,
+    PROCESS_POOL_MIN_FILES,
+    PROCESS_POOL_CHUNK_SIZE,
 )
 
 log = get_logger(__name__)
 
+MERGED_CONTEXT_FILENAME = "FULL_CONTEXT.ndjson"
+
+# (file_hash, {post_id: post_hash}, LLM input file written or None)
+FileResult = Tuple[str, Dict[str, str], Optional[Path]]
+# (raw file, FileResult or None if skipped, error)
+ConversionResult = Tuple[Path, Optional[FileResult], Optional[Exception]]
+# What conversion checks files and posts against.
+KnownHashes = Union[ProcessingManifest, ManifestSnapshot]
+
+# Per-process state of conversion workers, installed once by _init_worker so
+# that each submitted chunk carries only its file paths.
+_worker_handler: Optional["DataHandler"] = None
+_worker_known: Optional[ManifestSnapshot] = None
+
+
+def _init_worker(handler: "DataHandler", known: ManifestSnapshot) -> None:
+    global _worker_handler, _worker_known
+    _worker_handler, _worker_known = handler, known
+
+
+def _process_chunk(file_paths: List[Path]) -> List[ConversionResult]:
+    """Process a chunk of raw files inside a worker process.
+
+    Errors are captured per file so one bad file does not discard the
+    results of the rest of the chunk.
+    """
+    results: List[ConversionResult] = []
+    for file_path in file_paths:
+        try:
+            results.append(
+                (file_path, _worker_handler._process_single_file(file_path, _worker_known), None)
+            )
+        except Exception as e:
+            results.append((file_path, None, e))
+    return results
+
 
 class DataHandler:
     def __init__(self):
         self.output_dir: Path = Path(DATA_OUTPUT_DIR)
         self.llm_input_dir: Path = Path(LLM_INPUT_DIR)
-        self.ascii_pattern = re.compile(r"[^\x00-\x7F]+")
+        self.manifest = ProcessingManifest(MANIFEST_FILE)
+        self.storage = Storage()
 
         self._ensure_storage_exists()
 
+    def __getstate__(self) -> dict:
+        # Workers are sent a ManifestSnapshot instead of the full manifest.
+        state = self.__dict__.copy()
+        state["manifest"] = None
+        return state
+
+    @property
+    def pending(self) -> Dict[str, dict]:
+        """LLM input files awaiting analysis (kept in the manifest across runs).
+
+        Recorded as processed by :meth:`mark_analysed` once their results
+        are stored; until then their files are kept for a retry.
+        """
+        return self.manifest.pending
+
     def _ensure_storage_exists(self):
         try:
             self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -37,9 +102,11 @@ class DataHandler:
         if not text:
             return ""
 
-        # Remove emojis and special characters
-        if REMOVE_NON_ASCII:
-            text = self.ascii_pattern.sub("", text)
+        # Remove emojis and special characters. encode/decode with "ignore"
+        # drops every non-ASCII code point in C, and isascii() lets the common
+        # plain-English case skip the copy entirely.
+        if REMOVE_NON_ASCII and not text.isascii():
+            text = text.encode("ascii", "ignore").decode("ascii")
 
         # " ".join(split()) is the fastest way to normalize whitespace in Python
         cleaned = " ".join(text.split())
@@ -54,22 +121,18 @@ class DataHandler:
             return
 
         timestamp_str = datetime.now().strftime("%Y%m%d_%H%M")
-        filename = f"{subreddit_name}_{timestamp_str}.json"
+        filename = f"{subreddit_name}_{timestamp_str}{self.storage.suffix}"
         file_path = self.output_dir / filename
 
-        payload = {
-            "meta": {
-                "subreddit": subreddit_name,
-                "scraped_at": datetime.now().isoformat(),
-                "count": len(posts_data),
-            },
-            "data": posts_data,
+        meta = {
+            "subreddit": subreddit_name,
+            "scraped_at": datetime.now().isoformat(),
+            "count": len(posts_data),
         }
 
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=4, ensure_ascii=False)
-            log.info(f"Saved JSON: {file_path}")
+            self.storage.write(file_path, posts_data, meta=meta)
+            log.info(f"Saved {self.storage.suffix} file: {file_path}")
         except IOError as e:
             log.error(f"Failed to write data to {file_path}: {e}")
 
@@ -98,33 +161,59 @@ class DataHandler:
 
         return {
             "id": post_data.get("id"),
+            "created_utc": post_data.get("created_utc"),
             "title": title,
             "selftext": selftext,
             "score": post_data.get("score", 0),
             "comments": optimized_comments
         }
 
-    def _process_single_file(self, file_path: Path) -> int:
-        """Process one raw JSON file into an LLM-ready JSON file.
+    def _process_single_file(
+        self, file_path: Path, known: Optional[KnownHashes] = None
+    ) -> Optional[FileResult]:
+        """Process one raw file into an LLM-ready file (same storage format).
+
+        Only posts that are new or whose content changed since the last run
+        (according to *known*, by default :attr:`manifest`) are written out.
+        The manifest itself is not modified here, because this may run in a
+        worker process; the caller records the returned hashes.
 
         Returns:
-            1 if the file was processed, 0 if it was skipped (already exists).
+            ``(file_hash, {post_id: post_hash}, written_path)`` if the file
+            was processed, or *None* if its exact content has already been
+            processed. *written_path* is *None* when no post was new.
         """
-        target_json_path = self.llm_input_dir / file_path.name
+        with open(file_path, "rb") as f:
+            raw_bytes = f.read()
 
-        if target_json_path.exists():
+        if known is None:
+            known = self.manifest
+        file_hash = ProcessingManifest.hash_bytes(raw_bytes)
+        if known.has_file(file_hash):
             log.debug(f"Skipping already-processed file: {file_path.name}")
-            return 0
-
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = json.load(f)
-
-        posts = content.get("data", [])
-        file_buffer = [self.optimize_for_llm(post) for post in posts]
-
+            return None
+
+        file_buffer = []
+        post_hashes: Dict[str, str] = {}
+        post_count = 0
+        for post in self.storage.loads_records(raw_bytes):
+            post_count += 1
+            optimized = self.optimize_for_llm(post)
+            post_id = optimized.get("id")
+            post_hash = ProcessingManifest.hash_post(optimized)
+            if known.is_post_changed(post_id, post_hash):
+                file_buffer.append(optimized)
+            if post_id:
+                post_hashes[post_id] = post_hash
+
+        skipped = post_count - len(file_buffer)
+        if skipped:
+            log.debug(f"{file_path.name}: {skipped} unchanged post(s) skipped.")
+
+        target_json_path: Optional[Path] = None
         if file_buffer:
-            with open(target_json_path, "w", encoding="utf-8") as f_out:
-                json.dump(file_buffer, f_out, ensure_ascii=False, indent=2)
+            target_json_path = self.llm_input_dir / file_path.name
+            self.storage.write(target_json_path, file_buffer)
 
         if not KEEP_RAW_JSON:
             try:
@@ -133,63 +222,150 @@ class DataHandler:
             except OSError as e:
                 log.warning(f"Could not delete {file_path.name}: {e}")
 
-        return 1
+        return file_hash, post_hashes, target_json_path
 
-    def process_files_to_json(self) -> None:
-        """Convert raw JSON files in *output_dir* to LLM-ready JSON files.
+    def _use_process_pool(self, file_count: int) -> bool:
+        return (
+            FILE_PROCESSING_MODE.lower() == "process"
+            and file_count >= PROCESS_POOL_MIN_FILES
+        )
 
-        Files are processed in parallel using a :class:`ThreadPoolExecutor`
-        (I/O-bound work). When ``MERGE_LLM_OUTPUT`` is enabled, the merged
-        file is rebuilt from all individual files after processing completes.
-        """
-        json_files: list = list(self.output_dir.glob("*.json"))
+    def _iter_conversion_results(
+        self, json_files: List[Path]
+    ) -> Iterator[ConversionResult]:
+        """Run :meth:`_process_single_file` over *json_files* concurrently.
 
-        if not json_files:
-            log.warning(f"No JSON files found in {self.output_dir}")
+        Yields ``(file_path, result, error)`` tuples as work completes.
+        """
+        executor: Executor
+        if self._use_process_pool(len(json_files)):
+            workers = os.cpu_count() or 1
+            chunk_size = PROCESS_POOL_CHUNK_SIZE or max(
+                1, -(-len(json_files) // (workers * 4))
+            )
+            chunks = [
+                json_files[i:i + chunk_size]
+                for i in range(0, len(json_files), chunk_size)
+            ]
+            log.debug(
+                f"Converting {len(json_files)} files on {workers} processes "
+                f"({len(chunks)} chunks of up to {chunk_size})."
+            )
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self, self.manifest.snapshot()),
+            ) as executor:
+                futures = {executor.submit(_process_chunk, c): c for c in chunks}
+                for future in as_completed(futures):
+                    try:
+                        yield from future.result()
+                    except Exception as e:
+                        # The chunk itself failed (e.g. an unpicklable result).
+                        for fp in futures[future]:
+                            yield fp, None, e
             return
 
-        log.info(f"Scanning {len(json_files)} files for processing...")
-
-        merged_file_path = self.llm_input_dir / "FULL_CONTEXT.json"
-        processed_count = 0
-        skipped_count = 0
-
-        # Process files in parallel — each is an independent I/O-bound task.
+        # Few files (or thread mode) — each is an independent I/O-bound task.
         with ThreadPoolExecutor() as executor:
             futures = {executor.submit(self._process_single_file, fp): fp for fp in json_files}
             for future in as_completed(futures):
                 fp = futures[future]
                 try:
-                    result = future.result()
-                    if result == 1:
-                        processed_count += 1
-                    else:
-                        skipped_count += 1
-                except json.JSONDecodeError:
-                    log.error(f"Skipping invalid JSON: {fp}")
+                    yield fp, future.result(), None
                 except Exception as e:
-                    log.error(f"Error processing {fp}: {e}")
-
-        # Rebuild the merged file from ALL individual files so that incremental
-        # runs accumulate history correctly.
-        if MERGE_LLM_OUTPUT:
-            merged_buffer = []
-            all_input_files = [
-                f for f in self.llm_input_dir.glob("*.json")
-                if f.name != merged_file_path.name
-            ]
-            for input_file in all_input_files:
+                    yield fp, None, e
+
+    def _append_to_merged_context(self, input_files: List[Path]) -> None:
+        """Append the posts of *input_files* to the merged NDJSON context."""
+        merged = MergedContext(Path(MERGED_CONTEXT_DIR) / MERGED_CONTEXT_FILENAME)
+
+        def _iter_posts() -> Iterator[dict]:
+            for input_file in input_files:
                 try:
-                    with open(input_file, "r", encoding="utf-8") as f:
-                        merged_buffer.extend(json.load(f))
+                    yield from self.storage.read_records(input_file)
                 except Exception as e:
                     log.warning(f"Could not read {input_file.name} for merge: {e}")
 
-            if merged_buffer:
-                with open(merged_file_path, "w", encoding="utf-8") as f_out:
-                    json.dump(merged_buffer, f_out, ensure_ascii=False, indent=2)
-                log.info(
-                    f"Rebuilt merged file with {len(merged_buffer)} total items → {merged_file_path}"
-                )
+        appended = merged.append(_iter_posts())
+        log.info(
+            f"Appended {appended} items to merged file ({len(merged)} total) → {merged.data_path}"
+        )
+
+    def process_files_to_json(self) -> List[Path]:
+        """Convert raw files in *output_dir* to LLM-ready files.
+
+        Large batches are spread across a :class:`ProcessPoolExecutor` in
+        chunks, since text cleaning and JSON (de)serialisation are CPU-bound
+        and hold the GIL. Small batches, or ``FILE_PROCESSING_MODE = "thread"``,
+        use a :class:`ThreadPoolExecutor`. When ``MERGE_LLM_OUTPUT`` is
+        enabled, the posts written this run are appended to the merged
+        NDJSON context (see :class:`~data.merged_context.MergedContext`).
+
+        Files that produced LLM input are only added to :attr:`pending`; the
+        caller records them with :meth:`mark_analysed` once their analysis
+        is stored, so a failed LLM call leaves them eligible next run (the
+        pipeline keeps their LLM input files for the retry).
+
+        Returns:
+            The LLM input files written.
+        """
+        json_files: list = self.storage.glob(self.output_dir)
+
+        if not json_files:
+            log.warning(f"No {self.storage.suffix} files found in {self.output_dir}")
+            return []
+
+        log.info(f"Scanning {len(json_files)} files for processing...")
+
+        processed_count = 0
+        skipped_count = 0
+        recorded_count = 0
+        written_files: List[Path] = []
+
+        for fp, result, error in self._iter_conversion_results(json_files):
+            if isinstance(error, json.JSONDecodeError):
+                log.error(f"Skipping invalid JSON: {fp}")
+            elif error is not None:
+                log.error(f"Error processing {fp}: {error}")
+            elif result is not None:
+                file_hash, post_hashes, written_path = result
+                if written_path is not None:
+                    self.manifest.add_pending(written_path.name, file_hash, post_hashes)
+                    written_files.append(written_path)
+                else:
+                    # Nothing new to analyse, so the file is already done.
+                    self.manifest.record(file_hash, post_hashes)
+                    recorded_count += 1
+                processed_count += 1
+            else:
+                skipped_count += 1
+
+        if recorded_count or written_files:
+            self.manifest.save()
+
+        # Append only this run's new files; earlier history is already there.
+        if MERGE_LLM_OUTPUT and written_files:
+            self._append_to_merged_context(sorted(written_files))
 
         log.info(f"Processing complete. Processed: {processed_count}, Skipped: {skipped_count}.")
+        return written_files
+
+    def mark_analysed(self, file_names: Iterable[str]) -> int:
+        """Record pending LLM input files as processed in the manifest and save it.
+
+        Call only once the files' records are stored (outbox or database).
+        Returns the number of files recorded.
+        """
+        recorded = sum(self.manifest.confirm(name) for name in file_names)
+        if recorded:
+            self.manifest.save()
+        return recorded
+
+    def discard_pending(self) -> None:
+        """Forget pending files whose LLM input no longer exists (e.g. deleted by hand)."""
+        missing = [name for name in self.pending if not (self.llm_input_dir / name).exists()]
+        for name in missing:
+            del self.pending[name]
+        if missing:
+            self.manifest.save()
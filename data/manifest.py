@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+from config import MANIFEST_FILE, MANIFEST_RETENTION_DAYS
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ManifestSnapshot:
+    """Read-only copy of the hashes a :class:`ProcessingManifest` knows.
+
+    Holds only what conversion looks up, so it is cheap to send to worker
+    processes; it answers :meth:`has_file` and :meth:`is_post_changed` like
+    the manifest it was taken from.
+    """
+
+    files: FrozenSet[str]
+    posts: Mapping[str, str]  # post id -> content hash
+
+    def has_file(self, file_hash: str) -> bool:
+        return file_hash in self.files
+
+    def is_post_changed(self, post_id: Optional[str], post_hash: str) -> bool:
+        return not post_id or self.posts.get(post_id) != post_hash
+
+
+class ProcessingManifest:
+    """Persistent content-hash record of what has already been converted.
+
+    Raw files are tracked by the hash of their bytes, so an identical
+    re-scrape under a new timestamped filename is skipped, while a changed
+    file under an old name is picked up again. Posts are tracked by ID and
+    the hash of their text content, so only new or edited posts are passed
+    on to the LLM.
+
+    LLM input files written but not yet analysed are kept in :attr:`pending`
+    (persisted with the manifest) until :meth:`confirm` records them, so a
+    failed analysis is retried by a later run, even after a restart.
+    """
+
+    def __init__(self, path: str = MANIFEST_FILE) -> None:
+        self.path = Path(path)
+        self.files: Dict[str, str] = {}             # file hash -> last seen date
+        self.posts: Dict[str, Dict[str, str]] = {}  # post id -> {"hash", "seen"}
+        self.pending: Dict[str, Dict[str, Any]] = {}  # LLM input file -> {"file", "posts", "seen"}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Hashing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def hash_post(post: Dict[str, Any]) -> str:
+        """Hash the text content of an LLM-ready post.
+
+        Scores are deliberately excluded: upvotes drift between scrapes and
+        would otherwise make every post look changed.
+        """
+        content = [
+            post.get("title") or "",
+            post.get("selftext") or "",
+            [[c.get("id"), c.get("body")] for c in post.get("comments", [])],
+        ]
+        encoded = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def has_file(self, file_hash: str) -> bool:
+        return file_hash in self.files
+
+    def is_post_changed(self, post_id: Optional[str], post_hash: str) -> bool:
+        """Return True if *post_id* is unknown or its content hash differs."""
+        if not post_id:
+            return True
+        entry = self.posts.get(post_id)
+        return entry is None or entry["hash"] != post_hash
+
+    def snapshot(self) -> ManifestSnapshot:
+        """Return the known file and post hashes, detached from this manifest."""
+        return ManifestSnapshot(
+            frozenset(self.files),
+            {post_id: entry["hash"] for post_id, entry in self.posts.items()},
+        )
+
+    # ------------------------------------------------------------------
+    # Updates & persistence
+    # ------------------------------------------------------------------
+
+    def record(self, file_hash: str, post_hashes: Dict[str, str]) -> None:
+        """Mark a raw file and the posts it produced as processed."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.files[file_hash] = today
+        for post_id, post_hash in post_hashes.items():
+            self.posts[post_id] = {"hash": post_hash, "seen": today}
+
+    def add_pending(self, input_name: str, file_hash: str, post_hashes: Dict[str, str]) -> None:
+        """Hold back a raw file's hashes until the LLM input *input_name* is analysed."""
+        self.pending[input_name] = {
+            "file": file_hash,
+            "posts": post_hashes,
+            "seen": datetime.now().strftime("%Y-%m-%d"),
+        }
+
+    def confirm(self, input_name: str) -> bool:
+        """Record the pending entry of *input_name*; False if there is none."""
+        entry = self.pending.pop(input_name, None)
+        if entry is None:
+            return False
+        self.record(entry["file"], entry["posts"])
+        return True
+
+    def prune(self, retention_days: int = MANIFEST_RETENTION_DAYS) -> None:
+        """Drop entries not seen within *retention_days* to bound file size.
+
+        Pending files that keep failing are given up on the same way.
+        """
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
+        self.files = {h: seen for h, seen in self.files.items() if seen >= cutoff}
+        self.posts = {p: e for p, e in self.posts.items() if e["seen"] >= cutoff}
+        self.pending = {n: e for n, e in self.pending.items() if e["seen"] >= cutoff}
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.posts = data.get("posts", {})
+            self.pending = data.get("pending", {})
+            log.debug(
+                f"Loaded manifest with {len(self.files)} files and {len(self.posts)} posts."
+            )
+        except Exception as e:
+            log.error(f"Failed to load manifest {self.path}, starting fresh: {e}")
+
+    def save(self) -> None:
+        """Write the manifest atomically so a crash never leaves it truncated."""
+        self.prune()
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"files": self.files, "posts": self.posts, "pending": self.pending},
+                    f,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            log.error(f"Failed to save manifest {self.path}: {e}")
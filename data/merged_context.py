@@ -0,0 +1,117 @@
+import json
+import mmap
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+_OFFSET_TYPECODE = "Q"  # unsigned 64-bit byte offsets
+_OFFSET_SIZE = array(_OFFSET_TYPECODE).itemsize
+
+
+class MergedContext:
+    """Append-only NDJSON store of every LLM-ready post, with an offset index.
+
+    The data file holds one JSON object per line. A sidecar ``.idx`` file
+    holds the end offset of every record as packed unsigned 64-bit integers,
+    so record *i* spans ``[end[i-1], end[i])``. Appending new posts is
+    O(new data), and readers can stream the file line by line or fetch any
+    record directly from a memory map without parsing the rest.
+    """
+
+    def __init__(self, data_path: Path) -> None:
+        self.data_path = Path(data_path)
+        self.index_path = self.data_path.with_suffix(self.data_path.suffix + ".idx")
+
+    # ------------------------------------------------------------------
+    # Index helpers
+    # ------------------------------------------------------------------
+
+    def _read_index(self) -> array:
+        offsets = array(_OFFSET_TYPECODE)
+        if self.index_path.exists():
+            with open(self.index_path, "rb") as f:
+                offsets.frombytes(f.read())
+        return offsets
+
+    def _indexed_end(self) -> int:
+        """Return the end offset of the last indexed record (0 if empty)."""
+        if not self.index_path.exists():
+            return 0
+        size = self.index_path.stat().st_size
+        if size < _OFFSET_SIZE:
+            return 0
+        with open(self.index_path, "rb") as f:
+            f.seek(size - size % _OFFSET_SIZE - _OFFSET_SIZE)
+            last = array(_OFFSET_TYPECODE)
+            last.frombytes(f.read(_OFFSET_SIZE))
+        return last[0]
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append *records* and their offsets. Returns the number appended.
+
+        Data is written before the index, so a crash mid-append leaves at most
+        an unindexed tail, which is truncated away on the next append.
+        """
+        indexed_end = self._indexed_end()
+        new_offsets = array(_OFFSET_TYPECODE)
+
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.data_path, "ab") as f:
+            if f.tell() != indexed_end:
+                log.warning(
+                    f"Truncating {f.tell() - indexed_end} unindexed bytes from {self.data_path.name}."
+                )
+                f.truncate(indexed_end)
+                f.seek(indexed_end)
+            for record in records:
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+                f.write(line.encode("utf-8") + b"\n")
+                new_offsets.append(f.tell())
+            f.flush()
+            os.fsync(f.fileno())
+
+        if new_offsets:
+            with open(self.index_path, "ab") as f_idx:
+                new_offsets.tofile(f_idx)
+        return len(new_offsets)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        if not self.index_path.exists():
+            return 0
+        return self.index_path.stat().st_size // _OFFSET_SIZE
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Stream every indexed record without loading the file whole."""
+        remaining = len(self)
+        if not remaining:
+            return
+        with open(self.data_path, "rb") as f:
+            for line in f:
+                if remaining == 0:
+                    break
+                remaining -= 1
+                yield json.loads(line)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        """Fetch record *i* via a memory map of the data file."""
+        offsets = self._read_index()
+        if i < 0:
+            i += len(offsets)
+        if not 0 <= i < len(offsets):
+            raise IndexError(f"record {i} out of range ({len(offsets)} records)")
+        start = offsets[i - 1] if i else 0
+        with open(self.data_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return json.loads(mm[start:offsets[i]])
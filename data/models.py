@@ -4,6 +4,19 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Dict, Literal, Optional
 
+from config import SENTIMENT_LABEL_THRESHOLD
+
+
+def sentiment_label(
+    score: float, threshold: float = SENTIMENT_LABEL_THRESHOLD
+) -> Literal["BUY", "SELL", "NEUTRAL"]:
+    """Label a (weighted) sentiment score: BUY above +threshold, SELL below -threshold."""
+    if score > threshold:
+        return "BUY"
+    if score < -threshold:
+        return "SELL"
+    return "NEUTRAL"
+
 
 @dataclass
 class SentimentRecord:
@@ -26,6 +39,12 @@ class SentimentRecord:
     # (e.g. 'reddit', 'twitter') so their IDs never collide.
     source_id: Optional[str] = field(default=None)    # post ID or batch filename
     source_name: Optional[str] = field(default=None)  # platform name
+    # Records merged into this one by data/consolidation.py; rollups count
+    # the record this many times.
+    mention_count: int = field(default=1)
+    # Sum of the merged records' scores, which a weighted mean cannot give
+    # back; None means sentiment_score * mention_count.
+    sentiment_sum: Optional[float] = field(default=None)
 
     def __post_init__(self) -> None:
         if not (-1.0 <= self.sentiment_score <= 1.0):
@@ -36,6 +55,8 @@ class SentimentRecord:
             raise ValueError(
                 f"sentiment_confidence {self.sentiment_confidence} out of range [0.0, 1.0]"
             )
+        if self.mention_count < 1:
+            raise ValueError(f"mention_count {self.mention_count} must be at least 1")
 
     # ------------------------------------------------------------------
     # Constructors
@@ -94,4 +115,50 @@ class SentimentRecord:
             "key_rationale": self.key_rationale,
             "source_text_id": self.source_text_id,
             "source_text_snippet": self.source_text_snippet,
+            "mention_count": self.mention_count,
+            "sentiment_sum": self.sentiment_sum,
         }
+
+
+@dataclass
+class TextSentiment:
+    """Sentiment of one post or comment towards one symbol, as rated by the LLM.
+
+    The LLM rates texts individually; engagement weighting and
+    aggregation per symbol happen locally (:mod:`LLM.aggregation`).
+    """
+
+    text_id: str
+    symbol: str
+    sentiment_score: float
+    sentiment_confidence: float
+    snippet: Optional[str] = field(default=None)
+    rationale: Optional[str] = field(default=None)
+
+    def __post_init__(self) -> None:
+        if not (-1.0 <= self.sentiment_score <= 1.0):
+            raise ValueError(
+                f"sentiment {self.sentiment_score} out of range [-1.0, 1.0]"
+            )
+        if not (0.0 <= self.sentiment_confidence <= 1.0):
+            raise ValueError(
+                f"confidence {self.sentiment_confidence} out of range [0.0, 1.0]"
+            )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> TextSentiment:
+        """Construct a :class:`TextSentiment` from a raw per-text LLM output dict.
+
+        Raises:
+            KeyError:   If a required field is absent.
+            ValueError: If a numeric field is out of its valid range.
+            TypeError:  If a field cannot be coerced to the expected type.
+        """
+        return cls(
+            text_id=str(data["text_id"]),
+            symbol=str(data["symbol"]),
+            sentiment_score=float(data["sentiment"]),
+            sentiment_confidence=float(data.get("confidence", 0.5)),
+            snippet=str(data["snippet"]) if data.get("snippet") else None,
+            rationale=str(data["rationale"]) if data.get("rationale") else None,
+        )
@@ -111,6 +111,7 @@ class RedditClient:
                     comments = await self.get_comments(post.id)
                     post_data = {
                         "id": post.id,
+                        "created_utc": post.created_utc,
                         "title": post.title,
                         "score": post.score,
                         "flair": getattr(post, "link_flair_text", None),
@@ -0,0 +1,211 @@
+import io
+import json
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from config import STORAGE_COMPRESSION, STORAGE_FORMAT, ZSTD_LEVEL
+from utils.logger import get_logger
+
+try:
+    import msgpack
+except ImportError:  # Only required for STORAGE_FORMAT = "msgpack"
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Only required for STORAGE_COMPRESSION = "zstd"
+    zstandard = None
+
+log = get_logger(__name__)
+
+# Header key used by the streaming formats to carry file-level metadata in
+# the first record, ahead of the data records.
+META_KEY = "__meta__"
+
+
+# ---------------------------------------------------------------------------
+# Formats
+# ---------------------------------------------------------------------------
+
+class StorageFormat(ABC):
+    """Serialisation of a sequence of dict records to a binary stream."""
+
+    extension: str
+
+    @abstractmethod
+    def dump(
+        self, fp: BinaryIO, records: Iterable[Dict[str, Any]], meta: Optional[Dict[str, Any]]
+    ) -> None:
+        """Write *meta* (if any) followed by *records* to *fp*."""
+
+    @abstractmethod
+    def load(self, fp: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """Yield the data records from *fp*, skipping any metadata header."""
+
+
+class JsonFormat(StorageFormat):
+    """A single JSON document: ``{"meta": ..., "data": [...]}`` or a bare list.
+
+    Not streamable, but readable by anything; kept as the default so existing
+    files remain compatible.
+    """
+
+    extension = ".json"
+
+    def dump(self, fp, records, meta):
+        data = list(records)
+        payload: Any = {"meta": meta, "data": data} if meta is not None else data
+        fp.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def load(self, fp):
+        payload = json.load(fp)
+        if isinstance(payload, dict):
+            payload = payload.get("data", [])
+        yield from payload
+
+
+class NdjsonFormat(StorageFormat):
+    """One compact JSON object per line, written and read record by record."""
+
+    extension = ".ndjson"
+
+    def dump(self, fp, records, meta):
+        if meta is not None:
+            fp.write(json.dumps({META_KEY: meta}, ensure_ascii=False).encode("utf-8") + b"\n")
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            fp.write(line.encode("utf-8") + b"\n")
+
+    def load(self, fp):
+        for line in fp:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if META_KEY in record:
+                continue
+            yield record
+
+
+class MsgpackFormat(StorageFormat):
+    """A stream of concatenated MessagePack objects."""
+
+    extension = ".msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError("STORAGE_FORMAT 'msgpack' requires the 'msgpack' package.")
+
+    def dump(self, fp, records, meta):
+        packer = msgpack.Packer()
+        if meta is not None:
+            fp.write(packer.pack({META_KEY: meta}))
+        for record in records:
+            fp.write(packer.pack(record))
+
+    def load(self, fp):
+        for record in msgpack.Unpacker(fp, raw=False):
+            if isinstance(record, dict) and META_KEY in record:
+                continue
+            yield record
+
+
+FORMATS = {
+    "json": JsonFormat,
+    "ndjson": NdjsonFormat,
+    "msgpack": MsgpackFormat,
+}
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+class Storage:
+    """Reads and writes record files in the configured format and compression.
+
+    Switching ``STORAGE_FORMAT`` / ``STORAGE_COMPRESSION`` in ``config.py``
+    changes how ``stock_data/raw_json`` and ``stock_data/llm_input`` are
+    stored; files are identified by their combined suffix (e.g.
+    ``.ndjson.zst``), so only files in the active format are picked up.
+    """
+
+    def __init__(
+        self,
+        fmt: str = STORAGE_FORMAT,
+        compression: Optional[str] = STORAGE_COMPRESSION,
+    ) -> None:
+        fmt = fmt.lower()
+        if fmt not in FORMATS:
+            raise ValueError(
+                f"Invalid STORAGE_FORMAT: {fmt}. Available options: {list(FORMATS.keys())}"
+            )
+        if compression not in (None, "zstd"):
+            raise ValueError(f"Invalid STORAGE_COMPRESSION: {compression}. Options: None, 'zstd'")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("STORAGE_COMPRESSION 'zstd' requires the 'zstandard' package.")
+
+        self.format: StorageFormat = FORMATS[fmt]()
+        self.compression = compression
+
+    @property
+    def suffix(self) -> str:
+        return self.format.extension + (".zst" if self.compression == "zstd" else "")
+
+    def stem(self, path: Path) -> str:
+        """Return the file name of *path* without the storage suffix."""
+        name = path.name
+        return name[: -len(self.suffix)] if name.endswith(self.suffix) else path.stem
+
+    def glob(self, directory: Path) -> List[Path]:
+        """List the files in *directory* stored in the active format."""
+        return list(directory.glob(f"*{self.suffix}"))
+
+    # ------------------------------------------------------------------
+    # Compression wrappers
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _writer(self, path: Path) -> Iterator[BinaryIO]:
+        with open(path, "wb") as f:
+            if self.compression == "zstd":
+                compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+                with compressor.stream_writer(f, closefd=False) as zf:
+                    yield zf
+            else:
+                yield f
+
+    def _reader(self, fp: BinaryIO) -> BinaryIO:
+        if self.compression == "zstd":
+            # BufferedReader adds the readline/iteration the NDJSON reader needs.
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(fp))
+        return fp
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def write(
+        self,
+        path: Path,
+        records: Iterable[Dict[str, Any]],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Stream *records* (preceded by optional *meta*) to *path*."""
+        with self._writer(path) as fp:
+            self.format.dump(fp, records, meta)
+
+    def read_records(self, path: Path) -> Iterator[Dict[str, Any]]:
+        """Yield the data records of *path* one at a time."""
+        with open(path, "rb") as f:
+            yield from self.format.load(self._reader(f))
+
+    def loads_records(self, raw: bytes) -> Iterator[Dict[str, Any]]:
+        """Yield the data records of a file already read into memory as *raw*."""
+        yield from self.format.load(self._reader(io.BytesIO(raw)))
+
+    def read_text(self, path: Path) -> str:
+        """Return the records of *path* as a compact JSON array string (LLM input)."""
+        return json.dumps(list(self.read_records(path)), ensure_ascii=False, separators=(",", ":"))
+
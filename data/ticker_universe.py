@@ -0,0 +1,165 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Final, List, Optional, Sequence, TypeVar
+
+from config import TICKER_UNIVERSE_FILE, TICKER_UNIVERSE_STRICT
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Asset type for tickers the universe does not know (and when it is disabled).
+DEFAULT_ASSET_TYPE: Final[str] = "Stock"
+
+# Trailing words ignored when matching company names ("Apple Inc." == "apple").
+_NAME_SUFFIXES: Final[frozenset] = frozenset({
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "plc", "llc", "sa", "nv", "ag", "holdings", "holding", "group",
+})
+_NON_ALNUM = re.compile(r"[^a-z0-9 ]+")
+# What an unknown symbol must look like (after clean_symbol) to be kept in
+# lenient mode: 1-5 letters, optionally a share class.
+_TICKER_SHAPE = re.compile(r"^[A-Z]{1,5}(\.[A-Z])?$")
+# Ticker-shaped words that LLMs extract but that are not listed assets.
+_NOT_TICKERS: Final[frozenset] = frozenset({
+    "FED", "FOMC", "SEC", "CEO", "CFO", "IPO", "ETF", "EPS", "GDP", "CPI", "PPI",
+    "USA", "USD", "ATH", "YOLO", "FOMO", "IMO",
+})
+
+
+def normalise_name(name: str) -> str:
+    """Canonical form of a company/asset name or alias for lookups.
+
+    Lower-cased without punctuation, a leading "the" or corporate suffixes,
+    and with spaces removed, so "Coca-Cola", "coca cola" and "The Coca-Cola
+    Company" all match.
+    """
+    words = _NON_ALNUM.sub(" ", name.lower().replace("&", " and ").replace("'", "")).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    while len(words) > 1 and words[-1] in _NAME_SUFFIXES:
+        words.pop()
+    return "".join(words)
+
+
+def clean_symbol(symbol: str) -> str:
+    """Strip ``$`` prefixes and whitespace, upper-case, and use ``.`` for share classes."""
+    return re.sub(r"[/\-]", ".", symbol.strip().lstrip("$").strip().upper())
+
+
+def looks_like_ticker(symbol: str) -> bool:
+    """True if *symbol* could plausibly be a ticker the universe does not list.
+
+    It must be 1-5 letters (plus an optional share class), not a common
+    finance acronym, and written in capitals unless it is a ``$`` cashtag,
+    so names such as "The Market" or "Tesla" are rejected.
+    """
+    raw = symbol.strip()
+    cashtag = raw.startswith("$")
+    raw = raw.lstrip("$").strip()
+    ticker = clean_symbol(raw)
+    if not _TICKER_SHAPE.match(ticker) or ticker in _NOT_TICKERS:
+        return False
+    return cashtag or raw == raw.upper()
+
+
+class TickerUniverse:
+    """Known tickers plus an alias table, for validating LLM-produced symbols.
+
+    Built from a pipe-delimited file (``TICKER|TYPE|Name|alias;alias``);
+    every name and alias maps to its ticker. Lookups are two dict probes.
+    """
+
+    def __init__(self, asset_types: Dict[str, str], aliases: Dict[str, str]) -> None:
+        self.asset_types = asset_types   # ticker -> asset type
+        self.aliases = aliases           # normalised name/alias -> ticker
+
+    @classmethod
+    def load(cls, path: str) -> "TickerUniverse":
+        asset_types: Dict[str, str] = {}
+        aliases: Dict[str, str] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split("|")
+                if len(parts) < 2:
+                    log.warning(f"{path}:{line_no}: expected 'TICKER|TYPE|Name|aliases', skipping.")
+                    continue
+                ticker = clean_symbol(parts[0])
+                asset_types.setdefault(ticker, parts[1].strip() or DEFAULT_ASSET_TYPE)
+                names = parts[2:3] + (parts[3].split(";") if len(parts) > 3 else [])
+                for name in names:
+                    key = normalise_name(name)
+                    if key:
+                        aliases.setdefault(key, ticker)
+        log.info(f"Loaded ticker universe: {len(asset_types)} tickers, {len(aliases)} aliases.")
+        return cls(asset_types, aliases)
+
+    def __len__(self) -> int:
+        return len(self.asset_types)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.asset_types
+
+    def asset_type(self, ticker: str) -> str:
+        """The universe's asset type for *ticker* (``Stock`` if it is unknown)."""
+        return self.asset_types.get(ticker, DEFAULT_ASSET_TYPE)
+
+    def normalise(self, symbol: str) -> Optional[str]:
+        """Return the canonical ticker for *symbol*, or None if it is unknown."""
+        ticker = clean_symbol(symbol)
+        if ticker in self.asset_types:
+            return ticker
+        return self.aliases.get(normalise_name(symbol))
+
+    def filter(self, items: Sequence[T], strict: bool = TICKER_UNIVERSE_STRICT) -> List[T]:
+        """Rewrite the ``symbol`` of *items* to canonical tickers, dropping unknown ones.
+
+        With *strict* off, unknown symbols that :func:`looks_like_ticker`
+        are kept (cleaned) and logged; the rest are still dropped.
+        """
+        kept: List[T] = []
+        unknown: Dict[str, int] = {}
+        dropped = 0
+        for item in items:
+            ticker = self.normalise(item.symbol)
+            if ticker is None:
+                unknown[item.symbol] = unknown.get(item.symbol, 0) + 1
+                if strict or not looks_like_ticker(item.symbol):
+                    dropped += 1
+                    continue
+                ticker = clean_symbol(item.symbol)
+            item.symbol = ticker
+            kept.append(item)
+        if unknown:
+            total = sum(unknown.values())
+            log.warning(
+                f"{total} item(s) with unknown symbols ({dropped} dropped, {total - dropped} kept): "
+                f"{sorted(unknown)[:20]}"
+            )
+        return kept
+
+
+@lru_cache(maxsize=None)
+def get_ticker_universe(path: Optional[str] = TICKER_UNIVERSE_FILE) -> Optional[TickerUniverse]:
+    """The universe from *path*, loaded once per process (None if disabled or unreadable)."""
+    if not path:
+        return None
+    if not Path(path).exists():
+        log.warning(f"Ticker universe file not found: {path}. Symbols will not be validated.")
+        return None
+    try:
+        return TickerUniverse.load(path)
+    except OSError as e:
+        log.error(f"Failed to load ticker universe '{path}': {e}")
+        return None
+
+
+def asset_type_of(ticker: str) -> str:
+    """Asset type to store for *ticker*, from the configured universe if any."""
+    universe = get_ticker_universe()
+    return universe.asset_type(ticker) if universe else DEFAULT_ASSET_TYPE
@@ -0,0 +1,276 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+from postgrest.exceptions import APIError
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+from config import (
+    DB_HTTP_KEEPALIVE_EXPIRY,
+    DB_HTTP_MAX_CONNECTIONS,
+    DB_HTTP_TIMEOUT,
+    ID_CACHE_MAX_SIZE,
+    PROCESSED_POST_LOOKUP_BATCH,
+    SUPABASE_KEY,
+    SUPABASE_URL,
+)
+from data.ticker_universe import asset_type_of
+from database.batching import InsertReport, chunk_rows, insert_chunked_async, is_row_error
+from database.client_base import (
+    COL_ASSET_ID,
+    COL_ASSET_TYPE,
+    COL_PLATFORM_ID,
+    COL_POST_ID,
+    COL_SOURCE_NAME,
+    COL_TICKER,
+    MENTION_CONFLICT_COLUMNS,
+    TABLE_ASSETS,
+    TABLE_MENTIONS,
+    TABLE_PLATFORMS,
+    TABLE_PROCESSED_POSTS,
+    AsyncCachedClient,
+    IdRows,
+)
+from database.rollups import RPC_REFRESH_ROLLUPS, touched_buckets
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class AsyncSupabaseClient(AsyncCachedClient):
+    """Async counterpart of :class:`~database.supabase_client.SupabaseClient`.
+
+    All requests share one pooled, keep-alive :class:`httpx.AsyncClient`, so
+    independent queries (platform resolution, asset prefetch, mention insert
+    chunks) run concurrently on the event loop instead of as sequential
+    blocking round-trips on a worker thread.
+
+    Use :meth:`create` to construct, and close with :meth:`aclose` or
+    ``async with``::
+
+        async with await AsyncSupabaseClient.create() as db_client:
+            await db_client.insert_analysis(records, "Reddit")
+    """
+
+    def __init__(self, client: AsyncClient, http_client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.http_client = http_client
+        self._init_caches(SUPABASE_URL)
+
+    @classmethod
+    async def create(cls) -> "AsyncSupabaseClient":
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            log.critical("SUPABASE_URL or SUPABASE_KEY not set in environment or config.")
+            raise ValueError("Missing Supabase configuration.")
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=DB_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=DB_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=DB_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=DB_HTTP_TIMEOUT,
+            follow_redirects=True,
+            http2=True,
+        )
+        try:
+            client = await acreate_client(
+                SUPABASE_URL,
+                SUPABASE_KEY,
+                options=AsyncClientOptions(httpx_client=http_client),
+            )
+            log.info("Async Supabase client initialised successfully.")
+        except Exception as e:
+            await http_client.aclose()
+            log.critical(f"Failed to initialise async Supabase client: {e}")
+            raise
+        return cls(client, http_client)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections."""
+        await self.http_client.aclose()
+
+    async def __aenter__(self) -> "AsyncSupabaseClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _build_query(self, table: str, criteria: Dict[str, Any]) -> Any:
+        """Build a chainable Supabase select query filtered by *criteria*."""
+        query = self.client.table(table).select("*")
+        for key, value in criteria.items():
+            query = query.eq(key, value)
+        return query
+
+    async def _get_or_create(
+        self,
+        table: str,
+        search_criteria: Dict[str, Any],
+        insert_data: Dict[str, Any],
+        id_column: str,
+    ) -> Optional[int]:
+        """Retrieve the ID of an existing record or create a new one.
+
+        Returns:
+            The integer ID of the found or created record, or *None* if the
+            insert returned no data. Query errors other than a lost insert
+            race are raised.
+        """
+        response = await self._build_query(table, search_criteria).execute()
+
+        if response.data:
+            return int(response.data[0].get(id_column))
+
+        try:
+            insert_response = await self.client.table(table).insert(insert_data).execute()
+            if insert_response.data:
+                log.info(f"Created new record in '{table}': {insert_data}")
+                return int(insert_response.data[0].get(id_column))
+        except APIError as insert_error:
+            # Handle race condition: another process may have inserted first.
+            log.warning(
+                f"Insert failed for '{table}', retrying fetch: {insert_error}"
+            )
+            retry_response = await self._build_query(table, search_criteria).execute()
+            if retry_response.data:
+                return int(retry_response.data[0].get(id_column))
+            raise insert_error
+        return None
+
+    async def _prefetch_asset_ids(self, tickers: List[str]) -> Dict[str, int]:
+        """Fetch all known asset IDs for *tickers* in a single SELECT query."""
+        if not tickers:
+            return {}
+        response = await (
+            self.client.table(TABLE_ASSETS)
+            .select(f"{COL_TICKER}, {COL_ASSET_ID}")
+            .in_(COL_TICKER, tickers)
+            .execute()
+        )
+        return {
+            row[COL_TICKER]: int(row[COL_ASSET_ID])
+            for row in (response.data or [])
+        }
+
+    async def _insert_mentions(self, chunk: List[Dict[str, Any]]) -> None:
+        await self.client.table(TABLE_MENTIONS).upsert(
+            chunk, on_conflict=",".join(MENTION_CONFLICT_COLUMNS)
+        ).execute()
+
+    # ------------------------------------------------------------------
+    # Transport hooks (see database/client_base.py)
+    # ------------------------------------------------------------------
+
+    async def _fetch_id_rows(self) -> Tuple[IdRows, IdRows]:
+        platforms, assets = await asyncio.gather(
+            self.client.table(TABLE_PLATFORMS)
+            .select(f"{COL_SOURCE_NAME}, {COL_PLATFORM_ID}")
+            .execute(),
+            self.client.table(TABLE_ASSETS)
+            .select(f"{COL_TICKER}, {COL_ASSET_ID}")
+            .limit(ID_CACHE_MAX_SIZE)
+            .execute(),
+        )
+        return (
+            [(row[COL_SOURCE_NAME], row[COL_PLATFORM_ID]) for row in (platforms.data or [])],
+            [(row[COL_TICKER], row[COL_ASSET_ID]) for row in (assets.data or [])],
+        )
+
+    async def _lookup_platform_id(self, platform_name: str) -> Optional[int]:
+        return await self._get_or_create(
+            table=TABLE_PLATFORMS,
+            search_criteria={COL_SOURCE_NAME: platform_name},
+            insert_data={COL_SOURCE_NAME: platform_name},
+            id_column=COL_PLATFORM_ID,
+        )
+
+    async def _resolve_asset_ids(self, tickers: List[str]) -> Dict[str, int]:
+        """Pre-fetch *tickers* in one round-trip and bulk-create the missing ones."""
+        asset_ids = await self._prefetch_asset_ids(tickers)
+        missing_tickers = [t for t in tickers if t not in asset_ids]
+        if not missing_tickers:
+            return asset_ids
+
+        insert_data = [{COL_TICKER: t, COL_ASSET_TYPE: asset_type_of(t)} for t in missing_tickers]
+        try:
+            await self.client.table(TABLE_ASSETS).upsert(
+                insert_data,
+                on_conflict=COL_TICKER,
+                ignore_duplicates=True,
+            ).execute()
+            log.info(f"Bulk upserted {len(missing_tickers)} new assets.")
+            asset_ids.update(await self._prefetch_asset_ids(missing_tickers))
+        except Exception as e:
+            # Only a row-level refusal (one bad ticker) is worth working
+            # around; outages and schema/auth errors fail the whole batch.
+            if not is_row_error(e):
+                raise
+            log.error(
+                f"Failed to bulk upsert assets: {e}. Falling back to individual creation."
+            )
+            created = await asyncio.gather(*(
+                self._get_or_create(
+                    table=TABLE_ASSETS,
+                    search_criteria={COL_TICKER: ticker},
+                    insert_data={COL_TICKER: ticker, COL_ASSET_TYPE: asset_type_of(ticker)},
+                    id_column=COL_ASSET_ID,
+                )
+                for ticker in missing_tickers
+            ), return_exceptions=True)
+            for ticker, asset_id in zip(missing_tickers, created):
+                if isinstance(asset_id, BaseException):
+                    if not is_row_error(asset_id):
+                        raise asset_id
+                    log.error(f"Database rejected asset '{ticker}': {asset_id}")
+                elif asset_id:
+                    asset_ids[ticker] = asset_id
+        return asset_ids
+
+    async def _insert_mention_rows(self, rows: List[Dict[str, Any]]) -> InsertReport:
+        """Send mention chunks in parallel over the connection pool.
+
+        See :func:`~database.batching.insert_chunked_async`.
+        """
+        return await insert_chunked_async(self._insert_mentions, rows)
+
+    async def _lookup_processed(self, source_name: str, post_ids: List[str]) -> Set[str]:
+        """Check *post_ids* with batched ``post_id IN (...)`` queries sent concurrently."""
+
+        async def _lookup(batch: List[str]) -> Set[str]:
+            response = await (
+                self.client.table(TABLE_PROCESSED_POSTS)
+                .select(COL_POST_ID)
+                .eq(COL_SOURCE_NAME, source_name)
+                .in_(COL_POST_ID, batch)
+                .execute()
+            )
+            return {row[COL_POST_ID] for row in (response.data or [])}
+
+        found = await asyncio.gather(
+            *(_lookup(b) for b in chunk_rows(post_ids, PROCESSED_POST_LOOKUP_BATCH, None))
+        )
+        return set().union(*found)
+
+    async def _insert_processed(self, post_ids: List[str], source_name: str) -> None:
+        await self.client.table(TABLE_PROCESSED_POSTS).upsert(
+            [{COL_POST_ID: pid, COL_SOURCE_NAME: source_name} for pid in post_ids],
+            on_conflict=f"{COL_POST_ID},{COL_SOURCE_NAME}",
+            ignore_duplicates=True,
+        ).execute()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def refresh_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        """Re-aggregate the sentiment rollup buckets touched by *rows*."""
+        try:
+            await self.client.rpc(RPC_REFRESH_ROLLUPS, touched_buckets(rows)).execute()
+            log.info("Refreshed sentiment rollups for the inserted buckets.")
+        except Exception as e:
+            log.error(f"Failed to refresh sentiment rollups: {e}")
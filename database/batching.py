@@ -0,0 +1,292 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import psycopg
+from postgrest.exceptions import APIError
+
+from config import (
+    MENTION_INSERT_BACKOFF,
+    MENTION_INSERT_CHUNK_BYTES,
+    MENTION_INSERT_CHUNK_ROWS,
+    MENTION_INSERT_CONCURRENCY,
+    MENTION_INSERT_RETRIES,
+)
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+Row = Dict[str, Any]
+
+# Postgres SQLSTATE classes/codes that indicate the server or connection,
+# not the rows, were at fault: connection exceptions, insufficient
+# resources, operator intervention and serialisation/deadlock failures.
+_TRANSIENT_SQLSTATE_PREFIXES = ("08", "53", "57", "40")
+# PostgREST's own codes for "could not reach / pool the database" (PGRST000-003).
+_TRANSIENT_POSTGREST_PREFIX = "PGRST00"
+# Network-level failures: nothing reached the database, so the rows are not
+# to blame. OSError covers ConnectionError and TimeoutError.
+_TRANSIENT_EXCEPTIONS = (httpx.TransportError, OSError, psycopg.OperationalError)
+# SQLSTATE classes that point at particular rows (data exceptions, integrity
+# violations). Only these are worth bisecting a chunk for; errors such as a
+# missing column (PGRST204), 401/403, an RLS denial (42501) or bad
+# credentials (28xxx) fail every row alike and are raised as they are.
+_ROW_SQLSTATE_PREFIXES = ("22", "23")
+
+
+@dataclass
+class InsertReport:
+    """Outcome of a chunked insert.
+
+    ``rejected_rows`` were refused by the database on their own merits
+    (a row-level error, see :func:`is_row_error`) and will fail again; ``failed_rows`` hit transient errors after all retries
+    and are safe to replay later. ``unresolved`` counts records that never
+    became rows because their asset could not be resolved.
+    """
+
+    inserted: int = 0
+    rejected_rows: List[Row] = field(default_factory=list)
+    failed_rows: List[Row] = field(default_factory=list)
+    unresolved: int = 0
+
+    def merge(self, other: "InsertReport") -> "InsertReport":
+        self.inserted += other.inserted
+        self.unresolved += other.unresolved
+        self.rejected_rows.extend(other.rejected_rows)
+        self.failed_rows.extend(other.failed_rows)
+        return self
+
+    @property
+    def ok(self) -> bool:
+        return not self.rejected_rows and not self.failed_rows
+
+
+def _is_retryable_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def _error_code(exc: BaseException) -> str:
+    if isinstance(exc, APIError):
+        return str(exc.code or "")
+    return str(getattr(exc, "sqlstate", None) or "")
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return True if *exc* is worth retrying as-is.
+
+    Only network/timeout failures, connection-class SQLSTATEs and HTTP
+    429/5xx responses qualify.
+    """
+    if isinstance(exc, APIError):
+        code = _error_code(exc)
+        # Without a JSON error body PostgREST reports the bare HTTP status.
+        if len(code) == 3 and code.isdigit():
+            return _is_retryable_status(int(code))
+        return code.startswith(_TRANSIENT_SQLSTATE_PREFIXES + (_TRANSIENT_POSTGREST_PREFIX,))
+    if isinstance(exc, httpx.HTTPStatusError):
+        return _is_retryable_status(exc.response.status_code)
+    sqlstate = _error_code(exc)
+    if sqlstate:
+        return sqlstate.startswith(_TRANSIENT_SQLSTATE_PREFIXES)
+    return isinstance(exc, _TRANSIENT_EXCEPTIONS)
+
+
+def is_row_error(exc: BaseException) -> bool:
+    """Return True if *exc* is the database's verdict on particular rows.
+
+    Such chunks are bisected to isolate the offending rows. Values that
+    cannot even be encoded (``ValueError``/``TypeError`` before the request
+    is sent) count as row errors too.
+    """
+    code = _error_code(exc)
+    if code:
+        return code.startswith(_ROW_SQLSTATE_PREFIXES)
+    return isinstance(exc, (ValueError, TypeError)) and not isinstance(exc, APIError)
+
+
+def is_batch_error(exc: BaseException) -> bool:
+    """Return True if *exc* fails the whole insert regardless of its rows.
+
+    Schema (PGRST2xx), auth (401/403, PGRST3xx, SQLSTATE 28xxx) and
+    permission/RLS (42xxx) errors, and anything else that is neither
+    transient nor tied to rows.
+    """
+    return not is_transient_error(exc) and not is_row_error(exc)
+
+
+def chunk_rows(
+    rows: List[Row],
+    max_rows: int = MENTION_INSERT_CHUNK_ROWS,
+    max_bytes: Optional[int] = MENTION_INSERT_CHUNK_BYTES,
+) -> List[List[Row]]:
+    """Split *rows* into chunks bounded by row count and approximate JSON size.
+
+    With ``max_bytes=None`` only the row count is enforced, which skips
+    serialising every row to measure it.
+    """
+    if max_bytes is None:
+        return [rows[i:i + max_rows] for i in range(0, len(rows), max_rows)]
+
+    chunks: List[List[Row]] = []
+    current: List[Row] = []
+    current_bytes = 0
+    for row in rows:
+        row_bytes = len(json.dumps(row, default=str)) + 1
+        if current and (len(current) >= max_rows or current_bytes + row_bytes > max_bytes):
+            chunks.append(current)
+            current, current_bytes = [], 0
+        current.append(row)
+        current_bytes += row_bytes
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _log_rejected(row: Row, exc: BaseException) -> None:
+    log.error(f"Database rejected row {row}: {exc}")
+
+
+def _log_batch_error(chunk: List[Row], exc: BaseException) -> None:
+    log.error(f"Insert of {len(chunk)} rows failed as a whole, not bisecting: {exc}")
+
+
+# ---------------------------------------------------------------------------
+# Sync
+# ---------------------------------------------------------------------------
+
+def _insert_chunk(
+    insert_fn: Callable[[List[Row]], Any],
+    chunk: List[Row],
+    retries: int,
+    backoff: float,
+) -> InsertReport:
+    """Insert *chunk*, retrying transient errors and bisecting bad rows.
+
+    Batch-level errors (see :func:`is_batch_error`) are raised unchanged,
+    so the caller fails the whole batch without rejecting any row.
+    """
+    for attempt in range(retries + 1):
+        try:
+            insert_fn(chunk)
+            return InsertReport(inserted=len(chunk))
+        except Exception as e:
+            if is_batch_error(e):
+                _log_batch_error(chunk, e)
+                raise
+            if is_row_error(e):
+                if len(chunk) == 1:
+                    _log_rejected(chunk[0], e)
+                    return InsertReport(rejected_rows=list(chunk))
+                # Halve the chunk to isolate the offending row(s).
+                mid = len(chunk) // 2
+                return _insert_chunk(insert_fn, chunk[:mid], retries, backoff).merge(
+                    _insert_chunk(insert_fn, chunk[mid:], retries, backoff)
+                )
+            if attempt == retries:
+                log.error(f"Insert of {len(chunk)} rows failed after {retries + 1} attempts: {e}")
+                return InsertReport(failed_rows=list(chunk))
+            delay = backoff * 2 ** attempt
+            log.warning(f"Transient insert error ({e}); retrying in {delay:.1f}s...")
+            time.sleep(delay)
+    return InsertReport(failed_rows=list(chunk))
+
+
+def insert_chunked(
+    insert_fn: Callable[[List[Row]], Any],
+    rows: List[Row],
+    *,
+    max_rows: int = MENTION_INSERT_CHUNK_ROWS,
+    max_bytes: Optional[int] = MENTION_INSERT_CHUNK_BYTES,
+    concurrency: int = MENTION_INSERT_CONCURRENCY,
+    retries: int = MENTION_INSERT_RETRIES,
+    backoff: float = MENTION_INSERT_BACKOFF,
+) -> InsertReport:
+    """Insert *rows* via *insert_fn* in size-bounded chunks on a thread pool.
+
+    Args:
+        insert_fn:   Blocking callable that inserts one list of rows.
+        rows:        Rows to insert.
+        max_rows:    Maximum rows per chunk.
+        max_bytes:   Maximum approximate JSON payload bytes per chunk (None = no limit).
+        concurrency: Maximum chunks in flight at once.
+        retries:     Retries per chunk for transient errors.
+        backoff:     Initial retry delay in seconds (doubled per attempt).
+    """
+    chunks = chunk_rows(rows, max_rows, max_bytes)
+    report = InsertReport()
+    if len(chunks) == 1 or concurrency <= 1:
+        for chunk in chunks:
+            report.merge(_insert_chunk(insert_fn, chunk, retries, backoff))
+        return report
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+        for result in executor.map(
+            lambda c: _insert_chunk(insert_fn, c, retries, backoff), chunks
+        ):
+            report.merge(result)
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Async
+# ---------------------------------------------------------------------------
+
+async def _insert_chunk_async(
+    insert_fn: Callable[[List[Row]], Awaitable[Any]],
+    chunk: List[Row],
+    retries: int,
+    backoff: float,
+) -> InsertReport:
+    """Async counterpart of :func:`_insert_chunk`."""
+    for attempt in range(retries + 1):
+        try:
+            await insert_fn(chunk)
+            return InsertReport(inserted=len(chunk))
+        except Exception as e:
+            if is_batch_error(e):
+                _log_batch_error(chunk, e)
+                raise
+            if is_row_error(e):
+                if len(chunk) == 1:
+                    _log_rejected(chunk[0], e)
+                    return InsertReport(rejected_rows=list(chunk))
+                mid = len(chunk) // 2
+                left, right = await asyncio.gather(
+                    _insert_chunk_async(insert_fn, chunk[:mid], retries, backoff),
+                    _insert_chunk_async(insert_fn, chunk[mid:], retries, backoff),
+                )
+                return left.merge(right)
+            if attempt == retries:
+                log.error(f"Insert of {len(chunk)} rows failed after {retries + 1} attempts: {e}")
+                return InsertReport(failed_rows=list(chunk))
+            delay = backoff * 2 ** attempt
+            log.warning(f"Transient insert error ({e}); retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+    return InsertReport(failed_rows=list(chunk))
+
+
+async def insert_chunked_async(
+    insert_fn: Callable[[List[Row]], Awaitable[Any]],
+    rows: List[Row],
+    *,
+    max_rows: int = MENTION_INSERT_CHUNK_ROWS,
+    max_bytes: Optional[int] = MENTION_INSERT_CHUNK_BYTES,
+    concurrency: int = MENTION_INSERT_CONCURRENCY,
+    retries: int = MENTION_INSERT_RETRIES,
+    backoff: float = MENTION_INSERT_BACKOFF,
+) -> InsertReport:
+    """Async counterpart of :func:`insert_chunked`, bounded by a semaphore."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(chunk: List[Row]) -> InsertReport:
+        async with semaphore:
+            return await _insert_chunk_async(insert_fn, chunk, retries, backoff)
+
+    report = InsertReport()
+    for result in await asyncio.gather(*(_bounded(c) for c in chunk_rows(rows, max_rows, max_bytes))):
+        report.merge(result)
+    return report
@@ -0,0 +1,368 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, Final, Iterable, List, Optional, Set, Tuple
+
+from config import ROLLUP_REFRESH
+from data.models import SentimentRecord
+from database.batching import InsertReport
+from database.id_cache import IdCache
+from database.processed_cache import ProcessedPostCache
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# --- Constants ---
+TABLE_PLATFORMS: Final[str] = "platforms"
+TABLE_ASSETS: Final[str] = "assets"
+TABLE_MENTIONS: Final[str] = "asset_mentions"
+TABLE_PROCESSED_POSTS: Final[str] = "processed_posts"
+
+COL_PLATFORM_ID: Final[str] = "platform_id"
+COL_ASSET_ID: Final[str] = "asset_id"
+COL_ASSET_TYPE: Final[str] = "asset_type"
+COL_TICKER: Final[str] = "ticker"
+COL_POST_ID: Final[str] = "post_id"
+COL_SOURCE_NAME: Final[str] = "source_name"
+COL_SOURCE_ID: Final[str] = "source_id"
+COL_SOURCE_TEXT_ID: Final[str] = "source_text_id"
+
+COL_CREATED_AT: Final[str] = "created_at"
+COL_MENTION_ID: Final[str] = "mention_id"
+
+# Identity of a mention: re-analysing the same text for the same asset on the
+# same platform updates the existing row instead of adding a duplicate.
+# created_at is part of it because asset_mentions is partitioned on it.
+MENTION_CONFLICT_COLUMNS: Final[tuple[str, ...]] = (
+    COL_ASSET_ID, COL_PLATFORM_ID, COL_SOURCE_ID, COL_SOURCE_TEXT_ID, COL_CREATED_AT,
+)
+
+
+def build_mention_rows(
+    records: List[SentimentRecord],
+    platform_id: int,
+    asset_ids: Dict[str, int],
+) -> List[Dict[str, Any]]:
+    """Shape *records* into ``asset_mentions`` rows.
+
+    Records whose symbol has no entry in *asset_ids* are logged and skipped.
+    Rows sharing a :data:`MENTION_CONFLICT_COLUMNS` key are collapsed to the
+    last one, since a single upsert statement may not touch a row twice.
+    """
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for record in records:
+        asset_id = asset_ids.get(record.symbol)
+        if not asset_id:
+            log.warning(
+                f"Could not resolve asset_id for '{record.symbol}'. Skipping."
+            )
+            continue
+
+        created_at = record.created_at or datetime.now(timezone.utc)
+
+        row = {
+            COL_ASSET_ID: asset_id,
+            COL_PLATFORM_ID: platform_id,
+            "sentiment_score": record.sentiment_score,
+            "confidence_level": record.sentiment_confidence,
+            COL_SOURCE_ID: record.source_id,
+            COL_SOURCE_NAME: record.source_name,
+            COL_SOURCE_TEXT_ID: record.source_text_id,
+            "source_text_snippet": record.source_text_snippet,
+            "key_rationale": record.key_rationale,
+            "mention_count": record.mention_count,
+            "sentiment_sum": record.sentiment_sum,
+            COL_CREATED_AT: created_at.isoformat(),
+        }
+        rows[tuple(row[col] for col in MENTION_CONFLICT_COLUMNS)] = row
+
+    duplicates = len(records) - len(rows)
+    if duplicates > 0:
+        log.debug(f"Collapsed mentions sharing a source identity ({duplicates} rows).")
+    return list(rows.values())
+
+
+def log_insert_report(report: InsertReport) -> None:
+    """Log the outcome of a chunked mention insert."""
+    if report.inserted:
+        log.info(f"Successfully inserted {report.inserted} records into '{TABLE_MENTIONS}'.")
+    if report.rejected_rows:
+        log.error(f"{len(report.rejected_rows)} records were rejected by the database.")
+    if report.failed_rows:
+        log.error(f"Failed to execute batch insert for {len(report.failed_rows)} records.")
+
+
+def forget_rejected_ids(
+    report: InsertReport, asset_ids: IdCache, platform_ids: IdCache
+) -> None:
+    """Drop cached IDs referenced by rows the database rejected.
+
+    A rejected row usually means a foreign key no longer exists (e.g. the
+    database was reset), so the next insert re-resolves those IDs.
+    """
+    if report.rejected_rows:
+        asset_ids.invalidate_ids(row[COL_ASSET_ID] for row in report.rejected_rows)
+        platform_ids.invalidate_ids(row[COL_PLATFORM_ID] for row in report.rejected_rows)
+
+
+IdRows = Iterable[Tuple[str, int]]
+
+
+class CachedClientBase:
+    """ID-cache and processed-post bookkeeping shared by every database client.
+
+    Owns the asset/platform :class:`~database.id_cache.IdCache` and the
+    :class:`~database.processed_cache.ProcessedPostCache`. The insert and
+    deduplication flows live in :class:`SyncCachedClient` and
+    :class:`AsyncCachedClient`; concrete clients only implement their
+    transport hooks (the ``_fetch_*``, ``_lookup_*``, ``_resolve_*`` and
+    ``_insert_*`` methods plus ``refresh_rollups``).
+    """
+
+    asset_ids: IdCache
+    platform_ids: IdCache
+    processed_posts: ProcessedPostCache
+
+    def _init_caches(self, namespace: Optional[str]) -> None:
+        self.asset_ids = IdCache.for_table(TABLE_ASSETS, namespace=namespace)
+        self.platform_ids = IdCache.for_table(TABLE_PLATFORMS, namespace=namespace)
+        self.processed_posts = ProcessedPostCache.from_config()
+
+    def _save_caches(self) -> None:
+        self.asset_ids.save()
+        self.platform_ids.save()
+        log.debug(
+            f"ID cache stats: assets={self.asset_ids.stats()}, "
+            f"platforms={self.platform_ids.stats()}"
+        )
+
+    def _apply_id_rows(self, platforms: IdRows, assets: IdRows) -> None:
+        """Fill the ID caches from ``(name, id)`` rows fetched by ``warm_cache``."""
+        self.platform_ids.update({name: int(pid) for name, pid in platforms})
+        self.asset_ids.update({ticker: int(aid) for ticker, aid in assets})
+        log.info(
+            f"Warmed ID cache with {len(self.platform_ids)} platforms "
+            f"and {len(self.asset_ids)} assets."
+        )
+        self._save_caches()
+
+    def _cached_asset_ids(self, records: List[SentimentRecord]) -> Tuple[Dict[str, int], List[str]]:
+        """Split the tickers of *records* into cached ``ticker → asset_id`` and uncached tickers."""
+        unique_tickers = list({r.symbol for r in records})
+        asset_ids = self.asset_ids.get_many(unique_tickers)
+        return asset_ids, [t for t in unique_tickers if t not in asset_ids]
+
+    def _remember_platform(self, platform_name: str, platform_id: Optional[int]) -> Optional[int]:
+        if platform_id:
+            self.platform_ids.put(platform_name, int(platform_id))
+        return platform_id
+
+    def _build_rows(
+        self, records: List[SentimentRecord], platform_id: int, asset_ids: Dict[str, int]
+    ) -> List[Dict[str, Any]]:
+        log.info(f"Preparing insert of {len(records)} records...")
+        rows = build_mention_rows(records, platform_id, asset_ids)
+        if not rows:
+            log.warning("No valid records to insert after processing.")
+        return rows
+
+    def _finish_insert(self, report: InsertReport) -> None:
+        log_insert_report(report)
+        forget_rejected_ids(report, self.asset_ids, self.platform_ids)
+        self._save_caches()
+
+    def _finish_processed_lookup(
+        self, source_name: str, processed: Set[str], cached: int, looked_up: int
+    ) -> Set[str]:
+        log.info(
+            f"{len(processed)} of {cached + looked_up} candidate posts already "
+            f"processed for '{source_name}' ({cached} from cache)."
+        )
+        self.processed_posts.save()
+        return processed
+
+    def _remember_processed(self, post_ids: List[str], source_name: str) -> None:
+        self.processed_posts.add(source_name, post_ids)
+        self.processed_posts.save()
+        log.info(f"Marked {len(post_ids)} posts as processed for '{source_name}'.")
+
+
+class SyncCachedClient(CachedClientBase):
+    """Blocking client flow; see :class:`CachedClientBase` for the hooks."""
+
+    def warm_cache(self) -> None:
+        """Load known platform and asset IDs so later inserts need no lookups."""
+        try:
+            self._apply_id_rows(*self._fetch_id_rows())
+        except Exception as e:
+            log.warning(f"Failed to warm ID cache, IDs will be resolved on demand: {e}")
+
+    def resolve_platform_id(self, platform_name: str) -> Optional[int]:
+        """Return the ``platform_id`` for *platform_name*, creating it if needed."""
+        platform_id = self.platform_ids.get(platform_name)
+        if platform_id is not None:
+            return platform_id
+        try:
+            platform_id = self._lookup_platform_id(platform_name)
+        except Exception as e:
+            log.error(f"Error managing record in '{TABLE_PLATFORMS}': {e}")
+            return None
+        return self._remember_platform(platform_name, platform_id)
+
+    def insert_analysis(
+        self, records: List[SentimentRecord], platform_name: str
+    ) -> InsertReport:
+        """Insert LLM analysis results, resolving IDs through the caches.
+
+        Platform and asset IDs come from the :class:`~database.id_cache.IdCache`
+        where possible, so in the steady state only the mention insert itself
+        hits the database. Mentions are upserted on their source identity, so
+        retries and reruns update rows rather than duplicate them.
+
+        Returns:
+            An :class:`~database.batching.InsertReport` of the mention insert.
+        """
+        if not records:
+            return InsertReport()
+
+        platform_id = self.resolve_platform_id(platform_name)
+        if not platform_id:
+            log.error(
+                f"Could not resolve platform_id for '{platform_name}'. Skipping batch."
+            )
+            return InsertReport()
+
+        asset_ids, uncached = self._cached_asset_ids(records)
+        if uncached:
+            # Lookup errors propagate so the outbox backs the batch off;
+            # only tickers the database really lacks end up unresolved.
+            resolved = self._resolve_asset_ids(uncached)
+            asset_ids.update(resolved)
+            self.asset_ids.update(resolved)
+
+        rows = self._build_rows(records, platform_id, asset_ids)
+        if not rows:
+            return InsertReport(unresolved=len(records))
+
+        report = self._insert_mention_rows(rows)
+        self._finish_insert(report)
+        if ROLLUP_REFRESH and report.inserted:
+            self.refresh_rollups(rows)
+        return report
+
+    def get_processed_post_ids(
+        self, source_name: str, candidate_ids: Iterable[str]
+    ) -> Set[str]:
+        """Return the subset of *candidate_ids* already analysed for *source_name*.
+
+        IDs confirmed recently are answered from the local
+        :class:`~database.processed_cache.ProcessedPostCache`; only the rest
+        are looked up, so the cost follows the scrape, not the table.
+        """
+        processed, unknown = self.processed_posts.split(source_name, candidate_ids)
+        cached = len(processed)
+        if unknown:
+            try:
+                found = self._lookup_processed(source_name, unknown)
+                self.processed_posts.add(source_name, found)
+                processed |= found
+            except Exception as e:
+                log.error(f"Failed to fetch processed post IDs: {e}")
+        return self._finish_processed_lookup(source_name, processed, cached, len(unknown))
+
+    def mark_posts_processed(self, post_ids: List[str], source_name: str) -> None:
+        """Record *post_ids* as processed so they are skipped on future runs."""
+        if not post_ids:
+            return
+        try:
+            self._insert_processed(list(post_ids), source_name)
+            self._remember_processed(post_ids, source_name)
+        except Exception as e:
+            log.error(f"Failed to mark posts as processed: {e}")
+
+
+class AsyncCachedClient(CachedClientBase):
+    """Async client flow; see :class:`CachedClientBase` for the hooks."""
+
+    async def warm_cache(self) -> None:
+        """Load known platform and asset IDs so later inserts need no lookups."""
+        try:
+            self._apply_id_rows(*await self._fetch_id_rows())
+        except Exception as e:
+            log.warning(f"Failed to warm ID cache, IDs will be resolved on demand: {e}")
+
+    async def resolve_platform_id(self, platform_name: str) -> Optional[int]:
+        """Return the ``platform_id`` for *platform_name*, creating it if needed.
+
+        Resolved IDs are kept in the ID cache, so this can be awaited early
+        (e.g. while the LLM phase runs) to take the lookup off the insert path.
+        """
+        platform_id = self.platform_ids.get(platform_name)
+        if platform_id is not None:
+            return platform_id
+        try:
+            platform_id = await self._lookup_platform_id(platform_name)
+        except Exception as e:
+            log.error(f"Error managing record in '{TABLE_PLATFORMS}': {e}")
+            return None
+        return self._remember_platform(platform_name, platform_id)
+
+    async def _resolve_uncached(self, tickers: List[str]) -> Dict[str, int]:
+        return await self._resolve_asset_ids(tickers) if tickers else {}
+
+    async def insert_analysis(
+        self, records: List[SentimentRecord], platform_name: str
+    ) -> InsertReport:
+        """Async counterpart of :meth:`SyncCachedClient.insert_analysis`.
+
+        Any uncached platform lookup and asset resolution run concurrently.
+        """
+        if not records:
+            return InsertReport()
+
+        asset_ids, uncached = self._cached_asset_ids(records)
+        platform_id, resolved = await asyncio.gather(
+            self.resolve_platform_id(platform_name),
+            self._resolve_uncached(uncached),
+        )
+        if not platform_id:
+            log.error(
+                f"Could not resolve platform_id for '{platform_name}'. Skipping batch."
+            )
+            return InsertReport()
+        asset_ids.update(resolved)
+        self.asset_ids.update(resolved)
+
+        rows = self._build_rows(records, platform_id, asset_ids)
+        if not rows:
+            return InsertReport(unresolved=len(records))
+
+        report = await self._insert_mention_rows(rows)
+        self._finish_insert(report)
+        if ROLLUP_REFRESH and report.inserted:
+            await self.refresh_rollups(rows)
+        return report
+
+    async def get_processed_post_ids(
+        self, source_name: str, candidate_ids: Iterable[str]
+    ) -> Set[str]:
+        """Async counterpart of :meth:`SyncCachedClient.get_processed_post_ids`."""
+        processed, unknown = self.processed_posts.split(source_name, candidate_ids)
+        cached = len(processed)
+        if unknown:
+            try:
+                found = await self._lookup_processed(source_name, unknown)
+                self.processed_posts.add(source_name, found)
+                processed |= found
+            except Exception as e:
+                log.error(f"Failed to fetch processed post IDs: {e}")
+        return self._finish_processed_lookup(source_name, processed, cached, len(unknown))
+
+    async def mark_posts_processed(self, post_ids: List[str], source_name: str) -> None:
+        """Record *post_ids* as processed so they are skipped on future runs."""
+        if not post_ids:
+            return
+        try:
+            await self._insert_processed(list(post_ids), source_name)
+            self._remember_processed(post_ids, source_name)
+        except Exception as e:
+            log.error(f"Failed to mark posts as processed: {e}")
@@ -0,0 +1,262 @@
+import json
+import os
+import re
+import shutil
+from bisect import bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, List, Optional, Sequence, Tuple
+
+import psycopg
+
+from config import (
+    EXPORT_BATCH_ROWS,
+    EXPORT_COMPRESSION,
+    EXPORT_DIR,
+    EXPORT_FORMAT,
+    EXPORT_RESCAN_IDS,
+    POSTGRES_DSN,
+)
+from utils.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:  # Only required for exports
+    pa = None
+
+log = get_logger(__name__)
+
+EXPORT_FORMATS: Final[Dict[str, str]] = {"parquet": ".parquet", "arrow": ".arrow"}
+# Leading "_" / "." keep these out of pyarrow datasets read from the directory.
+WATERMARK_FILE: Final[str] = "_watermark.json"
+
+EXPORT_COLUMNS: Final[Tuple[str, ...]] = (
+    "mention_id", "created_at", "ticker", "asset_type", "platform",
+    "sentiment_score", "confidence_level", "mention_count",
+    "source_id", "source_name", "source_text_id", "source_text_snippet", "key_rationale",
+)
+
+# mention_id is a sequence, but IDs are handed out before commit: a slow
+# transaction can commit an ID below one already exported. The watermark
+# therefore also keeps the skipped IDs ("gaps") behind it, and each run reads
+# from the oldest gap and only writes rows that are new or fill a gap.
+# Read through a server-side cursor.
+SQL_EXPORT_MENTIONS: Final[str] = """
+    SELECT m.mention_id, m.created_at, a.ticker, a.asset_type, p.name,
+           m.sentiment_score::float8, m.confidence_level::float8, m.mention_count,
+           m.source_id, m.source_name, m.source_text_id, m.source_text_snippet, m.key_rationale
+    FROM asset_mentions m
+    JOIN assets a ON a.asset_id = m.asset_id
+    LEFT JOIN platforms p ON p.platform_id = m.platform_id
+    WHERE m.mention_id > %(after)s
+    ORDER BY m.mention_id
+"""
+
+
+def export_schema() -> "pa.Schema":
+    return pa.schema([
+        ("mention_id", pa.int64()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("ticker", pa.string()),
+        ("asset_type", pa.string()),
+        ("platform", pa.string()),
+        ("sentiment_score", pa.float64()),
+        ("confidence_level", pa.float64()),
+        ("mention_count", pa.int16()),
+        ("source_id", pa.string()),
+        ("source_name", pa.string()),
+        ("source_text_id", pa.string()),
+        ("source_text_snippet", pa.string()),
+        ("key_rationale", pa.string()),
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+
+IdRange = Tuple[int, int]
+
+
+def read_watermark(directory: Path) -> Tuple[int, List[IdRange]]:
+    """Last exported ``mention_id`` (0 if nothing was exported yet) and the unexported ID ranges below it."""
+    path = directory / WATERMARK_FILE
+    if not path.exists():
+        return 0, []
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+        return int(state["mention_id"]), [(int(lo), int(hi)) for lo, hi in state.get("gaps", [])]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise RuntimeError(f"Unreadable export watermark '{path}'; fix it or re-run with --full: {e}")
+
+
+def write_watermark(directory: Path, mention_id: int, gaps: Sequence[IdRange] = ()) -> None:
+    path = directory / WATERMARK_FILE
+    tmp = directory / f".{WATERMARK_FILE}.tmp"
+    tmp.write_text(
+        json.dumps({
+            "mention_id": mention_id,
+            "gaps": [list(gap) for gap in gaps],
+            "exported_at": datetime.now(timezone.utc).isoformat(),
+        }),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def is_unexported(mention_id: int, after: int, gaps: Sequence[IdRange]) -> bool:
+    """True if *mention_id* is past the watermark or fills one of its gaps."""
+    if mention_id > after:
+        return True
+    i = bisect_right(gaps, (mention_id, float("inf"))) - 1
+    return i >= 0 and gaps[i][1] >= mention_id
+
+
+def advance_watermark(
+    after: int,
+    gaps: Sequence[IdRange],
+    exported_ids: Iterable[int],
+    rescan_ids: int = EXPORT_RESCAN_IDS,
+) -> Tuple[int, List[IdRange]]:
+    """Return the watermark and gaps after *exported_ids* were written.
+
+    Filled IDs leave their gap, IDs skipped past the old watermark become
+    new gaps, and gaps more than *rescan_ids* behind the new watermark are
+    dropped (those IDs belonged to rolled-back inserts or upsert conflicts).
+    """
+    remaining: List[IdRange] = []
+    ids = sorted(exported_ids)
+    for lo, hi in gaps:
+        for mention_id in ids[bisect_right(ids, lo - 1):bisect_right(ids, hi)]:
+            if mention_id > lo:
+                remaining.append((lo, mention_id - 1))
+            lo = mention_id + 1
+        if lo <= hi:
+            remaining.append((lo, hi))
+    for mention_id in ids[bisect_right(ids, after):]:
+        if mention_id > after + 1:
+            remaining.append((after + 1, mention_id - 1))
+        after = mention_id
+
+    oldest = after - rescan_ids + 1
+    return after, [(max(lo, oldest), hi) for lo, hi in remaining if hi >= oldest]
+
+
+def _safe(value: Optional[str]) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value) if value else "unknown"
+
+
+def partition_path(directory: Path, day: str, platform: str, first_id: int, fmt: str) -> Path:
+    """``date=YYYY-MM-DD/platform=NAME/part-<first mention_id>`` (hive layout).
+
+    Named after the first row, so re-running a batch that crashed before the
+    watermark moved overwrites its files instead of duplicating them.
+    """
+    return directory / f"date={day}" / f"platform={platform}" / f"part-{first_id:012d}{EXPORT_FORMATS[fmt]}"
+
+
+def group_by_partition(rows: Sequence[Sequence[Any]]) -> Dict[Tuple[str, str], List[Sequence[Any]]]:
+    """Split export rows by (UTC date, platform), keeping mention_id order."""
+    groups: Dict[Tuple[str, str], List[Sequence[Any]]] = {}
+    for row in rows:
+        day = row[1].astimezone(timezone.utc).date().isoformat()
+        groups.setdefault((day, _safe(row[4])), []).append(row)
+    return groups
+
+
+def write_partition(path: Path, rows: Sequence[Sequence[Any]], fmt: str, compression: Optional[str]) -> None:
+    """Write *rows* as one columnar file, atomically."""
+    table = pa.Table.from_arrays(
+        [pa.array([row[i] for row in rows], type=field.type) for i, field in enumerate(export_schema())],
+        schema=export_schema(),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    if fmt == "parquet":
+        pq.write_table(table, tmp, compression=compression or "none")
+    else:
+        # Uncompressed IPC buffers can be used straight from a memory map.
+        feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Export / read back
+# ---------------------------------------------------------------------------
+
+def export_mentions(
+    dsn: str = POSTGRES_DSN,
+    directory: str = EXPORT_DIR,
+    fmt: str = EXPORT_FORMAT,
+    compression: Optional[str] = EXPORT_COMPRESSION,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+    full: bool = False,
+    rescan_ids: int = EXPORT_RESCAN_IDS,
+) -> int:
+    """Export ``asset_mentions`` (with ticker and platform) newer than the watermark.
+
+    Rows stream through a server-side cursor *batch_rows* at a time; each
+    batch is written as one file per (date, platform) partition and the
+    watermark is advanced after it. Rows that commit late, below IDs already
+    exported, are picked up by a later run as long as they are within
+    *rescan_ids* of the watermark. *full* deletes previous partitions and
+    starts from the beginning. Rows updated in place since their export are
+    not re-exported. Returns the number of rows written.
+    """
+    if pa is None:
+        raise ImportError("Mention export requires the 'pyarrow' package.")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid EXPORT_FORMAT: {fmt}. Available options: {list(EXPORT_FORMATS)}")
+
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    if full:
+        for partition in out.glob("date=*"):
+            shutil.rmtree(partition)
+        after, gaps = 0, []
+    else:
+        after, gaps = read_watermark(out)
+    scan_from = gaps[0][0] - 1 if gaps else after
+    log.info(
+        f"Exporting mentions after mention_id {after} ({len(gaps)} gaps from {scan_from}) "
+        f"to '{out}' ({fmt})..."
+    )
+
+    written = 0
+    # Named (server-side) cursors need a transaction, so no autocommit here.
+    with psycopg.connect(dsn) as conn, conn.cursor(name="export_mentions") as cur:
+        cur.itersize = batch_rows
+        cur.execute(SQL_EXPORT_MENTIONS, {"after": scan_from})
+        while batch := cur.fetchmany(batch_rows):
+            rows = [row for row in batch if is_unexported(row[0], after, gaps)]
+            if not rows:
+                continue
+            for (day, platform), group in group_by_partition(rows).items():
+                write_partition(partition_path(out, day, platform, group[0][0], fmt), group, fmt, compression)
+            after, gaps = advance_watermark(after, gaps, (row[0] for row in rows), rescan_ids)
+            write_watermark(out, after, gaps)
+            written += len(rows)
+            log.info(f"Exported {written} mentions (watermark {after}, {len(gaps)} gaps).")
+
+    log.info(f"Export finished: {written} new mentions.")
+    return written
+
+
+def open_exports(directory: str = EXPORT_DIR, fmt: str = EXPORT_FORMAT) -> "ds.Dataset":
+    """Open an export directory as a pyarrow dataset, memory-mapping its files.
+
+    ``date`` and ``platform`` become columns, and filters on them only
+    open the matching partitions.
+    """
+    if pa is None:
+        raise ImportError("Reading exports requires the 'pyarrow' package.")
+    return ds.dataset(
+        directory,
+        format="parquet" if fmt == "parquet" else "ipc",
+        partitioning="hive",
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
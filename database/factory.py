@@ -0,0 +1,41 @@
+from typing import Union
+
+from config import DATABASE_BACKEND
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+BACKENDS = ("supabase", "postgres")
+
+# Imports are deferred so the unused backend's driver need not be installed.
+
+
+def _check_backend(backend: str) -> str:
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Invalid DATABASE_BACKEND: {backend}. Available options: {list(BACKENDS)}"
+        )
+    return backend
+
+
+def create_db_client(backend: str = DATABASE_BACKEND) -> Union["SupabaseClient", "PostgresClient"]:
+    """Return the blocking database client for the configured backend."""
+    if _check_backend(backend) == "postgres":
+        from database.postgres_client import PostgresClient
+        return PostgresClient()
+
+    from database.supabase_client import SupabaseClient
+    return SupabaseClient()
+
+
+async def create_async_db_client(
+    backend: str = DATABASE_BACKEND,
+) -> Union["AsyncSupabaseClient", "AsyncPostgresClient"]:
+    """Return the async database client for the configured backend."""
+    if _check_backend(backend) == "postgres":
+        from database.postgres_client import AsyncPostgresClient
+        return await AsyncPostgresClient.create()
+
+    from database.async_supabase_client import AsyncSupabaseClient
+    return await AsyncSupabaseClient.create()
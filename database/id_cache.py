@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from config import ID_CACHE_DIR, ID_CACHE_MAX_SIZE
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class IdCache:
+    """LRU map of natural key (ticker, platform name) → database ID.
+
+    Lookup tables like ``assets`` and ``platforms`` are append-only and tiny
+    compared to ``asset_mentions``, so once a key has been resolved its ID
+    can be reused for every later insert instead of being fetched again.
+
+    If *path* is given the cache is loaded from and saved to that JSON file,
+    so IDs survive across runs. *namespace* (e.g. the database URL) is stored
+    alongside the entries and a file written for a different database is
+    ignored, so switching backends never serves foreign IDs.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ID_CACHE_MAX_SIZE,
+        path: Optional[Path] = None,
+        namespace: Optional[str] = "",
+    ) -> None:
+        self.max_size = max_size
+        self.path = path
+        self.namespace = hashlib.sha256((namespace or "").encode("utf-8")).hexdigest()[:16]
+        self._ids: "OrderedDict[str, int]" = OrderedDict()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.path:
+            self._load()
+
+    @classmethod
+    def for_table(cls, table: str, namespace: Optional[str] = "") -> "IdCache":
+        """Build the cache for *table*, file-backed if ``ID_CACHE_DIR`` is set."""
+        path = Path(ID_CACHE_DIR) / f"{table}.json" if ID_CACHE_DIR else None
+        return cls(path=path, namespace=namespace)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[int]:
+        value = self._ids.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._ids.move_to_end(key)
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, int]:
+        """Return the cached subset of *keys* as ``key → id``."""
+        found: Dict[str, int] = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, value: int) -> None:
+        if self._ids.get(key) != value:
+            self._dirty = True
+        self._ids[key] = value
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+
+    def update(self, mapping: Dict[str, int]) -> None:
+        for key, value in mapping.items():
+            self.put(key, value)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            if self._ids.pop(key, None) is not None:
+                self._dirty = True
+
+    def invalidate_ids(self, ids: Iterable[int]) -> None:
+        """Drop every entry pointing at one of *ids* (e.g. after an FK violation)."""
+        stale = set(ids)
+        self.invalidate([k for k, v in self._ids.items() if v in stale])
+
+    def clear(self) -> None:
+        if self._ids:
+            self._dirty = True
+        self._ids.clear()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning(f"Could not read ID cache '{self.path}', starting empty: {e}")
+            return
+        if payload.get("namespace") != self.namespace:
+            log.info(f"ID cache '{self.path}' belongs to another database; ignoring it.")
+            return
+        for key, value in payload.get("ids", {}).items():
+            self.put(key, int(value))
+        self._dirty = False
+
+    def save(self) -> None:
+        """Write the cache to its file (if any) when it has changed."""
+        if not self.path or not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(
+                json.dumps({"namespace": self.namespace, "ids": self._ids}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            log.warning(f"Failed to save ID cache '{self.path}': {e}")
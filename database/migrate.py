@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Any, List
+
+import psycopg
+
+from config import MENTION_PARTITION_MONTHS_AHEAD, POSTGRES_DSN
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+SQL_CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(255) PRIMARY KEY,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+SQL_ENSURE_PARTITIONS = (
+    "SELECT create_mention_partitions(date_trunc('month', now())::date, %s)"
+)
+
+
+def pending_migrations(applied: set[str], directory: Path = MIGRATIONS_DIR) -> List[Path]:
+    """Return the ``NNN_name.sql`` files in *directory* not yet in *applied*, in order."""
+    return [p for p in sorted(directory.glob("*.sql")) if p.stem not in applied]
+
+
+def apply_migrations(conn: Any, directory: Path = MIGRATIONS_DIR) -> List[str]:
+    """Apply every pending migration, each in its own transaction.
+
+    Databases initialised from ``schema.sql`` already list the migrations it
+    contains in ``schema_migrations``, so only newer files run there.
+
+    Returns:
+        The versions applied, in order.
+    """
+    with conn.transaction():
+        conn.execute(SQL_CREATE_MIGRATIONS_TABLE)
+        applied = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+
+    done: List[str] = []
+    for path in pending_migrations(applied, directory):
+        log.info(f"Applying migration {path.name}...")
+        with conn.transaction():
+            conn.execute(path.read_text(encoding="utf-8"))
+            conn.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (path.stem,))
+        done.append(path.stem)
+    if not done:
+        log.info("Database schema is up to date.")
+    return done
+
+
+def ensure_partitions(conn: Any, months_ahead: int = MENTION_PARTITION_MONTHS_AHEAD) -> int:
+    """Create the current and next *months_ahead* monthly ``asset_mentions`` partitions.
+
+    Run regularly (e.g. daily) so rows always land in a monthly partition
+    rather than the default one. Returns the number of partitions created.
+    """
+    with conn.transaction():
+        created = conn.execute(SQL_ENSURE_PARTITIONS, (months_ahead + 1,)).fetchone()[0]
+    if created:
+        log.info(f"Created {created} asset_mentions partition(s).")
+    return created
+
+
+def migrate(dsn: str = POSTGRES_DSN, partitions_only: bool = False) -> None:
+    """Apply pending migrations and create upcoming partitions on *dsn*."""
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        if not partitions_only:
+            apply_migrations(conn)
+        ensure_partitions(conn)
@@ -0,0 +1,13 @@
+-- Persist source identity on asset_mentions and make it unique, so mention
+-- writes can upsert instead of appending duplicates on retries/reruns.
+
+ALTER TABLE asset_mentions ADD COLUMN IF NOT EXISTS source_id VARCHAR(255);
+ALTER TABLE asset_mentions ADD COLUMN IF NOT EXISTS source_name VARCHAR(50);
+
+-- Rows written before this migration have no source identity; give each a
+-- unique one so history is kept rather than collapsed by the new key.
+UPDATE asset_mentions SET source_id = 'legacy_' || mention_id WHERE source_id IS NULL;
+
+ALTER TABLE asset_mentions
+    ADD CONSTRAINT asset_mentions_source_key
+    UNIQUE NULLS NOT DISTINCT (asset_id, platform_id, source_id, source_text_id);
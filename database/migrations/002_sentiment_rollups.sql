@@ -0,0 +1,133 @@
+-- Pre-aggregated sentiment per asset, platform and time bucket, maintained
+-- by the pipeline after every insert (see refresh_sentiment_rollups) so the
+-- dashboard RPCs never scan asset_mentions.
+CREATE TABLE IF NOT EXISTS sentiment_rollup_hourly (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    platform_id SMALLINT REFERENCES platforms(platform_id) ON DELETE CASCADE,
+    bucket TIMESTAMPTZ NOT NULL,
+    mention_count INT NOT NULL,
+    sentiment_sum NUMERIC NOT NULL,
+    weighted_sentiment_sum NUMERIC NOT NULL,  -- sum(sentiment_score * confidence_level)
+    confidence_sum NUMERIC NOT NULL,
+    CONSTRAINT sentiment_rollup_hourly_key UNIQUE NULLS NOT DISTINCT (asset_id, platform_id, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS sentiment_rollup_daily (LIKE sentiment_rollup_hourly INCLUDING ALL);
+
+CREATE INDEX IF NOT EXISTS sentiment_rollup_hourly_bucket_idx ON sentiment_rollup_hourly (bucket);
+CREATE INDEX IF NOT EXISTS sentiment_rollup_daily_bucket_idx ON sentiment_rollup_daily (bucket);
+
+-- Re-aggregate only the hourly buckets listed (parallel arrays, one entry per
+-- touched asset/platform/hour) and the days containing them. Buckets whose
+-- mentions have all gone are removed.
+CREATE OR REPLACE FUNCTION refresh_sentiment_rollups(
+    p_asset_ids INT[],
+    p_platform_ids SMALLINT[],
+    p_buckets TIMESTAMPTZ[]
+) RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _touched_rollups (
+        asset_id INT, platform_id SMALLINT, bucket TIMESTAMPTZ
+    ) ON COMMIT DROP;
+    TRUNCATE _touched_rollups;
+    INSERT INTO _touched_rollups
+    SELECT DISTINCT a, p, date_trunc('hour', b, 'UTC')
+    FROM unnest(p_asset_ids, p_platform_ids, p_buckets) AS t(a, p, b);
+
+    DELETE FROM sentiment_rollup_hourly r
+    USING _touched_rollups t
+    WHERE r.asset_id = t.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM t.platform_id
+      AND r.bucket = t.bucket;
+
+    INSERT INTO sentiment_rollup_hourly
+    SELECT t.asset_id, t.platform_id, t.bucket,
+           count(*),
+           sum(m.sentiment_score),
+           sum(m.sentiment_score * coalesce(m.confidence_level, 0)),
+           sum(coalesce(m.confidence_level, 0))
+    FROM _touched_rollups t
+    JOIN asset_mentions m
+      ON m.asset_id = t.asset_id
+     AND m.platform_id IS NOT DISTINCT FROM t.platform_id
+     AND m.created_at >= t.bucket
+     AND m.created_at < t.bucket + interval '1 hour'
+    GROUP BY t.asset_id, t.platform_id, t.bucket;
+
+    -- Days are rebuilt from their (at most 24) hourly rows.
+    DELETE FROM sentiment_rollup_daily r
+    USING (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+           FROM _touched_rollups) d
+    WHERE r.asset_id = d.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM d.platform_id
+      AND r.bucket = d.day;
+
+    INSERT INTO sentiment_rollup_daily
+    SELECT h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC') AS day,
+           sum(h.mention_count), sum(h.sentiment_sum),
+           sum(h.weighted_sentiment_sum), sum(h.confidence_sum)
+    FROM sentiment_rollup_hourly h
+    JOIN (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+          FROM _touched_rollups) d
+      ON h.asset_id = d.asset_id
+     AND h.platform_id IS NOT DISTINCT FROM d.platform_id
+     AND h.bucket >= d.day
+     AND h.bucket < d.day + interval '1 day'
+    GROUP BY h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC');
+END;
+$$;
+
+-- Dashboard RPCs (frontend /api/trends, /api/top-stocks, /api/stats), served
+-- from the rollups. Averages are confidence-weighted.
+-- Return types differ from the previous raw-scan versions, so replace outright.
+DROP FUNCTION IF EXISTS get_sentiment_trends;
+DROP FUNCTION IF EXISTS get_top_stocks;
+DROP FUNCTION IF EXISTS get_dashboard_stats;
+
+CREATE OR REPLACE FUNCTION get_sentiment_trends(p_ticker TEXT DEFAULT NULL, p_days INT DEFAULT 7)
+RETURNS TABLE (date TIMESTAMPTZ, avg_sentiment NUMERIC, mentions BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT r.bucket,
+           round(sum(r.weighted_sentiment_sum) / nullif(sum(r.confidence_sum), 0), 4),
+           sum(r.mention_count)
+    FROM (
+        SELECT * FROM sentiment_rollup_hourly WHERE p_days <= 2
+        UNION ALL
+        SELECT * FROM sentiment_rollup_daily WHERE p_days > 2
+    ) r
+    JOIN assets a ON a.asset_id = r.asset_id
+    WHERE r.bucket >= now() - make_interval(days => p_days)
+      AND (p_ticker IS NULL OR a.ticker = p_ticker)
+    GROUP BY r.bucket
+    ORDER BY r.bucket;
+$$;
+
+CREATE OR REPLACE FUNCTION get_top_stocks(p_days INT DEFAULT 7, p_limit INT DEFAULT 10)
+RETURNS TABLE (ticker VARCHAR, asset_name VARCHAR, mentions BIGINT, avg_sentiment NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT a.ticker, a.asset_name,
+           sum(r.mention_count),
+           round(sum(r.weighted_sentiment_sum) / nullif(sum(r.confidence_sum), 0), 4)
+    FROM sentiment_rollup_daily r
+    JOIN assets a ON a.asset_id = r.asset_id
+    WHERE r.bucket >= date_trunc('day', now(), 'UTC') - make_interval(days => p_days)
+    GROUP BY a.ticker, a.asset_name
+    ORDER BY 3 DESC
+    LIMIT p_limit;
+$$;
+
+CREATE OR REPLACE FUNCTION get_dashboard_stats()
+RETURNS TABLE (total_assets BIGINT, total_mentions BIGINT, average_sentiment NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT (SELECT count(*) FROM assets),
+           coalesce(sum(mention_count), 0),
+           coalesce(round(sum(weighted_sentiment_sum) / nullif(sum(confidence_sum), 0), 4), 0)
+    FROM sentiment_rollup_daily;
+$$;
+
+-- Backfill the rollups from existing mentions.
+SELECT refresh_sentiment_rollups(array_agg(asset_id), array_agg(platform_id), array_agg(bucket))
+FROM (
+    SELECT DISTINCT asset_id, platform_id, date_trunc('hour', created_at, 'UTC') AS bucket
+    FROM asset_mentions
+) touched;
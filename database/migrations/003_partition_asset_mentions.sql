@@ -0,0 +1,94 @@
+-- Convert asset_mentions into a table range-partitioned by month on
+-- created_at, with covering and BRIN indexes. Rows are copied into the new
+-- table, keeping their mention_id values.
+
+ALTER TABLE asset_mentions RENAME TO asset_mentions_unpartitioned;
+ALTER TABLE asset_mentions_unpartitioned
+    RENAME CONSTRAINT asset_mentions_pkey TO asset_mentions_unpartitioned_pkey;
+ALTER TABLE asset_mentions_unpartitioned
+    RENAME CONSTRAINT asset_mentions_source_key TO asset_mentions_unpartitioned_source_key;
+
+CREATE TABLE asset_mentions (
+    mention_id BIGSERIAL,
+    asset_id INT NOT NULL REFERENCES assets(asset_id),
+    platform_id SMALLINT REFERENCES platforms(platform_id),
+    sentiment_score NUMERIC(5, 4), 
+    confidence_level NUMERIC(5, 4), 
+    source_id VARCHAR(255),
+    source_name VARCHAR(50),
+    source_text_id VARCHAR(50),
+    source_text_snippet TEXT,
+    key_rationale TEXT,
+    created_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (mention_id, created_at),
+    -- One row per analysed text: pipeline retries and reruns upsert onto it.
+    CONSTRAINT asset_mentions_source_key
+        UNIQUE NULLS NOT DISTINCT (asset_id, platform_id, source_id, source_text_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside every monthly partition so inserts never fail.
+CREATE TABLE asset_mentions_default PARTITION OF asset_mentions DEFAULT;
+
+-- Trend and rollup queries filter on asset + time range; the INCLUDE columns
+-- let them run as index-only scans. BRIN keeps whole-table time scans cheap.
+CREATE INDEX asset_mentions_asset_time_idx
+    ON asset_mentions (asset_id, created_at) INCLUDE (platform_id, sentiment_score, confidence_level);
+CREATE INDEX asset_mentions_platform_time_idx ON asset_mentions (platform_id, created_at);
+CREATE INDEX asset_mentions_created_brin ON asset_mentions USING brin (created_at);
+
+-- Create the monthly partitions for p_months months starting at p_from's
+-- month (UTC boundaries). Existing partitions are left alone; returns the
+-- number created.
+CREATE OR REPLACE FUNCTION create_mention_partitions(p_from DATE, p_months INT)
+RETURNS INT LANGUAGE plpgsql AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_from)::date;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    FOR i IN 1 .. p_months LOOP
+        part := format('asset_mentions_%s', to_char(month_start, 'YYYY_MM'));
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF asset_mentions FOR VALUES FROM (%L) TO (%L)',
+                part,
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+-- Partitions for every month that already has data, plus the next few.
+WITH bounds AS (
+    SELECT date_trunc('month', least(coalesce(min(created_at), now()), now())) AS first_month
+    FROM asset_mentions_unpartitioned
+)
+SELECT create_mention_partitions(
+    first_month::date,
+    ((extract(year FROM now()) - extract(year FROM first_month)) * 12
+     + extract(month FROM now()) - extract(month FROM first_month))::int + 4
+)
+FROM bounds;
+
+INSERT INTO asset_mentions (
+    mention_id, asset_id, platform_id, sentiment_score, confidence_level, source_id,
+    source_name, source_text_id, source_text_snippet, key_rationale, created_at
+)
+SELECT
+    mention_id, asset_id, platform_id, sentiment_score, confidence_level, source_id,
+    source_name, source_text_id, source_text_snippet, key_rationale, created_at
+FROM asset_mentions_unpartitioned;
+
+SELECT setval(
+    pg_get_serial_sequence('asset_mentions', 'mention_id'),
+    coalesce(max(mention_id), 0) + 1,
+    false
+)
+FROM asset_mentions;
+
+DROP TABLE asset_mentions_unpartitioned;
@@ -0,0 +1,100 @@
+-- Retention for asset_mentions (database/retention.py).
+
+-- Mentions before compacted_before have been folded into the rollups for
+-- good (compact_mention_rollups) and may be deleted; the rollup buckets
+-- before it are frozen and no longer rebuilt from asset_mentions.
+CREATE TABLE IF NOT EXISTS mention_retention (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    compacted_before TIMESTAMPTZ NOT NULL DEFAULT '-infinity'
+);
+INSERT INTO mention_retention DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+-- Re-aggregate only the hourly buckets listed (parallel arrays, one entry per
+-- touched asset/platform/hour) and the days containing them. Buckets whose
+-- mentions have all gone are removed; compacted (frozen) buckets are skipped.
+CREATE OR REPLACE FUNCTION refresh_sentiment_rollups(
+    p_asset_ids INT[],
+    p_platform_ids SMALLINT[],
+    p_buckets TIMESTAMPTZ[]
+) RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _touched_rollups (
+        asset_id INT, platform_id SMALLINT, bucket TIMESTAMPTZ
+    ) ON COMMIT DROP;
+    TRUNCATE _touched_rollups;
+    INSERT INTO _touched_rollups
+    SELECT DISTINCT a, p, date_trunc('hour', b, 'UTC')
+    FROM unnest(p_asset_ids, p_platform_ids, p_buckets) AS t(a, p, b);
+    DELETE FROM _touched_rollups
+    WHERE bucket < (SELECT compacted_before FROM mention_retention);
+
+    DELETE FROM sentiment_rollup_hourly r
+    USING _touched_rollups t
+    WHERE r.asset_id = t.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM t.platform_id
+      AND r.bucket = t.bucket;
+
+    INSERT INTO sentiment_rollup_hourly
+    SELECT t.asset_id, t.platform_id, t.bucket,
+           count(*),
+           sum(m.sentiment_score),
+           sum(m.sentiment_score * coalesce(m.confidence_level, 0)),
+           sum(coalesce(m.confidence_level, 0))
+    FROM _touched_rollups t
+    JOIN asset_mentions m
+      ON m.asset_id = t.asset_id
+     AND m.platform_id IS NOT DISTINCT FROM t.platform_id
+     AND m.created_at >= t.bucket
+     AND m.created_at < t.bucket + interval '1 hour'
+    GROUP BY t.asset_id, t.platform_id, t.bucket;
+
+    -- Days are rebuilt from their (at most 24) hourly rows.
+    DELETE FROM sentiment_rollup_daily r
+    USING (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+           FROM _touched_rollups) d
+    WHERE r.asset_id = d.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM d.platform_id
+      AND r.bucket = d.day;
+
+    INSERT INTO sentiment_rollup_daily
+    SELECT h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC') AS day,
+           sum(h.mention_count), sum(h.sentiment_sum),
+           sum(h.weighted_sentiment_sum), sum(h.confidence_sum)
+    FROM sentiment_rollup_hourly h
+    JOIN (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+          FROM _touched_rollups) d
+      ON h.asset_id = d.asset_id
+     AND h.platform_id IS NOT DISTINCT FROM d.platform_id
+     AND h.bucket >= d.day
+     AND h.bucket < d.day + interval '1 day'
+    GROUP BY h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC');
+END;
+$$;
+
+-- Retention: fold every mention before p_before (rounded down to a UTC day)
+-- into the rollups for good. Buckets since the previous watermark are
+-- refreshed one last time, the watermark moves forward and the hourly
+-- rollups below it are dropped, leaving daily resolution for old data.
+-- Returns the new watermark; mentions before it can then be archived and
+-- deleted in batches.
+CREATE OR REPLACE FUNCTION compact_mention_rollups(p_before TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ LANGUAGE plpgsql AS $$
+DECLARE
+    v_from TIMESTAMPTZ;
+    v_to TIMESTAMPTZ := date_trunc('day', p_before, 'UTC');
+BEGIN
+    SELECT compacted_before INTO v_from FROM mention_retention FOR UPDATE;
+    IF v_to <= v_from THEN
+        RETURN v_from;
+    END IF;
+
+    PERFORM refresh_sentiment_rollups(array_agg(asset_id), array_agg(platform_id), array_agg(bucket))
+    FROM (SELECT DISTINCT asset_id, platform_id, date_trunc('hour', created_at, 'UTC') AS bucket
+          FROM asset_mentions
+          WHERE created_at >= v_from AND created_at < v_to) touched;
+
+    UPDATE mention_retention SET compacted_before = v_to;
+    DELETE FROM sentiment_rollup_hourly WHERE bucket < v_to;
+    RETURN v_to;
+END;
+$$;
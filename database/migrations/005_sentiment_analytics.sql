@@ -0,0 +1,39 @@
+-- Precomputed rolling analytics per asset and bucket (analytics/rolling.py,
+-- scripts/compute_analytics.py): confidence-weighted bucket/rolling means,
+-- fast/slow EMAs, momentum and mention-volume z-scores. Empty buckets are
+-- included, with EMAs carried forward, so charts need no gap filling.
+CREATE TABLE IF NOT EXISTS sentiment_analytics (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    resolution VARCHAR(4) NOT NULL CHECK (resolution IN ('hour', 'day')),
+    bucket TIMESTAMPTZ NOT NULL,
+    mention_count INT NOT NULL,
+    avg_sentiment DOUBLE PRECISION,
+    rolling_sentiment DOUBLE PRECISION,
+    ema_fast DOUBLE PRECISION,
+    ema_slow DOUBLE PRECISION,
+    momentum DOUBLE PRECISION,
+    volume_zscore DOUBLE PRECISION,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (asset_id, resolution, bucket)
+);
+
+CREATE OR REPLACE FUNCTION get_sentiment_analytics(
+    p_ticker TEXT,
+    p_days INT DEFAULT 30,
+    p_resolution TEXT DEFAULT 'day'
+)
+RETURNS TABLE (
+    bucket TIMESTAMPTZ, mention_count INT, avg_sentiment DOUBLE PRECISION,
+    rolling_sentiment DOUBLE PRECISION, ema_fast DOUBLE PRECISION, ema_slow DOUBLE PRECISION,
+    momentum DOUBLE PRECISION, volume_zscore DOUBLE PRECISION
+)
+LANGUAGE sql STABLE AS $$
+    SELECT s.bucket, s.mention_count, s.avg_sentiment, s.rolling_sentiment,
+           s.ema_fast, s.ema_slow, s.momentum, s.volume_zscore
+    FROM sentiment_analytics s
+    JOIN assets a ON a.asset_id = s.asset_id
+    WHERE a.ticker = p_ticker
+      AND s.resolution = p_resolution
+      AND s.bucket >= now() - make_interval(days => p_days)
+    ORDER BY s.bucket;
+$$;
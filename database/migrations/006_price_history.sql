@@ -0,0 +1,46 @@
+-- Daily prices synced from the local price store (analytics/prices.py,
+-- scripts/sync_prices.py), so the dashboard never calls a price API per view,
+-- and per-asset correlations of daily sentiment with the return `lag_days`
+-- later (analytics/correlation.py).
+CREATE TABLE IF NOT EXISTS asset_prices (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION,
+    PRIMARY KEY (asset_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS sentiment_price_correlations (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    lag_days INT NOT NULL,
+    correlation DOUBLE PRECISION,
+    n_obs INT NOT NULL,
+    window_days INT NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (asset_id, lag_days)
+);
+
+CREATE OR REPLACE FUNCTION get_asset_prices(p_ticker TEXT, p_days INT DEFAULT 30)
+RETURNS TABLE (date DATE, close DOUBLE PRECISION)
+LANGUAGE sql STABLE AS $$
+    SELECT p.date, p.close
+    FROM asset_prices p
+    JOIN assets a ON a.asset_id = p.asset_id
+    WHERE a.ticker = p_ticker
+      AND p.date >= current_date - p_days
+    ORDER BY p.date;
+$$;
+
+CREATE OR REPLACE FUNCTION get_sentiment_price_correlations(p_lag INT DEFAULT 1)
+RETURNS TABLE (ticker VARCHAR, correlation DOUBLE PRECISION, n_obs INT, computed_at TIMESTAMPTZ)
+LANGUAGE sql STABLE AS $$
+    SELECT a.ticker, c.correlation, c.n_obs, c.computed_at
+    FROM sentiment_price_correlations c
+    JOIN assets a ON a.asset_id = c.asset_id
+    WHERE c.lag_days = p_lag
+      AND c.correlation IS NOT NULL
+    ORDER BY abs(c.correlation) DESC;
+$$;
@@ -0,0 +1,66 @@
+-- Consolidated mentions (data/consolidation.py): one asset_mentions row can
+-- stand for several analysed records of the same symbol, platform and hour.
+-- mention_count says how many, and the rollups weight each row by it.
+ALTER TABLE asset_mentions ADD COLUMN IF NOT EXISTS mention_count SMALLINT NOT NULL DEFAULT 1;
+
+-- Re-aggregate only the hourly buckets listed (parallel arrays, one entry per
+-- touched asset/platform/hour) and the days containing them. Buckets whose
+-- mentions have all gone are removed; compacted (frozen) buckets are skipped.
+CREATE OR REPLACE FUNCTION refresh_sentiment_rollups(
+    p_asset_ids INT[],
+    p_platform_ids SMALLINT[],
+    p_buckets TIMESTAMPTZ[]
+) RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _touched_rollups (
+        asset_id INT, platform_id SMALLINT, bucket TIMESTAMPTZ
+    ) ON COMMIT DROP;
+    TRUNCATE _touched_rollups;
+    INSERT INTO _touched_rollups
+    SELECT DISTINCT a, p, date_trunc('hour', b, 'UTC')
+    FROM unnest(p_asset_ids, p_platform_ids, p_buckets) AS t(a, p, b);
+    DELETE FROM _touched_rollups
+    WHERE bucket < (SELECT compacted_before FROM mention_retention);
+
+    DELETE FROM sentiment_rollup_hourly r
+    USING _touched_rollups t
+    WHERE r.asset_id = t.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM t.platform_id
+      AND r.bucket = t.bucket;
+
+    INSERT INTO sentiment_rollup_hourly
+    SELECT t.asset_id, t.platform_id, t.bucket,
+           sum(m.mention_count),
+           sum(m.sentiment_score * m.mention_count),
+           sum(m.sentiment_score * coalesce(m.confidence_level, 0) * m.mention_count),
+           sum(coalesce(m.confidence_level, 0) * m.mention_count)
+    FROM _touched_rollups t
+    JOIN asset_mentions m
+      ON m.asset_id = t.asset_id
+     AND m.platform_id IS NOT DISTINCT FROM t.platform_id
+     AND m.created_at >= t.bucket
+     AND m.created_at < t.bucket + interval '1 hour'
+    GROUP BY t.asset_id, t.platform_id, t.bucket;
+
+    -- Days are rebuilt from their (at most 24) hourly rows.
+    DELETE FROM sentiment_rollup_daily r
+    USING (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+           FROM _touched_rollups) d
+    WHERE r.asset_id = d.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM d.platform_id
+      AND r.bucket = d.day;
+
+    INSERT INTO sentiment_rollup_daily
+    SELECT h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC') AS day,
+           sum(h.mention_count), sum(h.sentiment_sum),
+           sum(h.weighted_sentiment_sum), sum(h.confidence_sum)
+    FROM sentiment_rollup_hourly h
+    JOIN (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+          FROM _touched_rollups) d
+      ON h.asset_id = d.asset_id
+     AND h.platform_id IS NOT DISTINCT FROM d.platform_id
+     AND h.bucket >= d.day
+     AND h.bucket < d.day + interval '1 day'
+    GROUP BY h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC');
+END;
+$$;
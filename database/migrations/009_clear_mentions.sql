@@ -0,0 +1,7 @@
+-- Reset: wipe every mention together with the rollups built from them and
+-- the retention watermark, in one transaction, so the dashboards never show
+-- buckets whose mentions are gone.
+CREATE OR REPLACE FUNCTION clear_mentions() RETURNS VOID LANGUAGE sql AS $$
+    TRUNCATE asset_mentions, sentiment_rollup_hourly, sentiment_rollup_daily;
+    UPDATE mention_retention SET compacted_before = '-infinity';
+$$;
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+
+from config import (
+    OUTBOX_BACKOFF,
+    OUTBOX_BACKOFF_MAX,
+    OUTBOX_FILE,
+    OUTBOX_FLUSH_INTERVAL,
+    OUTBOX_MAX_ATTEMPTS,
+)
+from data.models import SentimentRecord
+from database.batching import InsertReport
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+InsertFn = Callable[[List[SentimentRecord], str], InsertReport]
+AsyncInsertFn = Callable[[List[SentimentRecord], str], Awaitable[InsertReport]]
+
+STATUS_PENDING = "pending"
+STATUS_DEAD = "dead"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform_name   TEXT    NOT NULL,
+    records         TEXT    NOT NULL,
+    status          TEXT    NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL    NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    enqueued_at     REAL    NOT NULL
+)
+"""
+
+
+@dataclass
+class OutboxBatch:
+    """One stored batch of analysis records awaiting delivery."""
+
+    id: int
+    platform_name: str
+    records: List[SentimentRecord]
+    attempts: int = 0
+
+
+def _encode_records(records: List[SentimentRecord]) -> str:
+    """Serialise *records*, fixing ``created_at`` so replays hit the same upsert key."""
+    now = datetime.now(timezone.utc)
+    payload = []
+    for record in records:
+        data = asdict(record)
+        data["created_at"] = (record.created_at or now).isoformat()
+        payload.append(data)
+    return json.dumps(payload)
+
+
+def _decode_records(raw: str) -> List[SentimentRecord]:
+    records = []
+    for data in json.loads(raw):
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        records.append(SentimentRecord(**data))
+    return records
+
+
+def _unresolvable(report: Optional[InsertReport]) -> bool:
+    """True if no record of the batch could be turned into a row at all."""
+    return (
+        report is not None
+        and report.unresolved > 0
+        and not (report.inserted or report.rejected_rows or report.failed_rows)
+    )
+
+
+def _delivered(report: Optional[InsertReport], expected: int) -> bool:
+    """True if the database took the batch, or refused only particular rows.
+
+    ``rejected_rows`` only ever hold row-level rejections (bad values,
+    constraint violations), which would fail again on replay. Errors that
+    fail the whole insert (missing column, auth, RLS) are raised by
+    :func:`~database.batching.insert_chunked` instead and go through
+    :meth:`Outbox.fail` like any other exception.
+    """
+    if report is None:
+        return True
+    if report.failed_rows:
+        return False
+    if report.inserted > 0 or expected == 0:
+        return True
+    # Nothing inserted: fine if rows were rejected on their own merits;
+    # an empty report means the client bailed out early (e.g. the platform
+    # lookup failed), which is worth another try.
+    return bool(report.rejected_rows)
+
+
+class Outbox:
+    """SQLite-backed write-ahead log for ``insert_analysis`` batches.
+
+    Batches are written to disk before they are sent and deleted only once
+    the database has accepted them; anything that fails stays behind and is
+    replayed on a later :meth:`flush` with exponential backoff. Replays are
+    strictly in enqueue order: a failing batch holds back the ones after it.
+    Mention writes are upserts on their source identity and ``created_at``
+    is fixed at enqueue time, so delivering a batch twice is harmless.
+
+    Example::
+
+        outbox = Outbox()
+        outbox.enqueue(records, "Reddit")
+        async with db_client:
+            await outbox.flush_async(db_client.insert_analysis)
+    """
+
+    def __init__(self, path: Union[str, Path] = OUTBOX_FILE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        """Number of batches still waiting to be delivered."""
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM batches WHERE status = ?", (STATUS_PENDING,)
+        ).fetchone()
+        return count
+
+    # ------------------------------------------------------------------
+    # Queue operations
+    # ------------------------------------------------------------------
+
+    def enqueue(self, records: List[SentimentRecord], platform_name: str) -> int:
+        """Durably store a batch and return its ID."""
+        cursor = self._conn.execute(
+            "INSERT INTO batches (platform_name, records, enqueued_at) VALUES (?, ?, ?)",
+            (platform_name, _encode_records(records), time.time()),
+        )
+        log.debug(f"Outbox: stored batch {cursor.lastrowid} ({len(records)} records).")
+        return cursor.lastrowid
+
+    def pending(self) -> List[OutboxBatch]:
+        """Return every pending batch in enqueue order."""
+        return [batch for batch, _ in self._pending_rows()]
+
+    def _pending_rows(self) -> List[Tuple[OutboxBatch, float]]:
+        rows = self._conn.execute(
+            "SELECT id, platform_name, records, attempts, next_attempt_at FROM batches "
+            "WHERE status = ? ORDER BY id",
+            (STATUS_PENDING,),
+        ).fetchall()
+        return [
+            (OutboxBatch(id=r[0], platform_name=r[1], records=_decode_records(r[2]), attempts=r[3]), r[4])
+            for r in rows
+        ]
+
+    def ack(self, batch_id: int) -> None:
+        self._conn.execute("DELETE FROM batches WHERE id = ?", (batch_id,))
+
+    def park(self, batch: OutboxBatch, error: str) -> None:
+        """Take *batch* out of the queue as dead, keeping it on disk for inspection."""
+        log.error(f"Outbox: parking batch {batch.id} as dead ({error}).")
+        self._conn.execute(
+            "UPDATE batches SET status = ?, attempts = ?, last_error = ? WHERE id = ?",
+            (STATUS_DEAD, batch.attempts + 1, error, batch.id),
+        )
+
+    def fail(self, batch: OutboxBatch, error: str) -> None:
+        """Record a failed delivery and schedule the next attempt."""
+        attempts = batch.attempts + 1
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            self.park(batch, f"failed {attempts} times: {error}")
+            return
+        delay = min(OUTBOX_BACKOFF * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX)
+        log.warning(
+            f"Outbox: batch {batch.id} not delivered ({error}); retrying in {delay:.0f}s."
+        )
+        self._conn.execute(
+            "UPDATE batches SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (attempts, time.time() + delay, error, batch.id),
+        )
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _due_in_order(self, ignore_backoff: bool) -> List[OutboxBatch]:
+        """Pending batches up to (not including) the first one still in backoff.
+
+        Stopping there keeps delivery in enqueue order even when an earlier
+        batch is waiting out its retry delay.
+        """
+        now = float("inf") if ignore_backoff else time.time()
+        due = []
+        for batch, next_attempt_at in self._pending_rows():
+            if next_attempt_at > now:
+                break
+            due.append(batch)
+        return due
+
+    def _settle(self, batch: OutboxBatch, report: Optional[InsertReport], error: Optional[str]) -> Optional[bool]:
+        """Ack, park or fail *batch*: True if delivered, False if parked, None to stop."""
+        if error is None and _delivered(report, len(batch.records)):
+            self.ack(batch.id)
+            return True
+        if error is None and _unresolvable(report):
+            # Replaying would resolve the same symbols the same way; park it
+            # after this one attempt so it does not hold back the queue.
+            self.park(batch, f"none of {report.unresolved} records had a resolvable asset")
+            return False
+        self.fail(batch, error or f"{len(report.failed_rows) if report else 0} rows failed")
+        return None
+
+    def flush(self, insert_fn: InsertFn, ignore_backoff: bool = False) -> int:
+        """Replay due batches in order through *insert_fn*; return how many were delivered.
+
+        With *ignore_backoff* every pending batch is attempted now, e.g. at the
+        start of a fresh pipeline run.
+        """
+        delivered = 0
+        for batch in self._due_in_order(ignore_backoff):
+            try:
+                report, error = insert_fn(batch.records, batch.platform_name), None
+            except Exception as e:
+                report, error = None, str(e)
+            settled = self._settle(batch, report, error)
+            if settled is None:
+                break
+            delivered += settled
+        self._log_flush(delivered)
+        return delivered
+
+    async def flush_async(self, insert_fn: AsyncInsertFn, ignore_backoff: bool = False) -> int:
+        """Async counterpart of :meth:`flush`."""
+        delivered = 0
+        for batch in self._due_in_order(ignore_backoff):
+            try:
+                report, error = await insert_fn(batch.records, batch.platform_name), None
+            except Exception as e:
+                report, error = None, str(e)
+            settled = self._settle(batch, report, error)
+            if settled is None:
+                break
+            delivered += settled
+        self._log_flush(delivered)
+        return delivered
+
+    async def run(self, insert_fn: AsyncInsertFn, interval: float = OUTBOX_FLUSH_INTERVAL) -> None:
+        """Background flusher: call :meth:`flush_async` every *interval* seconds until cancelled."""
+        while True:
+            try:
+                await self.flush_async(insert_fn)
+            except Exception as e:
+                log.error(f"Outbox flush failed: {e}")
+            await asyncio.sleep(interval)
+
+    def _log_flush(self, delivered: int) -> None:
+        remaining = len(self)
+        if delivered or remaining:
+            log.info(f"Outbox: delivered {delivered} batch(es), {remaining} pending.")
@@ -0,0 +1,395 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Final, List, Optional, Set, Tuple
+
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+from config import (
+    ID_CACHE_MAX_SIZE,
+    POSTGRES_COPY_CHUNK_ROWS,
+    POSTGRES_DSN,
+    POSTGRES_POOL_MAX_SIZE,
+    POSTGRES_POOL_MIN_SIZE,
+)
+from data.ticker_universe import asset_type_of
+from database.batching import InsertReport, insert_chunked, insert_chunked_async
+from database.client_base import (
+    MENTION_CONFLICT_COLUMNS,
+    TABLE_ASSETS,
+    TABLE_MENTIONS,
+    TABLE_PLATFORMS,
+    TABLE_PROCESSED_POSTS,
+    AsyncCachedClient,
+    IdRows,
+    SyncCachedClient,
+)
+from database.rollups import (
+    RPC_CLEAR_MENTIONS,
+    RPC_COMPACT_MENTIONS,
+    RPC_REFRESH_ROLLUPS,
+    touched_buckets,
+)
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Column and type order of the binary COPY stream into asset_mentions.
+MENTION_COPY_COLUMNS: Final[Tuple[str, ...]] = (
+    "asset_id",
+    "platform_id",
+    "sentiment_score",
+    "confidence_level",
+    "source_id",
+    "source_name",
+    "source_text_id",
+    "source_text_snippet",
+    "key_rationale",
+    "mention_count",
+    "sentiment_sum",
+    "created_at",
+)
+MENTION_COPY_TYPES: Final[List[str]] = [
+    "int4", "int2", "numeric", "numeric",
+    "varchar", "varchar", "varchar", "text", "text", "int2", "numeric", "timestamptz",
+]
+_MENTION_UPDATE_COLUMNS: Final[Tuple[str, ...]] = tuple(
+    c for c in MENTION_COPY_COLUMNS if c not in MENTION_CONFLICT_COLUMNS
+)
+
+# platforms.name per database/schema.sql (the Supabase project calls it source_name).
+SQL_RESOLVE_PLATFORM: Final[str] = f"""
+    WITH ins AS (
+        INSERT INTO {TABLE_PLATFORMS} (name) VALUES (%(name)s)
+        ON CONFLICT (name) DO NOTHING
+        RETURNING platform_id
+    )
+    SELECT platform_id FROM ins
+    UNION ALL
+    SELECT platform_id FROM {TABLE_PLATFORMS} WHERE name = %(name)s
+    LIMIT 1
+"""
+SQL_UPSERT_ASSETS: Final[str] = f"""
+    INSERT INTO {TABLE_ASSETS} (ticker, asset_type)
+    SELECT * FROM unnest(%(tickers)s::varchar[], %(asset_types)s::varchar[])
+    ON CONFLICT (ticker) DO NOTHING
+"""
+SQL_SELECT_ASSETS: Final[str] = (
+    f"SELECT ticker, asset_id FROM {TABLE_ASSETS} WHERE ticker = ANY(%(tickers)s)"
+)
+SQL_SELECT_ALL_PLATFORMS: Final[str] = f"SELECT name, platform_id FROM {TABLE_PLATFORMS}"
+SQL_SELECT_ALL_ASSETS: Final[str] = f"SELECT ticker, asset_id FROM {TABLE_ASSETS} LIMIT %s"
+# COPY cannot resolve conflicts, so each chunk is copied into a temporary
+# staging table and merged into asset_mentions with one upsert.
+_STAGE_TABLE: Final[str] = "asset_mentions_stage"
+SQL_CREATE_STAGE: Final[str] = (
+    f"CREATE TEMP TABLE IF NOT EXISTS {_STAGE_TABLE} ON COMMIT DELETE ROWS AS "
+    f"SELECT {', '.join(MENTION_COPY_COLUMNS)} FROM {TABLE_MENTIONS} WITH NO DATA"
+)
+SQL_COPY_MENTIONS: Final[str] = (
+    f"COPY {_STAGE_TABLE} ({', '.join(MENTION_COPY_COLUMNS)}) FROM STDIN (FORMAT BINARY)"
+)
+SQL_MERGE_MENTIONS: Final[str] = (
+    f"INSERT INTO {TABLE_MENTIONS} ({', '.join(MENTION_COPY_COLUMNS)}) "
+    f"SELECT {', '.join(MENTION_COPY_COLUMNS)} FROM {_STAGE_TABLE} "
+    f"ON CONFLICT ({', '.join(MENTION_CONFLICT_COLUMNS)}) DO UPDATE SET "
+    + ", ".join(f"{c} = EXCLUDED.{c}" for c in _MENTION_UPDATE_COLUMNS)
+)
+SQL_REFRESH_ROLLUPS: Final[str] = (
+    f"SELECT {RPC_REFRESH_ROLLUPS}(%(p_asset_ids)s::int[], "
+    f"%(p_platform_ids)s::smallint[], %(p_buckets)s::timestamptz[])"
+)
+# Probes the (post_id, source_name) primary key once per candidate, so the
+# cost follows the size of the scrape, not of the table.
+SQL_SELECT_PROCESSED: Final[str] = (
+    f"SELECT post_id FROM {TABLE_PROCESSED_POSTS} "
+    f"WHERE source_name = %(source_name)s AND post_id = ANY(%(post_ids)s::varchar[])"
+)
+SQL_MARK_PROCESSED: Final[str] = f"""
+    INSERT INTO {TABLE_PROCESSED_POSTS} (post_id, source_name)
+    SELECT unnest(%(post_ids)s::varchar[]), %(source_name)s
+    ON CONFLICT (post_id, source_name) DO NOTHING
+"""
+SQL_COMPACT_MENTIONS: Final[str] = f"SELECT {RPC_COMPACT_MENTIONS}(%s)"
+SQL_CLEAR_MENTIONS: Final[str] = f"SELECT {RPC_CLEAR_MENTIONS}()"
+# to_jsonb gives the same JSON-ready rows PostgREST returns, for archiving.
+SQL_FETCH_MENTIONS_BEFORE: Final[str] = f"""
+    SELECT to_jsonb(m) FROM {TABLE_MENTIONS} m
+    WHERE created_at < %s
+    ORDER BY created_at, mention_id
+    LIMIT %s
+"""
+SQL_DELETE_MENTIONS: Final[str] = (
+    f"DELETE FROM {TABLE_MENTIONS} WHERE mention_id = ANY(%s) AND created_at < %s"
+)
+
+
+def _numeric(value: Optional[float]) -> Optional[Decimal]:
+    return None if value is None else Decimal(str(value))
+
+
+def _asset_params(tickers: List[str]) -> Dict[str, List[str]]:
+    return {"tickers": tickers, "asset_types": [asset_type_of(t) for t in tickers]}
+
+
+def to_copy_row(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Convert an ``asset_mentions`` row dict into a binary COPY tuple."""
+    return (
+        row["asset_id"],
+        row["platform_id"],
+        _numeric(row["sentiment_score"]),
+        _numeric(row["confidence_level"]),
+        row["source_id"],
+        row["source_name"],
+        row["source_text_id"],
+        row["source_text_snippet"],
+        row["key_rationale"],
+        row.get("mention_count", 1),
+        _numeric(row.get("sentiment_sum")),
+        datetime.fromisoformat(row["created_at"]),
+    )
+
+
+class PostgresClient(SyncCachedClient):
+    """Writes directly to a Postgres database (e.g. the docker-compose one).
+
+    Drop-in alternative to :class:`~database.supabase_client.SupabaseClient`,
+    selected with ``DATABASE_BACKEND = "postgres"``. Mentions are bulk-loaded
+    with binary ``COPY`` in ``POSTGRES_COPY_CHUNK_ROWS`` chunks, streamed in
+    parallel over a connection pool, which is orders of magnitude faster
+    than JSON inserts for seeding and backfills. Each chunk is staged and
+    merged with an upsert on the mention's source identity, so reloading
+    the same data is idempotent.
+    """
+
+    def __init__(self, dsn: str = POSTGRES_DSN) -> None:
+        self._init_caches(dsn)
+        self.pool = ConnectionPool(
+            dsn,
+            min_size=POSTGRES_POOL_MIN_SIZE,
+            max_size=POSTGRES_POOL_MAX_SIZE,
+            open=False,
+        )
+        try:
+            self.pool.open(wait=True)
+            log.info("Postgres connection pool initialised successfully.")
+        except Exception as e:
+            self.pool.close()
+            log.critical(f"Failed to connect to Postgres: {e}")
+            raise
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def __enter__(self) -> "PostgresClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Transport hooks (see database/client_base.py)
+    # ------------------------------------------------------------------
+
+    def _fetch_id_rows(self) -> Tuple[IdRows, IdRows]:
+        with self.pool.connection() as conn:
+            platforms = conn.execute(SQL_SELECT_ALL_PLATFORMS).fetchall()
+            assets = conn.execute(SQL_SELECT_ALL_ASSETS, (ID_CACHE_MAX_SIZE,)).fetchall()
+        return platforms, assets
+
+    def _lookup_platform_id(self, platform_name: str) -> Optional[int]:
+        with self.pool.connection() as conn:
+            row = conn.execute(SQL_RESOLVE_PLATFORM, {"name": platform_name}).fetchone()
+        return int(row[0]) if row else None
+
+    def _resolve_asset_ids(self, tickers: List[str]) -> Dict[str, int]:
+        """Create any unknown *tickers* and return ``ticker → asset_id``."""
+        with self.pool.connection() as conn:
+            conn.execute(SQL_UPSERT_ASSETS, _asset_params(tickers))
+            rows = conn.execute(SQL_SELECT_ASSETS, {"tickers": tickers}).fetchall()
+        return {ticker: int(asset_id) for ticker, asset_id in rows}
+
+    def _copy_mentions(self, rows: List[Dict[str, Any]]) -> None:
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(SQL_CREATE_STAGE)
+            with cur.copy(SQL_COPY_MENTIONS) as copy:
+                copy.set_types(MENTION_COPY_TYPES)
+                for row in rows:
+                    copy.write_row(to_copy_row(row))
+            cur.execute(SQL_MERGE_MENTIONS)
+
+    def _insert_mention_rows(self, rows: List[Dict[str, Any]]) -> InsertReport:
+        """Bulk-load mentions with binary ``COPY``, one chunk per pooled connection."""
+        return insert_chunked(
+            self._copy_mentions,
+            rows,
+            max_rows=POSTGRES_COPY_CHUNK_ROWS,
+            max_bytes=None,
+            concurrency=POSTGRES_POOL_MAX_SIZE,
+        )
+
+    def _lookup_processed(self, source_name: str, post_ids: List[str]) -> Set[str]:
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                SQL_SELECT_PROCESSED,
+                {"post_ids": post_ids, "source_name": source_name},
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def _insert_processed(self, post_ids: List[str], source_name: str) -> None:
+        with self.pool.connection() as conn:
+            conn.execute(
+                SQL_MARK_PROCESSED,
+                {"post_ids": post_ids, "source_name": source_name},
+            )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def refresh_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        """Re-aggregate the sentiment rollup buckets touched by *rows*."""
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(SQL_REFRESH_ROLLUPS, touched_buckets(rows))
+            log.info("Refreshed sentiment rollups for the inserted buckets.")
+        except Exception as e:
+            log.error(f"Failed to refresh sentiment rollups: {e}")
+
+    def clear_mentions(self) -> None:
+        """Wipe all existing records from the asset_mentions table and its rollups."""
+        log.warning(f"Clearing all data from '{TABLE_MENTIONS}' and the sentiment rollups...")
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(SQL_CLEAR_MENTIONS)
+            log.info(f"Successfully cleared table '{TABLE_MENTIONS}'.")
+        except Exception as e:
+            log.error(f"Failed to clear table '{TABLE_MENTIONS}': {e}")
+            raise
+
+    def compact_mention_rollups(self, before: datetime) -> datetime:
+        """Freeze the rollups before *before* and return the new retention watermark."""
+        with self.pool.connection() as conn:
+            return conn.execute(SQL_COMPACT_MENTIONS, (before,)).fetchone()[0]
+
+    def fetch_mentions_before(self, before: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Return up to *limit* of the oldest mentions created before *before*."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(SQL_FETCH_MENTIONS_BEFORE, (before, limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_mentions(self, mention_ids: List[int], before: datetime) -> None:
+        """Delete the mentions *mention_ids* (all created before *before*)."""
+        with self.pool.connection() as conn:
+            conn.execute(SQL_DELETE_MENTIONS, (list(mention_ids), before))
+
+
+class AsyncPostgresClient(AsyncCachedClient):
+    """Async counterpart of :class:`PostgresClient` on an async connection pool.
+
+    Mirrors :class:`~database.async_supabase_client.AsyncSupabaseClient`, so
+    the pipeline can use either backend unchanged::
+
+        async with await AsyncPostgresClient.create() as db_client:
+            await db_client.insert_analysis(records, "Reddit")
+    """
+
+    def __init__(self, pool: AsyncConnectionPool, namespace: str = "") -> None:
+        self.pool = pool
+        self._init_caches(namespace)
+
+    @classmethod
+    async def create(cls, dsn: str = POSTGRES_DSN) -> "AsyncPostgresClient":
+        pool = AsyncConnectionPool(
+            dsn,
+            min_size=POSTGRES_POOL_MIN_SIZE,
+            max_size=POSTGRES_POOL_MAX_SIZE,
+            open=False,
+        )
+        try:
+            await pool.open(wait=True)
+            log.info("Async Postgres connection pool initialised successfully.")
+        except Exception as e:
+            await pool.close()
+            log.critical(f"Failed to connect to Postgres: {e}")
+            raise
+        return cls(pool, namespace=dsn)
+
+    async def aclose(self) -> None:
+        await self.pool.close()
+
+    async def __aenter__(self) -> "AsyncPostgresClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    # ------------------------------------------------------------------
+    # Transport hooks (see database/client_base.py)
+    # ------------------------------------------------------------------
+
+    async def _fetch_id_rows(self) -> Tuple[IdRows, IdRows]:
+        async with self.pool.connection() as conn:
+            cur = await conn.execute(SQL_SELECT_ALL_PLATFORMS)
+            platforms = await cur.fetchall()
+            cur = await conn.execute(SQL_SELECT_ALL_ASSETS, (ID_CACHE_MAX_SIZE,))
+            assets = await cur.fetchall()
+        return platforms, assets
+
+    async def _lookup_platform_id(self, platform_name: str) -> Optional[int]:
+        async with self.pool.connection() as conn:
+            cur = await conn.execute(SQL_RESOLVE_PLATFORM, {"name": platform_name})
+            row = await cur.fetchone()
+        return int(row[0]) if row else None
+
+    async def _resolve_asset_ids(self, tickers: List[str]) -> Dict[str, int]:
+        async with self.pool.connection() as conn:
+            await conn.execute(SQL_UPSERT_ASSETS, _asset_params(tickers))
+            cur = await conn.execute(SQL_SELECT_ASSETS, {"tickers": tickers})
+            rows = await cur.fetchall()
+        return {ticker: int(asset_id) for ticker, asset_id in rows}
+
+    async def _copy_mentions(self, rows: List[Dict[str, Any]]) -> None:
+        async with self.pool.connection() as conn, conn.cursor() as cur:
+            await cur.execute(SQL_CREATE_STAGE)
+            async with cur.copy(SQL_COPY_MENTIONS) as copy:
+                copy.set_types(MENTION_COPY_TYPES)
+                for row in rows:
+                    await copy.write_row(to_copy_row(row))
+            await cur.execute(SQL_MERGE_MENTIONS)
+
+    async def _insert_mention_rows(self, rows: List[Dict[str, Any]]) -> InsertReport:
+        return await insert_chunked_async(
+            self._copy_mentions,
+            rows,
+            max_rows=POSTGRES_COPY_CHUNK_ROWS,
+            max_bytes=None,
+            concurrency=POSTGRES_POOL_MAX_SIZE,
+        )
+
+    async def _lookup_processed(self, source_name: str, post_ids: List[str]) -> Set[str]:
+        async with self.pool.connection() as conn:
+            cur = await conn.execute(
+                SQL_SELECT_PROCESSED,
+                {"post_ids": post_ids, "source_name": source_name},
+            )
+            return {row[0] for row in await cur.fetchall()}
+
+    async def _insert_processed(self, post_ids: List[str], source_name: str) -> None:
+        async with self.pool.connection() as conn:
+            await conn.execute(
+                SQL_MARK_PROCESSED,
+                {"post_ids": post_ids, "source_name": source_name},
+            )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def refresh_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        """Re-aggregate the sentiment rollup buckets touched by *rows*."""
+        try:
+            async with self.pool.connection() as conn:
+                await conn.execute(SQL_REFRESH_ROLLUPS, touched_buckets(rows))
+            log.info("Refreshed sentiment rollups for the inserted buckets.")
+        except Exception as e:
+            log.error(f"Failed to refresh sentiment rollups: {e}")
@@ -0,0 +1,109 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import PROCESSED_POST_CACHE_FILE, PROCESSED_POST_CACHE_TTL_DAYS
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class ProcessedPostCache:
+    """Time-windowed local record of post IDs known to be processed.
+
+    Scrapes mostly revisit the last few days of posts, so remembering the
+    IDs confirmed as processed (by a lookup or by ``mark_posts_processed``)
+    answers most of the next dedup check without a round trip. Entries
+    expire after *ttl_days*, which keeps the cache bounded by recent
+    activity rather than by all history; an expired ID is simply looked up
+    in the database again.
+
+    If *path* is given the cache is loaded from and saved to that JSON file.
+    """
+
+    def __init__(
+        self,
+        ttl_days: float = PROCESSED_POST_CACHE_TTL_DAYS,
+        path: Optional[Path] = None,
+    ) -> None:
+        self.ttl = ttl_days * 86400
+        self.path = path
+        self._seen: Dict[str, Dict[str, float]] = {}  # source -> post id -> seen at
+        self._dirty = False
+        if self.path:
+            self._load()
+
+    @classmethod
+    def from_config(cls) -> "ProcessedPostCache":
+        """Build the cache, file-backed if ``PROCESSED_POST_CACHE_FILE`` is set."""
+        path = Path(PROCESSED_POST_CACHE_FILE) if PROCESSED_POST_CACHE_FILE else None
+        return cls(path=path)
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._seen.values())
+
+    def split(self, source_name: str, post_ids: Iterable[str]) -> Tuple[Set[str], List[str]]:
+        """Partition *post_ids* into ``(known processed, still to look up)``."""
+        seen = self._seen.get(source_name, {})
+        cutoff = time.time() - self.ttl
+        known: Set[str] = set()
+        unknown: List[str] = []
+        for post_id in dict.fromkeys(post_ids):
+            if seen.get(post_id, 0.0) > cutoff:
+                known.add(post_id)
+            else:
+                unknown.append(post_id)
+        return known, unknown
+
+    def add(self, source_name: str, post_ids: Iterable[str]) -> None:
+        now = time.time()
+        seen = self._seen.setdefault(source_name, {})
+        for post_id in post_ids:
+            seen[post_id] = now
+            self._dirty = True
+
+    def prune(self) -> None:
+        """Drop entries older than the TTL."""
+        cutoff = time.time() - self.ttl
+        for source_name, seen in list(self._seen.items()):
+            fresh = {pid: ts for pid, ts in seen.items() if ts > cutoff}
+            if len(fresh) != len(seen):
+                self._dirty = True
+            if fresh:
+                self._seen[source_name] = fresh
+            else:
+                del self._seen[source_name]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            self._seen = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            log.warning(f"Could not read processed-post cache '{self.path}', starting empty: {e}")
+            self._seen = {}
+            return
+        self.prune()
+        self._dirty = False
+
+    def save(self) -> None:
+        """Prune expired entries and write the cache to its file (if any)."""
+        if not self.path:
+            return
+        self.prune()
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self._seen), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            log.warning(f"Failed to save processed-post cache '{self.path}': {e}")
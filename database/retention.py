@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import (
+    MENTION_ARCHIVE_DIR,
+    MENTION_RETENTION_BATCH,
+    MENTION_RETENTION_DAYS,
+)
+from data.storage import Storage, zstandard
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# The dashboard's short-range trends read hourly rollups for up to 2 days,
+# and compaction drops hourly rollups below the retention watermark.
+MIN_RETENTION_DAYS = 3
+
+
+def archive_storage() -> Storage:
+    """NDJSON, zstd-compressed when ``zstandard`` is available."""
+    return Storage("ndjson", "zstd" if zstandard is not None else None)
+
+
+def archive_path(directory: Path, rows: List[Dict[str, Any]], storage: Storage) -> Path:
+    """Name an archive file after the first row of the batch it holds.
+
+    Batches are taken oldest first, so re-running after a crash between
+    archiving and deleting rewrites the same file instead of adding another.
+    """
+    first = rows[0]
+    stamp = datetime.fromisoformat(first["created_at"]).astimezone(timezone.utc)
+    return directory / f"mentions_{stamp:%Y%m%dT%H%M%S}_{first['mention_id']}{storage.suffix}"
+
+
+def apply_retention(
+    db_client: Any,
+    older_than_days: int = MENTION_RETENTION_DAYS,
+    batch_size: int = MENTION_RETENTION_BATCH,
+    archive_dir: Optional[str] = MENTION_ARCHIVE_DIR,
+) -> int:
+    """Compact, archive and delete ``asset_mentions`` older than *older_than_days*.
+
+    1. ``compact_mention_rollups`` folds the old mentions into the daily
+       rollups for good and returns the retention watermark (a UTC day).
+    2. Mentions before the watermark are fetched oldest first, *batch_size*
+       at a time, written to a compressed NDJSON file in *archive_dir*
+       (skipped when it is None) and then deleted by ID, so each delete is a
+       short statement rather than one long lock.
+
+    Works with any client providing ``compact_mention_rollups``,
+    ``fetch_mentions_before`` and ``delete_mentions`` (the sync Supabase and
+    Postgres clients). Returns the number of mentions removed.
+    """
+    if older_than_days < MIN_RETENTION_DAYS:
+        raise ValueError(
+            f"Retention of {older_than_days} days is below the minimum of {MIN_RETENTION_DAYS}."
+        )
+
+    before = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    watermark = db_client.compact_mention_rollups(before)
+    log.info(f"Mentions before {watermark.isoformat()} are compacted into the daily rollups.")
+
+    storage = archive_storage()
+    directory = Path(archive_dir) if archive_dir else None
+    if directory:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    removed = 0
+    while True:
+        rows = db_client.fetch_mentions_before(watermark, batch_size)
+        if not rows:
+            break
+        if directory:
+            # Written before the delete: a failed write aborts with nothing lost.
+            storage.write(archive_path(directory, rows, storage), rows)
+        db_client.delete_mentions([row["mention_id"] for row in rows], watermark)
+        removed += len(rows)
+        log.debug(f"Retention: removed {removed} mentions so far...")
+
+    log.info(
+        f"Retention removed {removed} mentions"
+        + (f", archived to '{directory}'." if directory and removed else ".")
+    )
+    return removed
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Final, List
+
+RPC_REFRESH_ROLLUPS: Final[str] = "refresh_sentiment_rollups"
+RPC_COMPACT_MENTIONS: Final[str] = "compact_mention_rollups"
+RPC_CLEAR_MENTIONS: Final[str] = "clear_mentions"
+
+
+def touched_buckets(rows: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Return ``refresh_sentiment_rollups`` arguments for *rows*.
+
+    Each distinct (asset, platform, UTC hour) the ``asset_mentions`` *rows*
+    fall into is listed once, as parallel arrays, so only those hourly
+    buckets and the days containing them are re-aggregated. Late-arriving
+    rows simply name an older bucket.
+    """
+    touched = {
+        (
+            row["asset_id"],
+            row["platform_id"],
+            datetime.fromisoformat(row["created_at"])
+            .astimezone(timezone.utc)
+            .replace(minute=0, second=0, microsecond=0),
+        )
+        for row in rows
+    }
+    ordered = sorted(touched, key=lambda t: (t[2], t[0], t[1] or 0))
+    return {
+        "p_asset_ids": [t[0] for t in ordered],
+        "p_platform_ids": [t[1] for t in ordered],
+        "p_buckets": [t[2].isoformat() for t in ordered],
+    }
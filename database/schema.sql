@@ -10,14 +10,346 @@ CREATE TABLE assets (
     asset_type VARCHAR(50)
 );
 
+-- Range-partitioned by month on created_at (see create_mention_partitions;
+-- `python -m database.migrate` keeps future months created ahead of time).
+-- Unique keys on a partitioned table must include the partition key.
 CREATE TABLE asset_mentions (
-    mention_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    mention_id BIGSERIAL,
     asset_id INT NOT NULL REFERENCES assets(asset_id),
     platform_id SMALLINT REFERENCES platforms(platform_id),
     sentiment_score NUMERIC(5, 4), 
     confidence_level NUMERIC(5, 4), 
+    source_id VARCHAR(255),
+    source_name VARCHAR(50),
     source_text_id VARCHAR(50),
     source_text_snippet TEXT,
     key_rationale TEXT,
-    created_at TIMESTAMPTZ NOT NULL
-);
\ No newline at end of file
+    -- Records merged into this row by the pipeline's consolidation stage.
+    mention_count SMALLINT NOT NULL DEFAULT 1,
+    -- Their plain score sum (NULL: sentiment_score * mention_count).
+    sentiment_sum NUMERIC,
+    created_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (mention_id, created_at),
+    -- One row per analysed text: pipeline retries and reruns upsert onto it.
+    CONSTRAINT asset_mentions_source_key
+        UNIQUE NULLS NOT DISTINCT (asset_id, platform_id, source_id, source_text_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catches rows outside every monthly partition so inserts never fail.
+CREATE TABLE asset_mentions_default PARTITION OF asset_mentions DEFAULT;
+
+-- Trend and rollup queries filter on asset + time range; the INCLUDE columns
+-- let them run as index-only scans. BRIN keeps whole-table time scans cheap.
+CREATE INDEX asset_mentions_asset_time_idx
+    ON asset_mentions (asset_id, created_at) INCLUDE (platform_id, sentiment_score, confidence_level);
+CREATE INDEX asset_mentions_platform_time_idx ON asset_mentions (platform_id, created_at);
+CREATE INDEX asset_mentions_created_brin ON asset_mentions USING brin (created_at);
+
+-- Create the monthly partitions for p_months months starting at p_from's
+-- month (UTC boundaries). Existing partitions are left alone; returns the
+-- number created.
+CREATE OR REPLACE FUNCTION create_mention_partitions(p_from DATE, p_months INT)
+RETURNS INT LANGUAGE plpgsql AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_from)::date;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    FOR i IN 1 .. p_months LOOP
+        part := format('asset_mentions_%s', to_char(month_start, 'YYYY_MM'));
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF asset_mentions FOR VALUES FROM (%L) TO (%L)',
+                part,
+                month_start::timestamp AT TIME ZONE 'UTC',
+                (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+        month_start := (month_start + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+SELECT create_mention_partitions((now() - interval '1 month')::date, 4);
+
+CREATE TABLE processed_posts (
+    post_id VARCHAR(50) NOT NULL,
+    source_name VARCHAR(50) NOT NULL,
+    processed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (post_id, source_name)
+);
+
+-- Pre-aggregated sentiment per asset, platform and time bucket, maintained
+-- by the pipeline after every insert (see refresh_sentiment_rollups) so the
+-- dashboard RPCs never scan asset_mentions.
+CREATE TABLE sentiment_rollup_hourly (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    platform_id SMALLINT REFERENCES platforms(platform_id) ON DELETE CASCADE,
+    bucket TIMESTAMPTZ NOT NULL,
+    mention_count INT NOT NULL,
+    sentiment_sum NUMERIC NOT NULL,
+    weighted_sentiment_sum NUMERIC NOT NULL,  -- sum(sentiment_score * confidence_level)
+    confidence_sum NUMERIC NOT NULL,
+    CONSTRAINT sentiment_rollup_hourly_key UNIQUE NULLS NOT DISTINCT (asset_id, platform_id, bucket)
+);
+
+CREATE TABLE sentiment_rollup_daily (LIKE sentiment_rollup_hourly INCLUDING ALL);
+
+CREATE INDEX sentiment_rollup_hourly_bucket_idx ON sentiment_rollup_hourly (bucket);
+CREATE INDEX sentiment_rollup_daily_bucket_idx ON sentiment_rollup_daily (bucket);
+
+-- Mentions before compacted_before have been folded into the rollups for
+-- good (compact_mention_rollups) and may be deleted; the rollup buckets
+-- before it are frozen and no longer rebuilt from asset_mentions.
+CREATE TABLE mention_retention (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    compacted_before TIMESTAMPTZ NOT NULL DEFAULT '-infinity'
+);
+INSERT INTO mention_retention DEFAULT VALUES;
+
+-- Re-aggregate only the hourly buckets listed (parallel arrays, one entry per
+-- touched asset/platform/hour) and the days containing them. Buckets whose
+-- mentions have all gone are removed; compacted (frozen) buckets are skipped.
+CREATE OR REPLACE FUNCTION refresh_sentiment_rollups(
+    p_asset_ids INT[],
+    p_platform_ids SMALLINT[],
+    p_buckets TIMESTAMPTZ[]
+) RETURNS VOID LANGUAGE plpgsql AS $$
+BEGIN
+    CREATE TEMP TABLE IF NOT EXISTS _touched_rollups (
+        asset_id INT, platform_id SMALLINT, bucket TIMESTAMPTZ
+    ) ON COMMIT DROP;
+    TRUNCATE _touched_rollups;
+    INSERT INTO _touched_rollups
+    SELECT DISTINCT a, p, date_trunc('hour', b, 'UTC')
+    FROM unnest(p_asset_ids, p_platform_ids, p_buckets) AS t(a, p, b);
+    DELETE FROM _touched_rollups
+    WHERE bucket < (SELECT compacted_before FROM mention_retention);
+
+    DELETE FROM sentiment_rollup_hourly r
+    USING _touched_rollups t
+    WHERE r.asset_id = t.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM t.platform_id
+      AND r.bucket = t.bucket;
+
+    INSERT INTO sentiment_rollup_hourly
+    SELECT t.asset_id, t.platform_id, t.bucket,
+           sum(m.mention_count),
+           sum(coalesce(m.sentiment_sum, m.sentiment_score * m.mention_count)),
+           sum(m.sentiment_score * coalesce(m.confidence_level, 0) * m.mention_count),
+           sum(coalesce(m.confidence_level, 0) * m.mention_count)
+    FROM _touched_rollups t
+    JOIN asset_mentions m
+      ON m.asset_id = t.asset_id
+     AND m.platform_id IS NOT DISTINCT FROM t.platform_id
+     AND m.created_at >= t.bucket
+     AND m.created_at < t.bucket + interval '1 hour'
+    GROUP BY t.asset_id, t.platform_id, t.bucket;
+
+    -- Days are rebuilt from their (at most 24) hourly rows.
+    DELETE FROM sentiment_rollup_daily r
+    USING (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+           FROM _touched_rollups) d
+    WHERE r.asset_id = d.asset_id
+      AND r.platform_id IS NOT DISTINCT FROM d.platform_id
+      AND r.bucket = d.day;
+
+    INSERT INTO sentiment_rollup_daily
+    SELECT h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC') AS day,
+           sum(h.mention_count), sum(h.sentiment_sum),
+           sum(h.weighted_sentiment_sum), sum(h.confidence_sum)
+    FROM sentiment_rollup_hourly h
+    JOIN (SELECT DISTINCT asset_id, platform_id, date_trunc('day', bucket, 'UTC') AS day
+          FROM _touched_rollups) d
+      ON h.asset_id = d.asset_id
+     AND h.platform_id IS NOT DISTINCT FROM d.platform_id
+     AND h.bucket >= d.day
+     AND h.bucket < d.day + interval '1 day'
+    GROUP BY h.asset_id, h.platform_id, date_trunc('day', h.bucket, 'UTC');
+END;
+$$;
+
+-- Retention: fold every mention before p_before (rounded down to a UTC day)
+-- into the rollups for good. Buckets since the previous watermark are
+-- refreshed one last time, the watermark moves forward and the hourly
+-- rollups below it are dropped, leaving daily resolution for old data.
+-- Returns the new watermark; mentions before it can then be archived and
+-- deleted in batches.
+CREATE OR REPLACE FUNCTION compact_mention_rollups(p_before TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ LANGUAGE plpgsql AS $$
+DECLARE
+    v_from TIMESTAMPTZ;
+    v_to TIMESTAMPTZ := date_trunc('day', p_before, 'UTC');
+BEGIN
+    SELECT compacted_before INTO v_from FROM mention_retention FOR UPDATE;
+    IF v_to <= v_from THEN
+        RETURN v_from;
+    END IF;
+
+    PERFORM refresh_sentiment_rollups(array_agg(asset_id), array_agg(platform_id), array_agg(bucket))
+    FROM (SELECT DISTINCT asset_id, platform_id, date_trunc('hour', created_at, 'UTC') AS bucket
+          FROM asset_mentions
+          WHERE created_at >= v_from AND created_at < v_to) touched;
+
+    UPDATE mention_retention SET compacted_before = v_to;
+    DELETE FROM sentiment_rollup_hourly WHERE bucket < v_to;
+    RETURN v_to;
+END;
+$$;
+
+-- Reset: wipe every mention together with the rollups built from them and
+-- the retention watermark, in one transaction, so the dashboards never show
+-- buckets whose mentions are gone.
+CREATE OR REPLACE FUNCTION clear_mentions() RETURNS VOID LANGUAGE sql AS $$
+    TRUNCATE asset_mentions, sentiment_rollup_hourly, sentiment_rollup_daily;
+    UPDATE mention_retention SET compacted_before = '-infinity';
+$$;
+
+-- Dashboard RPCs (frontend /api/trends, /api/top-stocks, /api/stats), served
+-- from the rollups. Averages are confidence-weighted.
+CREATE OR REPLACE FUNCTION get_sentiment_trends(p_ticker TEXT DEFAULT NULL, p_days INT DEFAULT 7)
+RETURNS TABLE (date TIMESTAMPTZ, avg_sentiment NUMERIC, mentions BIGINT)
+LANGUAGE sql STABLE AS $$
+    SELECT r.bucket,
+           round(sum(r.weighted_sentiment_sum) / nullif(sum(r.confidence_sum), 0), 4),
+           sum(r.mention_count)
+    FROM (
+        SELECT * FROM sentiment_rollup_hourly WHERE p_days <= 2
+        UNION ALL
+        SELECT * FROM sentiment_rollup_daily WHERE p_days > 2
+    ) r
+    JOIN assets a ON a.asset_id = r.asset_id
+    WHERE r.bucket >= now() - make_interval(days => p_days)
+      AND (p_ticker IS NULL OR a.ticker = p_ticker)
+    GROUP BY r.bucket
+    ORDER BY r.bucket;
+$$;
+
+CREATE OR REPLACE FUNCTION get_top_stocks(p_days INT DEFAULT 7, p_limit INT DEFAULT 10)
+RETURNS TABLE (ticker VARCHAR, asset_name VARCHAR, mentions BIGINT, avg_sentiment NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT a.ticker, a.asset_name,
+           sum(r.mention_count),
+           round(sum(r.weighted_sentiment_sum) / nullif(sum(r.confidence_sum), 0), 4)
+    FROM sentiment_rollup_daily r
+    JOIN assets a ON a.asset_id = r.asset_id
+    WHERE r.bucket >= date_trunc('day', now(), 'UTC') - make_interval(days => p_days)
+    GROUP BY a.ticker, a.asset_name
+    ORDER BY 3 DESC
+    LIMIT p_limit;
+$$;
+
+CREATE OR REPLACE FUNCTION get_dashboard_stats()
+RETURNS TABLE (total_assets BIGINT, total_mentions BIGINT, average_sentiment NUMERIC)
+LANGUAGE sql STABLE AS $$
+    SELECT (SELECT count(*) FROM assets),
+           coalesce(sum(mention_count), 0),
+           coalesce(round(sum(weighted_sentiment_sum) / nullif(sum(confidence_sum), 0), 4), 0)
+    FROM sentiment_rollup_daily;
+$$;
+
+-- Precomputed rolling analytics per asset and bucket (analytics/rolling.py,
+-- scripts/compute_analytics.py): confidence-weighted bucket/rolling means,
+-- fast/slow EMAs, momentum and mention-volume z-scores. Empty buckets are
+-- included, with EMAs carried forward, so charts need no gap filling.
+CREATE TABLE sentiment_analytics (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    resolution VARCHAR(4) NOT NULL CHECK (resolution IN ('hour', 'day')),
+    bucket TIMESTAMPTZ NOT NULL,
+    mention_count INT NOT NULL,
+    avg_sentiment DOUBLE PRECISION,
+    rolling_sentiment DOUBLE PRECISION,
+    ema_fast DOUBLE PRECISION,
+    ema_slow DOUBLE PRECISION,
+    momentum DOUBLE PRECISION,
+    volume_zscore DOUBLE PRECISION,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (asset_id, resolution, bucket)
+);
+
+CREATE OR REPLACE FUNCTION get_sentiment_analytics(
+    p_ticker TEXT,
+    p_days INT DEFAULT 30,
+    p_resolution TEXT DEFAULT 'day'
+)
+RETURNS TABLE (
+    bucket TIMESTAMPTZ, mention_count INT, avg_sentiment DOUBLE PRECISION,
+    rolling_sentiment DOUBLE PRECISION, ema_fast DOUBLE PRECISION, ema_slow DOUBLE PRECISION,
+    momentum DOUBLE PRECISION, volume_zscore DOUBLE PRECISION
+)
+LANGUAGE sql STABLE AS $$
+    SELECT s.bucket, s.mention_count, s.avg_sentiment, s.rolling_sentiment,
+           s.ema_fast, s.ema_slow, s.momentum, s.volume_zscore
+    FROM sentiment_analytics s
+    JOIN assets a ON a.asset_id = s.asset_id
+    WHERE a.ticker = p_ticker
+      AND s.resolution = p_resolution
+      AND s.bucket >= now() - make_interval(days => p_days)
+    ORDER BY s.bucket;
+$$;
+
+-- Daily prices synced from the local price store (analytics/prices.py,
+-- scripts/sync_prices.py), so the dashboard never calls a price API per view,
+-- and per-asset correlations of daily sentiment with the return `lag_days`
+-- later (analytics/correlation.py).
+CREATE TABLE asset_prices (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    date DATE NOT NULL,
+    open DOUBLE PRECISION,
+    high DOUBLE PRECISION,
+    low DOUBLE PRECISION,
+    close DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION,
+    PRIMARY KEY (asset_id, date)
+);
+
+CREATE TABLE sentiment_price_correlations (
+    asset_id INT NOT NULL REFERENCES assets(asset_id) ON DELETE CASCADE,
+    lag_days INT NOT NULL,
+    correlation DOUBLE PRECISION,
+    n_obs INT NOT NULL,
+    window_days INT NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (asset_id, lag_days)
+);
+
+CREATE OR REPLACE FUNCTION get_asset_prices(p_ticker TEXT, p_days INT DEFAULT 30)
+RETURNS TABLE (date DATE, close DOUBLE PRECISION)
+LANGUAGE sql STABLE AS $$
+    SELECT p.date, p.close
+    FROM asset_prices p
+    JOIN assets a ON a.asset_id = p.asset_id
+    WHERE a.ticker = p_ticker
+      AND p.date >= current_date - p_days
+    ORDER BY p.date;
+$$;
+
+CREATE OR REPLACE FUNCTION get_sentiment_price_correlations(p_lag INT DEFAULT 1)
+RETURNS TABLE (ticker VARCHAR, correlation DOUBLE PRECISION, n_obs INT, computed_at TIMESTAMPTZ)
+LANGUAGE sql STABLE AS $$
+    SELECT a.ticker, c.correlation, c.n_obs, c.computed_at
+    FROM sentiment_price_correlations c
+    JOIN assets a ON a.asset_id = c.asset_id
+    WHERE c.lag_days = p_lag
+      AND c.correlation IS NOT NULL
+    ORDER BY abs(c.correlation) DESC;
+$$;
+
+-- Applied migrations (database/migrate.py). This file already contains
+-- everything up to the versions listed here.
+CREATE TABLE schema_migrations (
+    version VARCHAR(255) PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+INSERT INTO schema_migrations (version) VALUES
+    ('001_mention_source_identity'),
+    ('002_sentiment_rollups'),
+    ('003_partition_asset_mentions'),
+    ('004_mention_retention'),
+    ('005_sentiment_analytics'),
+    ('006_price_history'),
+    ('007_mention_count'),
+    ('008_mention_sentiment_sum'),
+    ('009_clear_mentions');
@@ -1,29 +1,46 @@
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Final
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from supabase import Client, create_client
 from postgrest.exceptions import APIError
 
-from config import SUPABASE_KEY, SUPABASE_URL
-from data.models import SentimentRecord
+from config import (
+    ID_CACHE_MAX_SIZE,
+    PROCESSED_POST_LOOKUP_BATCH,
+    SUPABASE_KEY,
+    SUPABASE_URL,
+)
+from data.ticker_universe import asset_type_of
+from database.batching import InsertReport, chunk_rows, insert_chunked, is_row_error
+from database.client_base import (
+    COL_ASSET_ID,
+    COL_ASSET_TYPE,
+    COL_CREATED_AT,
+    COL_MENTION_ID,
+    COL_PLATFORM_ID,
+    COL_POST_ID,
+    COL_SOURCE_NAME,
+    COL_TICKER,
+    MENTION_CONFLICT_COLUMNS,
+    TABLE_ASSETS,
+    TABLE_MENTIONS,
+    TABLE_PLATFORMS,
+    TABLE_PROCESSED_POSTS,
+    IdRows,
+    SyncCachedClient,
+)
+from database.rollups import (
+    RPC_CLEAR_MENTIONS,
+    RPC_COMPACT_MENTIONS,
+    RPC_REFRESH_ROLLUPS,
+    touched_buckets,
+)
 from utils.logger import get_logger
 
 log = get_logger(__name__)
 
-# --- Constants ---
-TABLE_PLATFORMS: Final[str] = "platforms"
-TABLE_ASSETS: Final[str] = "assets"
-TABLE_MENTIONS: Final[str] = "asset_mentions"
-TABLE_PROCESSED_POSTS: Final[str] = "processed_posts"
 
-COL_PLATFORM_ID: Final[str] = "platform_id"
-COL_ASSET_ID: Final[str] = "asset_id"
-COL_TICKER: Final[str] = "ticker"
-COL_POST_ID: Final[str] = "post_id"
-COL_SOURCE_NAME: Final[str] = "source_name"
-
-
-class SupabaseClient:
+class SupabaseClient(SyncCachedClient):
     """Handles all database interactions with Supabase."""
 
     def __init__(self) -> None:
@@ -38,6 +55,8 @@ class SupabaseClient:
             log.critical(f"Failed to initialise Supabase client: {e}")
             raise
 
+        self._init_caches(SUPABASE_URL)
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
@@ -65,32 +84,33 @@ class SupabaseClient:
             id_column:       Name of the primary-key column to return.
 
         Returns:
-            The integer ID of the found or created record, or *None* on error.
+            The integer ID of the found or created record, or *None* if the
+            insert returned no data.
+
+        Raises:
+            Any query error other than a lost insert race, so callers can
+            tell a failed lookup from a missing record.
         """
-        try:
-            response = self._build_query(table, search_criteria).execute()
-
-            if response.data:
-                return int(response.data[0].get(id_column))
-
-            # Record not found — attempt insert.
-            try:
-                insert_response = self.client.table(table).insert(insert_data).execute()
-                if insert_response.data:
-                    log.info(f"Created new record in '{table}': {insert_data}")
-                    return int(insert_response.data[0].get(id_column))
-            except APIError as insert_error:
-                # Handle race condition: another process may have inserted first.
-                log.warning(
-                    f"Insert failed for '{table}', retrying fetch: {insert_error}"
-                )
-                retry_response = self._build_query(table, search_criteria).execute()
-                if retry_response.data:
-                    return int(retry_response.data[0].get(id_column))
-                raise insert_error
+        response = self._build_query(table, search_criteria).execute()
 
-        except Exception as e:
-            log.error(f"Error managing record in '{table}': {e}")
+        if response.data:
+            return int(response.data[0].get(id_column))
+
+        # Record not found — attempt insert.
+        try:
+            insert_response = self.client.table(table).insert(insert_data).execute()
+            if insert_response.data:
+                log.info(f"Created new record in '{table}': {insert_data}")
+                return int(insert_response.data[0].get(id_column))
+        except APIError as insert_error:
+            # Handle race condition: another process may have inserted first.
+            log.warning(
+                f"Insert failed for '{table}', retrying fetch: {insert_error}"
+            )
+            retry_response = self._build_query(table, search_criteria).execute()
+            if retry_response.data:
+                return int(retry_response.data[0].get(id_column))
+            raise insert_error
         return None
 
     def _prefetch_asset_ids(self, tickers: List[str]) -> Dict[str, int]:
@@ -101,191 +121,181 @@ class SupabaseClient:
         """
         if not tickers:
             return {}
-        try:
-            response = (
-                self.client.table(TABLE_ASSETS)
-                .select(f"{COL_TICKER}, {COL_ASSET_ID}")
-                .in_(COL_TICKER, tickers)
-                .execute()
-            )
-            return {
-                row[COL_TICKER]: int(row[COL_ASSET_ID])
-                for row in (response.data or [])
-            }
-        except Exception as e:
-            log.warning(
-                f"Pre-fetch of asset IDs failed, falling back to per-item lookup: {e}"
-            )
-            return {}
+        response = (
+            self.client.table(TABLE_ASSETS)
+            .select(f"{COL_TICKER}, {COL_ASSET_ID}")
+            .in_(COL_TICKER, tickers)
+            .execute()
+        )
+        return {
+            row[COL_TICKER]: int(row[COL_ASSET_ID])
+            for row in (response.data or [])
+        }
 
     # ------------------------------------------------------------------
-    # Public API
+    # Transport hooks (see database/client_base.py)
     # ------------------------------------------------------------------
 
-    def insert_analysis(
-        self, records: List[SentimentRecord], platform_name: str
-    ) -> None:
-        """Batch-insert LLM analysis results into Supabase.
-
-        Args:
-            records:       Validated :class:`~data.models.SentimentRecord` objects.
-            platform_name: Source label (e.g. ``'Reddit/stocks'``).
-        """
-        if not records:
-            return
+    def _fetch_id_rows(self) -> Tuple[IdRows, IdRows]:
+        platforms = (
+            self.client.table(TABLE_PLATFORMS)
+            .select(f"{COL_SOURCE_NAME}, {COL_PLATFORM_ID}")
+            .execute()
+        )
+        assets = (
+            self.client.table(TABLE_ASSETS)
+            .select(f"{COL_TICKER}, {COL_ASSET_ID}")
+            .limit(ID_CACHE_MAX_SIZE)
+            .execute()
+        )
+        return (
+            [(row[COL_SOURCE_NAME], row[COL_PLATFORM_ID]) for row in (platforms.data or [])],
+            [(row[COL_TICKER], row[COL_ASSET_ID]) for row in (assets.data or [])],
+        )
 
-        platform_id = self._get_or_create(
+    def _lookup_platform_id(self, platform_name: str) -> Optional[int]:
+        return self._get_or_create(
             table=TABLE_PLATFORMS,
             search_criteria={COL_SOURCE_NAME: platform_name},
             insert_data={COL_SOURCE_NAME: platform_name},
             id_column=COL_PLATFORM_ID,
         )
 
-        if not platform_id:
+    def _resolve_asset_ids(self, tickers: List[str]) -> Dict[str, int]:
+        """Pre-fetch *tickers* in one round-trip and bulk-create the missing ones."""
+        asset_ids = self._prefetch_asset_ids(tickers)
+        missing_tickers = [t for t in tickers if t not in asset_ids]
+        if not missing_tickers:
+            return asset_ids
+
+        insert_data = [
+            {COL_TICKER: t, COL_ASSET_TYPE: asset_type_of(t)} for t in missing_tickers
+        ]
+        try:
+            self.client.table(TABLE_ASSETS).upsert(
+                insert_data,
+                on_conflict=COL_TICKER,
+                ignore_duplicates=True
+            ).execute()
+            log.info(f"Bulk upserted {len(missing_tickers)} new assets.")
+            asset_ids.update(self._prefetch_asset_ids(missing_tickers))
+        except Exception as e:
+            # Only a row-level refusal (one bad ticker) is worth working
+            # around; outages and schema/auth errors fail the whole batch.
+            if not is_row_error(e):
+                raise
             log.error(
-                f"Could not resolve platform_id for '{platform_name}'. Skipping batch."
+                f"Failed to bulk upsert assets: {e}. Falling back to individual creation."
             )
-            return
-
-        # Pre-fetch all known tickers in a single round-trip.
-        unique_tickers = list({r.symbol for r in records})
-        asset_id_cache: Dict[str, int] = self._prefetch_asset_ids(unique_tickers)
-
-        # Batch insert missing tickers
-        missing_tickers = [t for t in unique_tickers if t not in asset_id_cache]
-        if missing_tickers:
-            insert_data = [
-                {COL_TICKER: t, "asset_type": "Stock"} for t in missing_tickers
-            ]
-            try:
-                self.client.table(TABLE_ASSETS).upsert(
-                    insert_data,
-                    on_conflict=COL_TICKER,
-                    ignore_duplicates=True
-                ).execute()
-                log.info(f"Bulk upserted {len(missing_tickers)} new assets.")
-                
-                # Update cache with newly created IDs
-                new_asset_ids = self._prefetch_asset_ids(missing_tickers)
-                asset_id_cache.update(new_asset_ids)
-            except Exception as e:
-                log.error(
-                    f"Failed to bulk upsert assets: {e}. Falling back to individual creation."
-                )
-                for ticker in missing_tickers:
+            for ticker in missing_tickers:
+                try:
                     asset_id = self._get_or_create(
                         table=TABLE_ASSETS,
-                        search_criteria={COL_TICKER: ticker, "asset_type": "Stock"},
-                        insert_data={COL_TICKER: ticker, "asset_type": "Stock"},
+                        search_criteria={COL_TICKER: ticker},
+                        insert_data={COL_TICKER: ticker, COL_ASSET_TYPE: asset_type_of(ticker)},
                         id_column=COL_ASSET_ID,
                     )
-                    if asset_id:
-                        asset_id_cache[ticker] = asset_id
-
-        # Build the batch payload.
-        batch_mentions: List[Dict[str, Any]] = []
-        log.info(f"Preparing batch insert for {len(records)} records...")
-
-        for record in records:
-            asset_id = asset_id_cache.get(record.symbol)
-            if not asset_id:
-                log.warning(
-                    f"Could not resolve asset_id for '{record.symbol}'. Skipping."
-                )
-                continue
-
-            created_at = record.created_at or datetime.now(timezone.utc)
-
-            batch_mentions.append({
-                COL_ASSET_ID: asset_id,
-                COL_PLATFORM_ID: platform_id,
-                "sentiment_score": record.sentiment_score,
-                "confidence_level": record.sentiment_confidence,
-                "source_text_id": record.source_text_id,
-                "source_text_snippet": record.source_text_snippet,
-                "key_rationale": record.key_rationale,
-                "created_at": created_at.isoformat(),
-            })
-
-        if not batch_mentions:
-            log.warning("No valid records to insert after processing.")
-            return
+                except Exception as ticker_error:
+                    if not is_row_error(ticker_error):
+                        raise
+                    log.error(f"Database rejected asset '{ticker}': {ticker_error}")
+                    continue
+                if asset_id:
+                    asset_ids[ticker] = asset_id
+        return asset_ids
+
+    def _insert_mention_rows(self, rows: List[Dict[str, Any]]) -> InsertReport:
+        """Upsert mentions in size-bounded, bisecting chunks.
+
+        See :func:`~database.batching.insert_chunked`: one bad row no longer
+        loses the whole batch.
+        """
+        return insert_chunked(
+            lambda chunk: self.client.table(TABLE_MENTIONS).upsert(
+                chunk, on_conflict=",".join(MENTION_CONFLICT_COLUMNS)
+            ).execute(),
+            rows,
+        )
 
-        try:
-            self.client.table(TABLE_MENTIONS).insert(batch_mentions).execute()
-            log.info(
-                f"Successfully inserted {len(batch_mentions)} records to Supabase."
+    def _lookup_processed(self, source_name: str, post_ids: List[str]) -> Set[str]:
+        """Check *post_ids* with batched ``post_id IN (...)`` queries."""
+        processed: Set[str] = set()
+        for batch in chunk_rows(post_ids, PROCESSED_POST_LOOKUP_BATCH, None):
+            response = (
+                self.client.table(TABLE_PROCESSED_POSTS)
+                .select(COL_POST_ID)
+                .eq(COL_SOURCE_NAME, source_name)
+                .in_(COL_POST_ID, batch)
+                .execute()
             )
+            processed |= {row[COL_POST_ID] for row in (response.data or [])}
+        return processed
+
+    def _insert_processed(self, post_ids: List[str], source_name: str) -> None:
+        """Upsert with ``ignore_duplicates`` so re-marking a known ID is a no-op."""
+        self.client.table(TABLE_PROCESSED_POSTS).upsert(
+            [{COL_POST_ID: pid, COL_SOURCE_NAME: source_name} for pid in post_ids],
+            on_conflict=f"{COL_POST_ID},{COL_SOURCE_NAME}",
+            ignore_duplicates=True,
+        ).execute()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def refresh_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        """Re-aggregate the sentiment rollup buckets touched by *rows*."""
+        try:
+            self.client.rpc(RPC_REFRESH_ROLLUPS, touched_buckets(rows)).execute()
+            log.info("Refreshed sentiment rollups for the inserted buckets.")
         except Exception as e:
-            log.error(f"Failed to execute batch insert: {e}")
+            log.error(f"Failed to refresh sentiment rollups: {e}")
 
     def clear_mentions(self) -> None:
-        """Wipe all existing records from the asset_mentions table.
+        """Wipe all existing records from the asset_mentions table and its rollups.
 
         Use with caution — this is typically for seeding/resetting dev environments.
         """
-        log.warning(f"Clearing all data from '{TABLE_MENTIONS}'...")
+        log.warning(f"Clearing all data from '{TABLE_MENTIONS}' and the sentiment rollups...")
         try:
-            # Supabase delete() requires a filter to be safe; use 'gt' on PK > 0
-            self.client.table(TABLE_MENTIONS).delete().gt("mention_id", 0).execute()
+            # One RPC, so the rollups are never left describing deleted mentions.
+            self.client.rpc(RPC_CLEAR_MENTIONS).execute()
             log.info(f"Successfully cleared table '{TABLE_MENTIONS}'.")
         except Exception as e:
             log.error(f"Failed to clear table '{TABLE_MENTIONS}': {e}")
             raise
 
     # ------------------------------------------------------------------
-    # Post deduplication
+    # Retention (see database/retention.py)
     # ------------------------------------------------------------------
 
-    def get_processed_post_ids(self, source_name: str) -> set[str]:
-        """Return the set of post IDs already analysed for *source_name*.
-
-        Called once before scraping so the reddit client can filter out
-        posts that have already been processed in a previous run.
-
-        Args:
-            source_name: Platform label, e.g. ``'reddit'``.
-
-        Returns:
-            A :class:`set` of post ID strings (empty if none found).
-        """
-        try:
-            response = (
-                self.client.table(TABLE_PROCESSED_POSTS)
-                .select(COL_POST_ID)
-                .eq(COL_SOURCE_NAME, source_name)
-                .execute()
-            )
-            ids = {row[COL_POST_ID] for row in (response.data or [])}
-            log.info(f"Fetched {len(ids)} processed post IDs for '{source_name}'.")
-            return ids
-        except Exception as e:
-            log.error(f"Failed to fetch processed post IDs: {e}")
-            return set()
-
-    def mark_posts_processed(self, post_ids: List[str], source_name: str) -> None:
-        """Record *post_ids* as processed so they are skipped on future runs.
-
-        Uses upsert with ``ignore_duplicates=True`` so re-inserting an
-        already-known ID is a silent no-op.
-
-        Args:
-            post_ids:    Reddit (or other platform) post ID strings.
-            source_name: Platform label, e.g. ``'reddit'``.
-        """
-        if not post_ids:
-            return
-
-        rows = [
-            {COL_POST_ID: pid, COL_SOURCE_NAME: source_name}
-            for pid in post_ids
-        ]
-        try:
-            self.client.table(TABLE_PROCESSED_POSTS).upsert(
-                rows,
-                on_conflict=f"{COL_POST_ID},{COL_SOURCE_NAME}",
-                ignore_duplicates=True,
-            ).execute()
-            log.info(f"Marked {len(rows)} posts as processed for '{source_name}'.")
-        except Exception as e:
-            log.error(f"Failed to mark posts as processed: {e}")
+    def compact_mention_rollups(self, before: datetime) -> datetime:
+        """Freeze the rollups before *before* and return the new retention watermark."""
+        response = self.client.rpc(
+            RPC_COMPACT_MENTIONS, {"p_before": before.isoformat()}
+        ).execute()
+        return datetime.fromisoformat(response.data)
+
+    def fetch_mentions_before(self, before: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Return up to *limit* of the oldest mentions created before *before*."""
+        response = (
+            self.client.table(TABLE_MENTIONS)
+            .select("*")
+            .lt(COL_CREATED_AT, before.isoformat())
+            .order(COL_CREATED_AT)
+            .order(COL_MENTION_ID)
+            .limit(limit)
+            .execute()
+        )
+        return response.data or []
+
+    def delete_mentions(self, mention_ids: List[int], before: datetime) -> None:
+        """Delete the mentions *mention_ids* (all created before *before*)."""
+        # The created_at bound lets Postgres prune to the old partitions.
+        (
+            self.client.table(TABLE_MENTIONS)
+            .delete()
+            .in_(COL_MENTION_ID, mention_ids)
+            .lt(COL_CREATED_AT, before.isoformat())
+            .execute()
+        )
@@ -1,6 +1,32 @@
 import { NextResponse } from "next/server";
 import { createSupabaseServerClient } from "@/lib/supabase-server";
 
+type SupabaseServerClient = Awaited<
+  ReturnType<typeof createSupabaseServerClient>
+>;
+type MentionBucket = {
+  asset_id: number;
+  platform_id: number | null;
+  created_at: string;
+};
+
+const BUCKET_COLUMNS = "asset_id, platform_id, created_at";
+
+// Re-aggregate the rollup buckets the given mentions fall into, so the
+// dashboard RPCs stop counting deleted or edited values.
+async function refreshRollups(
+  supabase: SupabaseServerClient,
+  rows: MentionBucket[],
+) {
+  if (rows.length === 0) return null;
+  const { error } = await supabase.rpc("refresh_sentiment_rollups", {
+    p_asset_ids: rows.map((r) => r.asset_id),
+    p_platform_ids: rows.map((r) => r.platform_id),
+    p_buckets: rows.map((r) => r.created_at),
+  });
+  return error;
+}
+
 export async function GET(req: Request) {
   const supabase = await createSupabaseServerClient();
   const { searchParams } = new URL(req.url);
@@ -38,6 +64,14 @@ export async function GET(req: Request) {
 export async function PUT(req: Request) {
   const supabase = await createSupabaseServerClient();
   const { mention_id, ...fields } = await req.json();
+  // The edit may move the mention to another bucket; refresh both.
+  const { data: before, error: readError } = await supabase
+    .from("asset_mentions")
+    .select(BUCKET_COLUMNS)
+    .eq("mention_id", mention_id);
+  if (readError)
+    return NextResponse.json({ error: readError.message }, { status: 500 });
+
   const { data, error } = await supabase
     .from("asset_mentions")
     .update(fields)
@@ -47,18 +81,33 @@ export async function PUT(req: Request) {
 
   if (error)
     return NextResponse.json({ error: error.message }, { status: 500 });
+
+  const rollupError = await refreshRollups(supabase, [
+    ...((before ?? []) as MentionBucket[]),
+    data as MentionBucket,
+  ]);
+  if (rollupError)
+    return NextResponse.json({ error: rollupError.message }, { status: 500 });
   return NextResponse.json(data);
 }
 
 export async function DELETE(req: Request) {
   const supabase = await createSupabaseServerClient();
   const { mention_id } = await req.json();
-  const { error } = await supabase
+  const { data, error } = await supabase
     .from("asset_mentions")
     .delete()
-    .eq("mention_id", mention_id);
+    .eq("mention_id", mention_id)
+    .select(BUCKET_COLUMNS);
 
   if (error)
     return NextResponse.json({ error: error.message }, { status: 500 });
+
+  const rollupError = await refreshRollups(
+    supabase,
+    (data ?? []) as MentionBucket[],
+  );
+  if (rollupError)
+    return NextResponse.json({ error: rollupError.message }, { status: 500 });
   return NextResponse.json({ success: true });
 }
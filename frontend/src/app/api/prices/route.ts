@@ -1,5 +1,6 @@
 import { NextResponse } from "next/server";
 import YahooFinance from "yahoo-finance2";
+import { createSupabaseServerClient } from "@/lib/supabase-server";
 const yahooFinance = new YahooFinance();
 
 export async function GET(request: Request) {
@@ -14,6 +15,25 @@ export async function GET(request: Request) {
     );
   }
 
+  // Prices synced by scripts/sync_prices.py; Yahoo is only asked for
+  // tickers that have not been synced yet.
+  const supabase = await createSupabaseServerClient();
+  const { data: stored, error: rpcError } = await supabase.rpc(
+    "get_asset_prices",
+    { p_ticker: ticker, p_days: days },
+  );
+
+  if (rpcError) {
+    console.error("RPC Error:", rpcError);
+  } else if (stored && stored.length > 0) {
+    return NextResponse.json(
+      (stored as { date: string; close: number }[]).map((item) => ({
+        date: new Date(item.date).toISOString(),
+        price: item.close,
+      })),
+    );
+  }
+
   try {
     const period1 = new Date();
     period1.setDate(period1.getDate() - days);
@@ -2,23 +2,35 @@ import asyncio
 import argparse
 import json
 import random
+import signal
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional, Any  
+from typing import Any, Iterable, List, Optional, Tuple
 
+from analytics.spikes import SpikeDetector
+from data.async_writer import AsyncStorageWriter
+from data.consolidation import consolidate_records
 from data.data_handler import DataHandler
 from data.models import SentimentRecord
 from data.reddit_client import RedditClient
-from database.supabase_client import SupabaseClient
-from LLM.base_llm import validate_stock_sentiment_json
+from data.storage import Storage
+from database.factory import create_async_db_client, create_db_client
+from database.outbox import Outbox
+from LLM.aggregation import posts_by_text
+from LLM.base_llm import records_from_llm_output
 from LLM.factory import get_llm_client
 from config import (
+    CONSOLIDATE_RECORDS,
     KEEP_LLM_INPUT,
     KEEP_LLM_OUTPUT,
     LLM_INPUT_DIR,
     LLM_OUTPUT_DIR,
+    OUTBOX_FLUSH_INTERVAL,
+    SPIKE_DETECTION,
     SUBREDDIT_LIST,
 )
 from utils.logger import get_logger
+from utils.scheduler import IntervalSchedule
 
 log = get_logger(__name__)
 
@@ -27,47 +39,68 @@ log = get_logger(__name__)
 # Pipeline phases
 # ---------------------------------------------------------------------------
 
-async def _run_scraping_phase(test_subreddit: Optional[str] = None) -> None:
-    """Scrape Reddit and convert raw JSON to LLM-ready JSON files."""
+async def _run_scraping_phase(
+    subreddits: Optional[List[str]] = None,
+    reddit_client: Optional[RedditClient] = None,
+    data_handler: Optional[DataHandler] = None,
+) -> DataHandler:
+    """Scrape Reddit and convert raw JSON to LLM-ready JSON files.
+
+    *subreddits* defaults to ``SUBREDDIT_LIST``. A *reddit_client* passed in
+    is left open for the caller to reuse. Returns the data handler, whose
+    pending files must be confirmed with ``mark_analysed`` once stored.
+    """
     log.info("Phase 1: Fetching Reddit data...")
-    reddit_client = RedditClient()
-    data_handler = DataHandler()
+    owns_client = reddit_client is None
+    reddit_client = reddit_client or RedditClient()
+    data_handler = data_handler or DataHandler()
 
     try:
-        async for sub_name, data in reddit_client.process_all_subreddits(
-            sort_by="top",
-            limit=20,
-            subreddits=[test_subreddit] if test_subreddit else None,
-        ):
-            data_handler.save_subreddit_data(sub_name, data)
+        # Saving runs on a background writer so disk I/O never blocks the
+        # in-flight Reddit requests; leaving the block flushes pending writes.
+        async with AsyncStorageWriter(data_handler.save_subreddit_data) as writer:
+            async for sub_name, data in reddit_client.process_all_subreddits(
+                sort_by="top",
+                limit=20,
+                subreddits=subreddits,
+            ):
+                await writer.submit(sub_name, data)
     except Exception as e:
         log.error(f"Error during data scraping: {e}")
     finally:
-        await reddit_client.close()
+        if owns_client:
+            await reddit_client.close()
 
     try:
         log.info("Processing collected data files...")
         await asyncio.to_thread(data_handler.process_files_to_json)
     except Exception as e:
         log.error(f"Error processing files to JSON: {e}")
+    return data_handler
 
 
 async def _process_single_file(
     file_path: Path,
     client: Any,
-) -> List[dict[str, Any]]:
-    """Send one JSON file to the LLM and return validated sentiment records.
+    storage: Optional[Storage] = None,
+) -> Optional[List[SentimentRecord]]:
+    """Send one LLM input file to the LLM and return validated sentiment records.
+
+    The file is decoded from the configured storage format and sent to the
+    LLM as a compact JSON array.
 
     Returns:
-        A list of validated sentiment dicts, or an empty list on failure.
+        The validated records (empty if the file had nothing to analyse),
+        or *None* if the file could not be analysed.
     """
     log.info(f"Processing file: {file_path.name}")
 
+    storage = storage or Storage()
     try:
-        content = await asyncio.to_thread(file_path.read_text, encoding="utf-8")
-    except OSError as e:
+        content = await asyncio.to_thread(storage.read_text, file_path)
+    except (OSError, ValueError) as e:
         log.error(f"Failed to read {file_path.name}: {e}")
-        return []
+        return None
 
     if not content.strip():
         log.warning(f"File {file_path.name} is empty. Skipping.")
@@ -76,112 +109,192 @@ async def _process_single_file(
     result = await client.get_response(content)
     if result is None:
         log.error(f"No valid response received for {file_path.name}")
-        return []
+        return None
 
-    # Stamp each record with deduplication keys:
-    # - source_id: the filename (unique per scrape batch)
+    # Stamp each record with deduplication keys taken from the post its
+    # driving text belongs to, so analysing the same posts again (a retry or
+    # a later scrape) yields the same mention key:
+    # - source_id: the post ID
     # - source_name: the platform (e.g. 'Reddit') — differentiates IDs across
     #   future platforms (Twitter, SeekingAlpha, etc.) so they never collide.
+    # - created_at: the post's created_utc (part of the key and the
+    #   partition column).
+    # Texts missing from the input (a mistyped ID) or posts scraped without
+    # created_utc fall back to the file name and its write time.
     platform = getattr(RedditClient, "SOURCE_NAME", "unknown").lower()
+    try:
+        owners = posts_by_text(json.loads(content))
+    except json.JSONDecodeError:
+        owners = {}
+    file_time = datetime.fromtimestamp(file_path.stat().st_mtime, tz=timezone.utc)
     for record in result:
-        record.source_id = file_path.name
+        post_id, created_utc = owners.get(record.source_text_id or "", (None, None))
+        record.source_id = post_id or file_path.name
         record.source_name = platform
+        if record.created_at is None:
+            record.created_at = (
+                datetime.fromtimestamp(created_utc, tz=timezone.utc)
+                if created_utc is not None else file_time
+            )
 
     return result
 
 
 async def _run_llm_analysis_phase(
     input_dir: Path,
-) -> List[SentimentRecord]:
+    client: Any = None,
+) -> Tuple[List[SentimentRecord], List[str]]:
     """Run LLM analysis on all JSON files in *input_dir*.
 
+    A new client is created from ``ACTIVE_MODEL`` unless *client* is given.
+
     Returns:
-        Aggregated list of :class:`~data.models.SentimentRecord` from all files.
+        Aggregated list of :class:`~data.models.SentimentRecord` from all
+        files, and the names of the files that were analysed successfully.
     """
     log.info("Phase 2: Running LLM analysis...")
 
     if not input_dir.exists():
         log.error(f"Input directory not found: {input_dir}")
-        return []
+        return [], []
 
-    json_files: List[Path] = list(input_dir.glob("*.json"))
+    storage = Storage()
+    json_files: List[Path] = storage.glob(input_dir)
     if not json_files:
-        log.warning("No JSON files found for analysis.")
-        return []
+        log.warning(f"No {storage.suffix} files found for analysis.")
+        return [], []
 
-    try:
-        client = get_llm_client()
-    except Exception as e:
-        log.critical(f"Failed to initialise LLM client: {e}")
-        return []
+    if client is None:
+        try:
+            client = get_llm_client()
+        except Exception as e:
+            log.critical(f"Failed to initialise LLM client: {e}")
+            return [], []
 
     # Fire all LLM calls concurrently. The RateLimiter inside each client
     # serialises requests at the API level when the RPM window is full,
     # so gather is safe — it just removes sequential Python overhead.
     tasks = [
-        _process_single_file(file_path, client)
+        _process_single_file(file_path, client, storage)
         for file_path in json_files
     ]
     results = await asyncio.gather(*tasks, return_exceptions=True)
 
     all_records: List[SentimentRecord] = []
+    analysed: List[str] = []
     for file_path, result in zip(json_files, results):
         if isinstance(result, Exception):
             log.error(f"LLM call failed for {file_path.name}: {result}")
-        elif result:
+        elif result is not None:
             all_records.extend(result)
+            analysed.append(file_path.name)
 
-    return all_records
+    return all_records, analysed
 
 
-def _cleanup_directories(input_dir: Path, output_dir: Path) -> None:
-    """Delete temporary files from *input_dir* and *output_dir* if configured."""
-    for keep_flag, directory, label in [
-        (KEEP_LLM_INPUT, input_dir, "LLM input"),
-        (KEEP_LLM_OUTPUT, output_dir, "LLM output"),
+def _cleanup_directories(input_dir: Path, output_dir: Path, keep: Iterable[str] = ()) -> None:
+    """Delete temporary files from *input_dir* and *output_dir* if configured.
+
+    LLM input files named in *keep* (the data handler's pending files, whose
+    analysis failed) are left in place so the next run retries them.
+    """
+    keep = set(keep)
+    for keep_flag, directory, label, kept in [
+        (KEEP_LLM_INPUT, input_dir, "LLM input", keep),
+        (KEEP_LLM_OUTPUT, output_dir, "LLM output", set()),
     ]:
         if not keep_flag and directory.exists():
             log.info(f"Cleaning up {label} directory: {directory}")
             try:
                 for item in directory.iterdir():
-                    if item.is_file():
+                    if item.is_file() and item.name not in kept:
                         item.unlink()
             except Exception as e:
                 log.error(f"Error cleaning {label} directory: {e}")
+            if kept:
+                log.info(f"Kept {len(kept)} unanalysed {label} file(s) for the next run.")
+
+
+def _detect_spikes(records: List[SentimentRecord], detector: Optional[SpikeDetector] = None) -> None:
+    """Feed *records* to the spike detector and persist its state.
+
+    Runs before the insert and needs no database, so alerts go out even
+    while the database is unreachable. Without *detector* the configured
+    one is loaded from its state file. Sinks may block (the webhook waits
+    on an HTTP POST), so callers run this in a worker thread.
+    """
+    if not SPIKE_DETECTION or not records:
+        return
+    try:
+        detector = detector or SpikeDetector.from_config()
+        detector.observe_many(records)
+        detector.save()
+    except Exception as e:
+        log.error(f"Spike detection failed: {e}")
 
 
 # ---------------------------------------------------------------------------
 # Top-level pipeline entry points
 # ---------------------------------------------------------------------------
 
+async def _connect_database(platform_name: str) -> Any:
+    """Open the async database client, warm its ID cache and resolve *platform_name*."""
+    db_client = await create_async_db_client()
+    await db_client.warm_cache()
+    await db_client.resolve_platform_id(platform_name)
+    return db_client
+
+
 async def run_full_pipeline(test_subreddit: Optional[str] = None) -> None:
     """Orchestrate the full pipeline: Scrape → LLM → Supabase."""
     log.info("Starting full pipeline...")
 
     # Phase 1: Scrape
-    await _run_scraping_phase(test_subreddit)
+    data_handler = await _run_scraping_phase([test_subreddit] if test_subreddit else None)
 
-    # Phase 2: LLM analysis
+    # Phase 2: LLM analysis. The database connection and platform lookup are
+    # started alongside it so they are ready by the time records are.
     input_dir = Path(LLM_INPUT_DIR)
     output_dir = Path(LLM_OUTPUT_DIR)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    all_records = await _run_llm_analysis_phase(input_dir)
+    platform_name: str = getattr(RedditClient, "SOURCE_NAME", "Reddit")
+    db_task = asyncio.create_task(_connect_database(platform_name))
+
+    all_records, analysed = await _run_llm_analysis_phase(input_dir)
+    await asyncio.to_thread(_detect_spikes, all_records)
+    if CONSOLIDATE_RECORDS:
+        all_records = consolidate_records(all_records)
 
-    # Phase 3: Persist to Supabase
+    # Phase 3: Persist to Supabase. Records go to the local outbox first so
+    # an outage only delays them; the flush also replays anything left over
+    # from earlier runs, oldest first.
+    outbox = Outbox()
     if all_records:
+        outbox.enqueue(all_records, platform_name)
         log.info(f"Pipeline produced {len(all_records)} records. Inserting into Supabase...")
-        try:
-            db_client = SupabaseClient()
-            platform_name: str = getattr(RedditClient, "SOURCE_NAME", "Reddit")
-            await asyncio.to_thread(db_client.insert_analysis, all_records, platform_name)
-        except Exception as e:
-            log.error(f"Failed to insert data into Supabase: {e}")
     else:
         log.warning("No data was generated in the pipeline.")
+    # The results are durable now; only analysed files count as processed.
+    data_handler.mark_analysed(analysed)
+
+    try:
+        db_client = await db_task
+    except Exception as e:
+        log.error(f"Failed to connect to Supabase: {e}")
+        if len(outbox):
+            log.warning(f"{len(outbox)} batch(es) kept in the outbox for the next run.")
+    else:
+        async with db_client:
+            try:
+                await outbox.flush_async(db_client.insert_analysis, ignore_backoff=True)
+            except Exception as e:
+                log.error(f"Failed to insert data into Supabase: {e}")
+    finally:
+        outbox.close()
 
     # Phase 4: Cleanup
-    _cleanup_directories(input_dir, output_dir)
+    _cleanup_directories(input_dir, output_dir, data_handler.pending)
 
 
 def run_parse_only(input_file: str) -> None:
@@ -204,17 +317,183 @@ def run_parse_only(input_file: str) -> None:
         log.error(f"Failed to read or decode JSON from '{input_file}': {e}")
         return
 
-    records = validate_stock_sentiment_json(data)
+    records = records_from_llm_output(data)
     if not records:
         log.error("No valid records found in the input file.")
         return
 
+    outbox = Outbox()
+    outbox.enqueue(records, platform_name="Other")
     try:
-        db_client = SupabaseClient()
-        db_client.insert_analysis(records, platform_name="Other")
-        log.info(f"Inserted {len(records)} records from '{input_file}' into Supabase.")
+        db_client = create_db_client()
+        outbox.flush(db_client.insert_analysis, ignore_backoff=True)
+        if len(outbox):
+            log.warning(f"{len(outbox)} batch(es) kept in the outbox for the next run.")
+        else:
+            log.info(f"Inserted {len(records)} records from '{input_file}' into Supabase.")
     except Exception as e:
         log.error(f"Failed to insert parsed data into Supabase: {e}")
+    finally:
+        outbox.close()
+
+
+# ---------------------------------------------------------------------------
+# Daemon mode
+# ---------------------------------------------------------------------------
+
+class PipelineDaemon:
+    """Runs the pipeline on a per-subreddit schedule with long-lived clients.
+
+    The Reddit session, LLM client (prompt, rate limiter), data handler
+    (manifest), spike detector, outbox and database pool are created once
+    and reused by every run, so a run only pays for its own work. Runs are
+    sequential: each one scrapes the subreddits that are due (see
+    :class:`~utils.scheduler.IntervalSchedule`) and analyses and stores
+    their posts. Between runs the outbox is flushed at least every
+    ``OUTBOX_FLUSH_INTERVAL`` seconds.
+
+    SIGINT/SIGTERM stop the daemon after the run in progress, then the
+    outbox is drained and every client closed; a second signal aborts
+    the run instead of waiting for it.
+    """
+
+    def __init__(self, subreddits: Optional[List[str]] = None) -> None:
+        self.schedule = IntervalSchedule.from_config(subreddits or SUBREDDIT_LIST)
+        self.platform_name: str = getattr(RedditClient, "SOURCE_NAME", "Reddit")
+        self.input_dir = Path(LLM_INPUT_DIR)
+        self.output_dir = Path(LLM_OUTPUT_DIR)
+        self.reddit_client: Optional[RedditClient] = None
+        self.data_handler: Optional[DataHandler] = None
+        self.llm_client: Any = None
+        self.detector: Optional[SpikeDetector] = None
+        self.db_client: Any = None
+        self.outbox: Optional[Outbox] = None
+        self._stop = asyncio.Event()
+        self._run_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Create the long-lived clients. A missing LLM configuration is fatal here."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.llm_client = get_llm_client()
+        self.reddit_client = RedditClient()
+        self.data_handler = DataHandler()
+        self.outbox = Outbox()
+        if SPIKE_DETECTION:
+            try:
+                self.detector = SpikeDetector.from_config()
+            except Exception as e:
+                log.error(f"Spike detection disabled for this daemon: {e}")
+        await self._ensure_database()
+
+    def request_stop(self) -> None:
+        if not self._stop.is_set():
+            log.info("Shutdown requested; finishing the current run (signal again to abort it)...")
+            self._stop.set()
+        elif self._run_task and not self._run_task.done():
+            log.warning("Aborting the current run.")
+            self._run_task.cancel()
+
+    def _install_signal_handlers(self, install: bool = True) -> None:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                if install:
+                    loop.add_signal_handler(sig, self.request_stop)
+                else:
+                    loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError):
+                pass  # e.g. Windows: Ctrl+C still raises KeyboardInterrupt
+
+    async def _ensure_database(self) -> bool:
+        """Connect (or reconnect) to the database; records wait in the outbox meanwhile."""
+        if self.db_client is not None:
+            return True
+        try:
+            self.db_client = await _connect_database(self.platform_name)
+            return True
+        except Exception as e:
+            log.error(f"Failed to connect to the database: {e}")
+            return False
+
+    async def _flush(self, ignore_backoff: bool = False) -> None:
+        if not len(self.outbox) or not await self._ensure_database():
+            return
+        try:
+            await self.outbox.flush_async(self.db_client.insert_analysis, ignore_backoff=ignore_backoff)
+        except Exception as e:
+            log.error(f"Failed to insert data into the database: {e}")
+
+    async def run_once(self, subreddits: List[str]) -> None:
+        """One pipeline run over *subreddits* with the warm clients."""
+        log.info(f"Daemon run for: {subreddits}")
+        await _run_scraping_phase(subreddits, self.reddit_client, self.data_handler)
+
+        records, analysed = await _run_llm_analysis_phase(self.input_dir, self.llm_client)
+        await asyncio.to_thread(_detect_spikes, records, self.detector)
+        if CONSOLIDATE_RECORDS:
+            records = consolidate_records(records)
+        if records:
+            self.outbox.enqueue(records, self.platform_name)
+            log.info(f"Run produced {len(records)} records.")
+        self.data_handler.mark_analysed(analysed)
+        await self._flush()
+        _cleanup_directories(self.input_dir, self.output_dir, self.data_handler.pending)
+        self.data_handler.discard_pending()
+
+    async def _wait(self, seconds: float) -> None:
+        """Sleep up to *seconds*, waking early on shutdown."""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self) -> None:
+        """Serve the schedule until a shutdown is requested."""
+        self._install_signal_handlers()
+        try:
+            await self.start()
+            log.info(f"Daemon started for {len(self.schedule.intervals)} subreddit(s).")
+            while not self._stop.is_set():
+                due = self.schedule.due()
+                if due:
+                    self._run_task = asyncio.create_task(self.run_once(due))
+                    try:
+                        await self._run_task
+                    except asyncio.CancelledError:
+                        if not (self._stop.is_set() and self._run_task.cancelled()):
+                            raise
+                        break  # Aborted by a second signal
+                    except Exception as e:
+                        log.error(f"Daemon run failed: {e}")
+                    self.schedule.mark_run(due)
+                else:
+                    await self._flush()
+                await self._wait(min(self.schedule.seconds_until_next(), OUTBOX_FLUSH_INTERVAL))
+        finally:
+            await self.close()
+            self._install_signal_handlers(install=False)
+
+    async def close(self) -> None:
+        """Drain the outbox and close every client."""
+        log.info("Daemon shutting down...")
+        if self.outbox is not None:
+            await self._flush(ignore_backoff=True)
+            if len(self.outbox):
+                log.warning(f"{len(self.outbox)} batch(es) kept in the outbox for the next run.")
+            self.outbox.close()
+        if self.detector is not None:
+            self.detector.save()
+        if self.reddit_client is not None:
+            try:
+                await self.reddit_client.close()
+            except Exception as e:
+                log.error(f"Error closing the Reddit client: {e}")
+        if self.db_client is not None:
+            try:
+                await self.db_client.aclose()
+            except Exception as e:
+                log.error(f"Error closing the database client: {e}")
+        log.info("Daemon stopped.")
 
 
 # ---------------------------------------------------------------------------
@@ -234,6 +513,11 @@ async def async_main() -> None:
         action="store_true",
         help="Run in test mode: process only one randomly chosen subreddit.",
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and scrape each subreddit on its DAEMON_* schedule, reusing clients.",
+    )
 
     args = parser.parse_args()
 
@@ -245,7 +529,10 @@ async def async_main() -> None:
             test_subreddit = random.choice(SUBREDDIT_LIST)
             log.info(f"Test mode enabled. Selected subreddit: {test_subreddit}")
 
-        await run_full_pipeline(test_subreddit=test_subreddit)
+        if args.daemon:
+            await PipelineDaemon([test_subreddit] if test_subreddit else None).run()
+        else:
+            await run_full_pipeline(test_subreddit=test_subreddit)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,66 @@
+"""
+apply_retention.py
+~~~~~~~~~~~~~~~~~~
+Fold old asset_mentions into the daily sentiment rollups, archive their
+text to compressed NDJSON files and delete them in small batches, so the
+table (and every scan of it) stays roughly the same size over time.
+
+Usage
+-----
+    # Keep MENTION_RETENTION_DAYS (config.py) of individual mentions
+    python scripts/apply_retention.py
+
+    # Keep 30 days, dropping the text instead of archiving it
+    python scripts/apply_retention.py --days 30 --no-archive
+"""
+
+import argparse
+import os
+import sys
+
+# ---------------------------------------------------------------------------
+# Bootstrap path so we can import from the project root
+# ---------------------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import (  # noqa: E402
+    MENTION_ARCHIVE_DIR,
+    MENTION_RETENTION_BATCH,
+    MENTION_RETENTION_DAYS,
+)
+from database.factory import create_db_client  # noqa: E402
+from database.retention import apply_retention  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compact, archive and delete asset_mentions older than the retention window."
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=MENTION_RETENTION_DAYS,
+        help=f"Days of individual mentions to keep (default: {MENTION_RETENTION_DAYS}).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=MENTION_RETENTION_BATCH,
+        help=f"Mentions archived and deleted per statement (default: {MENTION_RETENTION_BATCH}).",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="Delete old mentions without archiving their text.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    apply_retention(
+        create_db_client(),
+        older_than_days=args.days,
+        batch_size=args.batch_size,
+        archive_dir=None if args.no_archive else MENTION_ARCHIVE_DIR,
+    )
@@ -0,0 +1,83 @@
+"""
+build_ticker_universe.py
+~~~~~~~~~~~~~~~~~~~~~~~~
+Extend the ticker universe file (TICKER_UNIVERSE_FILE) with every listed US
+stock and ETF from the NASDAQ Trader symbol directories
+(nasdaqlisted.txt / otherlisted.txt, downloaded beforehand from
+https://www.nasdaqtrader.com/dynamic/SymDir/). Hand-written rows and their
+aliases are kept as they are and take precedence; only missing tickers are
+appended.
+
+Usage
+-----
+    python scripts/build_ticker_universe.py --nasdaq nasdaqlisted.txt --other otherlisted.txt
+"""
+
+import argparse
+import csv
+import os
+import sys
+from typing import Dict, List, Tuple
+
+# ---------------------------------------------------------------------------
+# Bootstrap path so we can import from the project root
+# ---------------------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import TICKER_UNIVERSE_FILE  # noqa: E402
+from data.ticker_universe import TickerUniverse, clean_symbol  # noqa: E402
+from utils.logger import get_logger  # noqa: E402
+
+log = get_logger(__name__)
+
+GENERATED_HEADER = "# Generated from the NASDAQ Trader symbol directories"
+
+
+def read_symbol_directory(path: str, symbol_column: str) -> List[Tuple[str, str, str]]:
+    """Return ``(ticker, type, name)`` rows of a pipe-delimited symbol directory."""
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for entry in csv.DictReader(f, delimiter="|"):
+            symbol = (entry.get(symbol_column) or "").strip()
+            if not symbol or symbol.startswith("File Creation Time") or entry.get("Test Issue") == "Y":
+                continue
+            name = (entry.get("Security Name") or "").split(" - ")[0].strip()
+            asset_type = "ETF" if entry.get("ETF") == "Y" else "Stock"
+            rows.append((clean_symbol(symbol), asset_type, name.replace("|", " ")))
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Append listed US stocks/ETFs to the ticker universe file."
+    )
+    parser.add_argument("--nasdaq", help="Path to nasdaqlisted.txt.")
+    parser.add_argument("--other", help="Path to otherlisted.txt.")
+    parser.add_argument(
+        "--output",
+        default=TICKER_UNIVERSE_FILE,
+        help=f"Universe file to extend (default: {TICKER_UNIVERSE_FILE}).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.nasdaq and not args.other:
+        sys.exit("Nothing to do: pass --nasdaq and/or --other.")
+
+    existing = TickerUniverse.load(args.output) if os.path.exists(args.output) else None
+    listed: Dict[str, Tuple[str, str]] = {}
+    for path, column in ((args.nasdaq, "Symbol"), (args.other, "ACT Symbol")):
+        if path:
+            for ticker, asset_type, name in read_symbol_directory(path, column):
+                listed.setdefault(ticker, (asset_type, name))
+
+    new = sorted(t for t in listed if not existing or t not in existing)
+    with open(args.output, "a", encoding="utf-8") as f:
+        if new:
+            f.write(f"{GENERATED_HEADER}\n")
+        for ticker in new:
+            asset_type, name = listed[ticker]
+            f.write(f"{ticker}|{asset_type}|{name}\n")
+    log.info(f"Appended {len(new)} tickers to {args.output} ({len(listed)} listed).")
@@ -0,0 +1,57 @@
+"""
+compute_analytics.py
+~~~~~~~~~~~~~~~~~~~~
+Recompute the precomputed rolling sentiment analytics (sentiment_analytics)
+from the hourly/daily rollups, for every asset or a chosen set of tickers.
+Connects with POSTGRES_DSN.
+
+Usage
+-----
+    # Daily analytics for every asset over ANALYTICS_LOOKBACK_DAYS
+    python scripts/compute_analytics.py
+
+    # Hourly analytics for two tickers over the last 3 days
+    python scripts/compute_analytics.py --resolution hour --days 3 --tickers AAPL TSLA
+"""
+
+import argparse
+import os
+import sys
+
+# ---------------------------------------------------------------------------
+# Bootstrap path so we can import from the project root
+# ---------------------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analytics.rolling import RESOLUTIONS, refresh_analytics  # noqa: E402
+from config import ANALYTICS_LOOKBACK_DAYS  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recompute rolling sentiment analytics into the sentiment_analytics table."
+    )
+    parser.add_argument(
+        "--tickers",
+        nargs="+",
+        default=None,
+        help="Tickers to compute (default: every asset).",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=ANALYTICS_LOOKBACK_DAYS,
+        help=f"Days of analytics to rewrite (default: {ANALYTICS_LOOKBACK_DAYS}).",
+    )
+    parser.add_argument(
+        "--resolution",
+        choices=list(RESOLUTIONS),
+        default="day",
+        help="Bucket size (default: day).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    refresh_analytics(tickers=args.tickers, days=args.days, resolution=args.resolution)
@@ -0,0 +1,69 @@
+"""
+export_mentions.py
+~~~~~~~~~~~~~~~~~~
+Stream asset_mentions (joined with their ticker and platform) into columnar
+files under EXPORT_DIR, partitioned as date=YYYY-MM-DD/platform=NAME/.
+Only mentions newer than the last export (the _watermark.json mention_id),
+or that committed late below it, are written, so the command can run on a
+schedule. Requires pyarrow and connects
+with POSTGRES_DSN.
+
+Read the result with database.export.open_exports() or any Parquet/Arrow
+reader (pandas, polars, DuckDB, Spark).
+
+Usage
+-----
+    # Incremental export in EXPORT_FORMAT
+    python scripts/export_mentions.py
+
+    # Rebuild everything as memory-mappable Arrow IPC files
+    python scripts/export_mentions.py --full --format arrow
+"""
+
+import argparse
+import os
+import sys
+
+# ---------------------------------------------------------------------------
+# Bootstrap path so we can import from the project root
+# ---------------------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import EXPORT_BATCH_ROWS, EXPORT_DIR, EXPORT_FORMAT  # noqa: E402
+from database.export import EXPORT_FORMATS, export_mentions  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export asset mentions to partitioned Parquet/Arrow files."
+    )
+    parser.add_argument(
+        "--dir",
+        default=EXPORT_DIR,
+        help=f"Output directory (default: {EXPORT_DIR}).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(EXPORT_FORMATS),
+        default=EXPORT_FORMAT,
+        help=f"File format (default: {EXPORT_FORMAT}).",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=EXPORT_BATCH_ROWS,
+        help=f"Rows fetched from the server per batch (default: {EXPORT_BATCH_ROWS}).",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Delete previous partitions and export every mention again.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    export_mentions(
+        directory=args.dir, fmt=args.format, batch_rows=args.batch_rows, full=args.full
+    )
@@ -0,0 +1,43 @@
+"""
+migrate_database.py
+~~~~~~~~~~~~~~~~~~~
+Apply pending SQL migrations (database/migrations/) and create the upcoming
+monthly asset_mentions partitions. Connects with POSTGRES_DSN, which can be
+the docker-compose database or a Supabase direct connection string.
+
+Usage
+-----
+    # Apply migrations, then create partitions ahead of time
+    python scripts/migrate_database.py
+
+    # Only create partitions (e.g. from a daily cron job)
+    python scripts/migrate_database.py --partitions-only
+"""
+
+import argparse
+import os
+import sys
+
+# ---------------------------------------------------------------------------
+# Bootstrap path so we can import from the project root
+# ---------------------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from database.migrate import migrate  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Apply database migrations and create future asset_mentions partitions."
+    )
+    parser.add_argument(
+        "--partitions-only",
+        action="store_true",
+        help="Skip migrations; only create the upcoming monthly partitions.",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    migrate(partitions_only=args.partitions_only)
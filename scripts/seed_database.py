@@ -17,16 +17,20 @@ Usage
 
     # Both
     python scripts/seed_database.py --clear --days 14
+
+    # Production-sized load-test dataset: 500 tickers, ~10M rows over 2 years
+    python scripts/seed_database.py --days 730 --tickers 500 --rows 10000000
 """
 
 import argparse
-import math
-import random
 import sys
 import os
+import zlib
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any, Final
+from datetime import datetime, timezone
+from typing import Final, Iterator
+
+import numpy as np
 from utils.logger import get_logger
 
 # ---------------------------------------------------------------------------
@@ -34,8 +38,9 @@ from utils.logger import get_logger
 # ---------------------------------------------------------------------------
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from config import DATABASE_BACKEND  # noqa: E402
 from data.models import SentimentRecord  # noqa: E402
-from database.supabase_client import SupabaseClient  # noqa: E402
+from database.factory import create_db_client  # noqa: E402
 
 log = get_logger(__name__)
 
@@ -78,109 +83,189 @@ ASSETS: Final[list[AssetConfig]] = [
 ]
 
 
-# Samples per ticker per platform per day
+# Samples per ticker per platform per day (unless --rows sets the volume)
 SAMPLES_PER_DAY: Final[int] = 3
 
+# Rows generated and handed to insert_analysis at a time, so memory stays
+# flat however large the dataset (Postgres backend: one binary COPY each)
+CHUNK_ROWS: Final[int] = 50_000
+
+# Intra-day timestamp jitter, in minutes either side of the sample slot
+JITTER_MINUTES: Final[int] = 15
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def biased_random_walk(
+def build_assets(count: int | None, rng: np.random.Generator) -> list[AssetConfig]:
+    """Return *count* assets: the curated ones first, then synthetic tickers."""
+    if count is None:
+        return list(ASSETS)
+    if count <= len(ASSETS):
+        return list(ASSETS[:count])
+    extra = [
+        AssetConfig(f"SYN{i:04d}", "Stock", f"Synthetic Asset {i}", round(float(rng.normal(0, 0.02)), 3))
+        for i in range(1, count - len(ASSETS) + 1)
+    ]
+    return list(ASSETS) + extra
+
+
+def biased_random_walks(
+    current: np.ndarray,
     steps: int,
-    bias: float = 0.0,
-    volatility: float = 0.12,
+    bias: np.ndarray,
+    volatility: np.ndarray,
+    rng: np.random.Generator,
     *,
     clamp_min: float = -1.0,
     clamp_max: float = 1.0,
-    start: float | None = None,
-) -> list[float]:
-    """Return a list of *steps* sentiment values using a biased random walk.
-
-    The walk starts near 0 (or *start*), drifts according to *bias*, and is
-    clamped to ``[clamp_min, clamp_max]``.
+) -> np.ndarray:
+    """Advance one biased random walk per element of *current* by *steps*.
+
+    Returns a ``(len(current), steps)`` array of sentiment values; each step
+    drifts by the walk's *bias* plus Gaussian noise scaled by its
+    *volatility* and is clamped to ``[clamp_min, clamp_max]``. The clamp
+    makes each step depend on the last, so the loop runs over steps while
+    every walk advances at once.
     """
-    if start is None:
-        start = random.uniform(-0.15, 0.15)
-    values: list[float] = [start]
-    for _ in range(steps - 1):
-        delta = bias + random.gauss(0, volatility)
-        next_val = max(clamp_min, min(clamp_max, values[-1] + delta))
-        values.append(round(next_val, 4))
-    return values
+    deltas = bias[:, None] + rng.standard_normal((len(current), steps)) * volatility[:, None]
+    values = np.empty_like(deltas)
+    for t in range(steps):
+        current = np.clip(current + deltas[:, t], clamp_min, clamp_max)
+        values[:, t] = current
+    return np.round(values, 4)
 
 
-def confidence_from_score(score: float) -> float:
+def confidence_from_scores(scores: np.ndarray, rng: np.random.Generator) -> np.ndarray:
     """Higher confidence for stronger (more extreme) sentiment."""
-    base = abs(score)
-    noise = random.uniform(-0.05, 0.05)
-    return round(max(0.0, min(1.0, 0.4 + base * 0.55 + noise)), 4)
+    noise = rng.uniform(-0.05, 0.05, scores.shape)
+    return np.round(np.clip(0.4 + np.abs(scores) * 0.55 + noise, 0.0, 1.0), 4)
+
+
+def sentiment_labels(scores: np.ndarray) -> np.ndarray:
+    return np.where(scores > 0.3, "BUY", np.where(scores < -0.3, "SELL", "NEUTRAL"))
 
 
 # ---------------------------------------------------------------------------
 # Core seed logic
 # ---------------------------------------------------------------------------
 
-def generate_records(
-    platform: PlatformConfig,
+def generate_chunks(
+    platforms: list[PlatformConfig],
     assets: list[AssetConfig],
     days: int,
-) -> list[SentimentRecord]:
-    """Generate synthetic historical records for a specific platform."""
-    now = datetime.now(timezone.utc)
-    start_date = now - timedelta(days=days)
-    total_steps = days * SAMPLES_PER_DAY
-
-    records: list[SentimentRecord] = []
-
-    for asset in assets:
-        # Each ticker×platform pair gets its own independent walk
-        walk = biased_random_walk(
-            steps=total_steps,
-            bias=asset.bias,
-            volatility=0.18 if asset.asset_type == "Crypto" else 0.10,
-        )
-
-        for step_idx, score in enumerate(walk):
-            # Distribute samples across the date range
-            days_offset = step_idx / SAMPLES_PER_DAY
-            hours_offset = (step_idx % SAMPLES_PER_DAY) * (24 // SAMPLES_PER_DAY)
-            ts = start_date + timedelta(days=days_offset, hours=hours_offset)
-
-            # Add small intra-day jitter (±15 min)
-            ts += timedelta(minutes=random.randint(-15, 15))
-
-            records.append(SentimentRecord(
-                symbol=asset.ticker,
-                sentiment_score=score,
-                sentiment_confidence=confidence_from_score(score),
-                sentiment_label="BUY" if score > 0.3 else ("SELL" if score < -0.3 else "NEUTRAL"),
-                key_rationale=f"Synthetic data generated for {asset.ticker}",
-                created_at=ts,
-                source_name=platform.name.lower()
-            ))
-    
-    return records
-
-
-def seed(days: int = 30, clear: bool = False) -> None:
-    db = SupabaseClient()
-    log.info(f"Connected to Supabase. Seeding {days} days of data.")
+    samples_per_day: int = SAMPLES_PER_DAY,
+    rng: np.random.Generator | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[tuple[PlatformConfig, list[SentimentRecord]]]:
+    """Yield ``(platform, records)`` chunks of synthetic history, oldest first.
+
+    Each ticker×platform pair gets its own independent walk. Walks are
+    advanced a block of time steps at a time, sized so a block holds about
+    *chunk_rows* rows, and the block is emitted per platform before the
+    next is generated.
+
+    Samples sit on fixed time slots counted from the epoch, with a jitter
+    derived from the slot, platform and ticker, so re-seeding an overlapping
+    range reproduces the same mention keys and upserts instead of
+    duplicating; only the scores depend on *rng*.
+    """
+    rng = rng or np.random.default_rng()
+    n_assets = len(assets)
+    total_steps = days * samples_per_day
+    step_seconds = 86400 / samples_per_day
+    first_slot = int(datetime.now(timezone.utc).timestamp() // step_seconds) - total_steps
+
+    # One walk per (platform, asset), platform-major.
+    bias = np.tile([a.bias for a in assets], len(platforms))
+    volatility = np.tile([0.18 if a.asset_type == "Crypto" else 0.10 for a in assets], len(platforms))
+    current = rng.uniform(-0.15, 0.15, len(bias))
+    tickers = [a.ticker for a in assets]
+    salts = np.array(
+        [zlib.crc32(f"{p.name}/{a.ticker}".encode("utf-8")) for p in platforms for a in assets],
+        dtype=np.int64,
+    )
+
+    block_steps = max(1, chunk_rows // len(bias))
+    for first_step in range(0, total_steps, block_steps):
+        steps = min(block_steps, total_steps - first_step)
+        scores = biased_random_walks(current, steps, bias, volatility, rng)
+        current = scores[:, -1]
+        confidence = confidence_from_scores(scores, rng)
+        labels = sentiment_labels(scores)
+        slots = np.arange(first_slot + first_step, first_slot + first_step + steps, dtype=np.int64)
+        # Multiplicative hash of (slot, salt): deterministic, evenly spread minutes.
+        jitter = ((slots[None, :] * 2654435761 + salts[:, None]) % (2 * JITTER_MINUTES + 1) - JITTER_MINUTES) * 60
+        timestamps = slots[None, :] * step_seconds + jitter
+
+        for p, platform in enumerate(platforms):
+            rows = slice(p * n_assets, (p + 1) * n_assets)
+            source_name = platform.name.lower()
+            records = [
+                SentimentRecord(
+                    symbol=tickers[a],
+                    sentiment_score=score,
+                    sentiment_confidence=conf,
+                    sentiment_label=label,
+                    key_rationale=f"Synthetic data generated for {tickers[a]}",
+                    created_at=datetime.fromtimestamp(ts, timezone.utc),
+                    # Deterministic identity so re-seeding upserts instead of duplicating.
+                    source_id=f"seed_{tickers[a]}_{slot}",
+                    source_name=source_name,
+                )
+                for a, (a_scores, a_conf, a_labels, a_ts) in enumerate(zip(
+                    scores[rows].tolist(), confidence[rows].tolist(),
+                    labels[rows].tolist(), timestamps[rows].tolist(),
+                ))
+                for slot, score, conf, label, ts in zip(
+                    slots.tolist(), a_scores, a_conf, a_labels, a_ts
+                )
+            ]
+            yield platform, records
+
+
+def seed(
+    days: int = 30,
+    clear: bool = False,
+    rows: int | None = None,
+    tickers: int | None = None,
+    random_seed: int | None = None,
+    backend: str = DATABASE_BACKEND,
+) -> int:
+    """Seed *days* of synthetic mentions and return the number of rows generated.
+
+    *tickers* sets the number of assets (extra synthetic tickers are added
+    beyond the curated list) and *rows* the approximate total row count,
+    from which the samples per day are derived. *random_seed* makes the
+    dataset reproducible. *backend* overrides ``DATABASE_BACKEND``.
+    """
+    rng = np.random.default_rng(random_seed)
+    assets = build_assets(tickers, rng)
+    samples_per_day = SAMPLES_PER_DAY
+    if rows:
+        samples_per_day = max(1, round(rows / (days * len(assets) * len(PLATFORMS))))
+
+    db = create_db_client(backend)
+    log.info(
+        f"Connected to the {backend} database. Seeding {days} days of data "
+        f"for {len(assets)} tickers × {len(PLATFORMS)} platforms "
+        f"({samples_per_day} samples/day, ~{days * samples_per_day * len(assets) * len(PLATFORMS):,} rows)."
+    )
 
     if clear:
         db.clear_mentions()
 
-    # Pre-populate assets if they don't exist
-    # SupabaseClient.insert_analysis already handles this if we pass records,
-    # but we might want to ensure names are correct.
-    
-    for platform in PLATFORMS:
-        log.info(f"Generating and inserting records for platform: {platform.name}")
-        records = generate_records(platform, ASSETS, days)
-        random.shuffle(records)  # mix up insertion order for realism
+    db.warm_cache()
+
+    generated = 0
+    for platform, records in generate_chunks(PLATFORMS, assets, days, samples_per_day, rng):
         db.insert_analysis(records, platform.name)
+        generated += len(records)
+        log.info(f"Seeded {generated:,} rows...")
 
     log.info("Seeding complete.")
+    return generated
 
 
 # ---------------------------------------------------------------------------
@@ -200,11 +285,29 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--clear",
         action="store_true",
-        help="Wipe existing asset_mentions before seeding.",
+        help="Wipe existing asset_mentions and their rollups before seeding.",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=None,
+        help="Approximate total rows to generate; sets the samples per day (default: 3/day).",
+    )
+    parser.add_argument(
+        "--tickers",
+        type=int,
+        default=None,
+        help=f"Number of tickers; beyond the {len(ASSETS)} curated ones, synthetic tickers are added.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Random seed for a reproducible dataset.",
     )
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
-    seed(days=args.days, clear=args.clear)
+    seed(days=args.days, clear=args.clear, rows=args.rows, tickers=args.tickers, random_seed=args.seed)
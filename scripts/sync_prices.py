@@ -0,0 +1,68 @@
+"""
+sync_prices.py
+~~~~~~~~~~~~~~
+Bring the local price store (PRICE_STORE_DIR) up to date, fetching only the
+date ranges it does not hold yet, publish the prices to asset_prices and
+recompute the sentiment/price correlations (sentiment_price_correlations).
+Connects with POSTGRES_DSN.
+
+Usage
+-----
+    # Every asset, PRICE_HISTORY_DAYS of history, PRICE_FETCHER source
+    python scripts/sync_prices.py
+
+    # Two tickers, one year, synthetic prices (no network)
+    python scripts/sync_prices.py --tickers AAPL TSLA --days 365 --fetcher stub
+"""
+
+import argparse
+import os
+import sys
+
+# ---------------------------------------------------------------------------
+# Bootstrap path so we can import from the project root
+# ---------------------------------------------------------------------------
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from analytics.correlation import refresh_price_correlations  # noqa: E402
+from analytics.prices import FETCHERS  # noqa: E402
+from config import CORRELATION_LAGS, PRICE_FETCHER, PRICE_HISTORY_DAYS  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sync daily prices locally and recompute sentiment/price correlations."
+    )
+    parser.add_argument(
+        "--tickers",
+        nargs="+",
+        default=None,
+        help="Tickers to sync (default: every asset).",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=PRICE_HISTORY_DAYS,
+        help=f"Days of price history (default: {PRICE_HISTORY_DAYS}).",
+    )
+    parser.add_argument(
+        "--fetcher",
+        choices=list(FETCHERS),
+        default=PRICE_FETCHER,
+        help=f"Price source (default: {PRICE_FETCHER}).",
+    )
+    parser.add_argument(
+        "--lags",
+        nargs="+",
+        type=int,
+        default=list(CORRELATION_LAGS),
+        help=f"Return lags in days to correlate with sentiment (default: {list(CORRELATION_LAGS)}).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    refresh_price_correlations(
+        tickers=args.tickers, days=args.days, lags=args.lags, fetcher_name=args.fetcher
+    )
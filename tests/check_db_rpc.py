@@ -1,13 +1,232 @@
-import sys
+"""
+check_db_rpc.py
+~~~~~~~~~~~~~~~
+Benchmark the dashboard RPCs against the local docker-compose Postgres.
+
+For each scale the database is reset, seeded with synthetic mentions
+(scripts/seed_database.py, Postgres backend) and analysed; every RPC case
+is then run repeatedly and timed, and profiled once with EXPLAIN ANALYZE.
+The JSON report (latency percentiles, rows scanned per table, buffers) is
+meant to be diffed between schema or index changes.
+
+Usage
+-----
+    # Seed 100k and 1M rows, benchmark each, write the report
+    python tests/check_db_rpc.py --scales 100000 1000000 --output logs/rpc_before.json
+
+    # Benchmark whatever is already in the database
+    python tests/check_db_rpc.py --skip-seed
+
+    # Only check that Supabase answers (the original smoke test)
+    python tests/check_db_rpc.py --check
+"""
+
+import argparse
+import json
 import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+import psycopg
+
+# Add project root and scripts/ to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from config import POSTGRES_DSN, SUPABASE_KEY, SUPABASE_URL  # noqa: E402
+
+# (label, SQL, params). Named arguments so defaults can be left out.
+CASES: Final[List[Tuple[str, str, Dict[str, Any]]]] = [
+    ("trends_all_1d", "SELECT * FROM get_sentiment_trends(p_ticker => %(p_ticker)s, p_days => %(p_days)s)",
+     {"p_ticker": None, "p_days": 1}),
+    ("trends_all_7d", "SELECT * FROM get_sentiment_trends(p_ticker => %(p_ticker)s, p_days => %(p_days)s)",
+     {"p_ticker": None, "p_days": 7}),
+    ("trends_all_90d", "SELECT * FROM get_sentiment_trends(p_ticker => %(p_ticker)s, p_days => %(p_days)s)",
+     {"p_ticker": None, "p_days": 90}),
+    ("trends_aapl_2d", "SELECT * FROM get_sentiment_trends(p_ticker => %(p_ticker)s, p_days => %(p_days)s)",
+     {"p_ticker": "AAPL", "p_days": 2}),
+    ("trends_aapl_365d", "SELECT * FROM get_sentiment_trends(p_ticker => %(p_ticker)s, p_days => %(p_days)s)",
+     {"p_ticker": "AAPL", "p_days": 365}),
+    ("top_stocks_7d", "SELECT * FROM get_top_stocks(p_days => %(p_days)s, p_limit => %(p_limit)s)",
+     {"p_days": 7, "p_limit": 10}),
+    ("top_stocks_30d", "SELECT * FROM get_top_stocks(p_days => %(p_days)s, p_limit => %(p_limit)s)",
+     {"p_days": 30, "p_limit": 10}),
+    ("dashboard_stats", "SELECT * FROM get_dashboard_stats()", {}),
+]
+
+DEFAULT_SCALES: Final[List[int]] = [10_000, 100_000, 1_000_000]
+RESET_SQL: Final[str] = "TRUNCATE asset_mentions, sentiment_rollup_hourly, sentiment_rollup_daily"
+PARTITIONS_SQL: Final[str] = (
+    "SELECT create_mention_partitions((now() - make_interval(days => %s))::date, %s)"
+)
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, mean and max of *samples_ms*, rounded to 0.001 ms."""
+    cuts = statistics.quantiles(samples_ms, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "mean_ms": round(statistics.fmean(samples_ms), 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
+
+
+def plan_summary(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarise an ``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` plan.
+
+    Rows scanned per relation count every row a scan node read, including
+    the ones its filter then discarded. SQL functions that the planner
+    cannot inline show up as an opaque ``Function Scan`` and are flagged.
+    """
+    scanned: Dict[str, int] = {}
+    node_types: List[str] = []
+    opaque = False
+
+    def walk(node: Dict[str, Any]) -> None:
+        nonlocal opaque
+        node_type = node["Node Type"]
+        node_types.append(node_type)
+        if node_type == "Function Scan":
+            opaque = True
+        relation = node.get("Relation Name")
+        if relation:
+            loops = node.get("Actual Loops", 1)
+            read = (
+                node.get("Actual Rows", 0)
+                + node.get("Rows Removed by Filter", 0)
+                + node.get("Rows Removed by Index Recheck", 0)
+            )
+            scanned[relation] = scanned.get(relation, 0) + int(read * loops)
+        for child in node.get("Plans", []):
+            walk(child)
+
+    root = plan["Plan"]
+    walk(root)
+    return {
+        "rows_returned": root.get("Actual Rows", 0),
+        "rows_scanned": sum(scanned.values()),
+        "rows_scanned_by_relation": dict(sorted(scanned.items())),
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+        "planning_ms": plan.get("Planning Time"),
+        "execution_ms": plan.get("Execution Time"),
+        "function_not_inlined": opaque,
+        "node_types": sorted(set(node_types)),
+    }
+
+
+def run_case(
+    conn: psycopg.Connection, sql: str, params: Dict[str, Any], iterations: int, warmup: int
+) -> Dict[str, Any]:
+    for _ in range(warmup):
+        conn.execute(sql, params).fetchall()
+
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
 
-# Add project root to path
-sys.path.append(os.getcwd())
+    # Client-side binding: EXPLAIN cannot take server-side parameters.
+    with psycopg.ClientCursor(conn) as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        (plan,) = cur.fetchone()[0]
 
-from database.supabase_client import SupabaseClient
-from config import SUPABASE_URL, SUPABASE_KEY
+    return {"iterations": iterations, **percentiles(samples), **plan_summary(plan)}
+
+
+# ---------------------------------------------------------------------------
+# Harness
+# ---------------------------------------------------------------------------
+
+def scale_days(rows: int, tickers: int, days: int) -> int:
+    """Days of history (at most *days*) for which *rows* still give one sample per ticker, platform and day.
+
+    The seeder emits at least one row per ticker, platform and day, so a
+    scale smaller than ``days × tickers × platforms`` would otherwise seed
+    the same dataset as the next one up.
+    """
+    from seed_database import PLATFORMS
+
+    return max(1, min(days, rows // (tickers * len(PLATFORMS))))
+
+
+def seed_scale(conn: psycopg.Connection, rows: int, tickers: int, days: int, random_seed: int) -> Dict[str, Any]:
+    """Reset the database and seed about *rows* mentions over up to *days* days.
+
+    Returns the days actually seeded, the rows generated and the seconds it took.
+    """
+    from seed_database import seed
+
+    days = scale_days(rows, tickers, days)
+    conn.execute(RESET_SQL)
+    conn.execute(PARTITIONS_SQL, (days, days // 28 + 3))
+    start = time.perf_counter()
+    seeded = seed(days=days, rows=rows, tickers=tickers, random_seed=random_seed, backend="postgres")
+    elapsed = time.perf_counter() - start
+    conn.execute("ANALYZE")
+    return {"days": days, "seeded_rows": seeded, "seed_seconds": round(elapsed, 2)}
+
+
+def table_sizes(conn: psycopg.Connection) -> Dict[str, int]:
+    rows = conn.execute(
+        "SELECT 'asset_mentions', count(*) FROM asset_mentions "
+        "UNION ALL SELECT 'sentiment_rollup_hourly', count(*) FROM sentiment_rollup_hourly "
+        "UNION ALL SELECT 'sentiment_rollup_daily', count(*) FROM sentiment_rollup_daily"
+    ).fetchall()
+    return dict(rows)
+
+
+def benchmark(
+    scales: Optional[List[int]],
+    tickers: int,
+    days: int,
+    iterations: int,
+    warmup: int,
+    random_seed: int,
+) -> Dict[str, Any]:
+    """Seed each scale (or use the data as-is if *scales* is None) and time every case."""
+    report: Dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "settings": {"tickers": tickers, "days": days, "iterations": iterations,
+                     "warmup": warmup, "seed": random_seed},
+        "scales": [],
+    }
+    with psycopg.connect(POSTGRES_DSN, autocommit=True) as conn:
+        report["server_version"] = conn.info.server_version
+        for rows in scales or [None]:
+            entry: Dict[str, Any] = {"target_rows": rows}
+            if rows is not None:
+                print(f"Seeding {rows:,} rows ({tickers} tickers, {scale_days(rows, tickers, days)} days)...")
+                entry.update(seed_scale(conn, rows, tickers, days, random_seed))
+            entry["table_rows"] = table_sizes(conn)
+            entry["queries"] = {}
+            for label, sql, params in CASES:
+                result = run_case(conn, sql, params, iterations, warmup)
+                entry["queries"][label] = {"params": params, **result}
+                print(
+                    f"  {label:<18} p50={result['p50_ms']:>8.2f}ms  p95={result['p95_ms']:>8.2f}ms  "
+                    f"p99={result['p99_ms']:>8.2f}ms  scanned={result['rows_scanned']:,}"
+                )
+            report["scales"].append(entry)
+    return report
+
+
+def check() -> None:
+    """Smoke test: Supabase is reachable and ``get_dashboard_stats`` responds."""
+    from database.supabase_client import SupabaseClient
 
-def check():
     print(f"Checking Supabase connection to: {SUPABASE_URL}")
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("Error: SUPABASE_URL or SUPABASE_KEY is missing!")
@@ -16,19 +235,57 @@ def check():
     try:
         db = SupabaseClient()
         print("Supabase client initialized.")
-        
+
         # Test a simple query
         print("Testing simple query on 'assets' table...")
         res = db.client.table("assets").select("count", count="exact").limit(1).execute()
         print(f"Assets count: {res.count}")
-        
+
         # Test the RPC
         print("Testing RPC 'get_dashboard_stats'...")
         rpc_res = db.client.rpc("get_dashboard_stats").execute()
         print(f"RPC Response: {rpc_res.data}")
-        
+
     except Exception as e:
         print(f"Exception occurred: {e}")
 
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the dashboard RPCs on the local Postgres (POSTGRES_DSN)."
+    )
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Row counts to seed and benchmark, smallest first.")
+    parser.add_argument("--tickers", type=int, default=100, help="Tickers to seed (default: 100).")
+    parser.add_argument("--days", type=int, default=365,
+                        help="Days of history to seed, fewer for scales too small to fill them (default: 365).")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed runs per case (default: 50).")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed runs per case first (default: 5).")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the dataset (default: 1).")
+    parser.add_argument("--skip-seed", action="store_true",
+                        help="Benchmark the data already in the database instead of seeding.")
+    parser.add_argument("--output", default="logs/db_rpc_benchmark.json",
+                        help="Path of the JSON report (default: logs/db_rpc_benchmark.json).")
+    parser.add_argument("--check", action="store_true",
+                        help="Only run the Supabase connectivity check.")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    check()
+    args = parse_args()
+    if args.check:
+        check()
+        sys.exit(0)
+
+    result = benchmark(
+        None if args.skip_seed else sorted(args.scales),
+        tickers=args.tickers,
+        days=args.days,
+        iterations=max(2, args.iterations),
+        warmup=args.warmup,
+        random_seed=args.seed,
+    )
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2, default=str), encoding="utf-8")
+    print(f"Report written to {output}")
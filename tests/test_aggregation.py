@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import TextSentiment
+from LLM.aggregation import (
+    aggregate_text_sentiments,
+    engagement_by_text,
+    engagement_weights,
+    posts_by_text,
+)
+from LLM.base_llm import records_from_llm_output
+
+POSTS = [
+    {
+        "id": "p1", "created_utc": 1700000000, "title": "GME", "selftext": "", "score": 1000,
+        "comments": [{"id": "c1", "body": "no", "score": 0}, {"id": "c2", "body": "yes", "score": 5}],
+    },
+    {"id": "p2", "title": "AAPL", "selftext": "", "score": 3, "comments": []},
+]
+
+
+class TestAggregation(unittest.TestCase):
+    def test_engagement_by_text(self):
+        self.assertEqual(engagement_by_text(POSTS), {"p1": 1000, "c1": 0, "c2": 5, "p2": 3})
+
+    def test_posts_by_text(self):
+        owner = ("p1", 1700000000.0)
+        self.assertEqual(
+            posts_by_text(POSTS), {"p1": owner, "c1": owner, "c2": owner, "p2": ("p2", None)}
+        )
+
+    def test_upvotes_dominate_the_weighted_score(self):
+        items = [
+            TextSentiment("p1", "GME", 0.9, 0.8, "to the moon", "hype"),
+            TextSentiment("c1", "gme", -0.9, 0.8, "it's over", "doubt"),
+        ]
+        engagement = engagement_by_text(POSTS)
+
+        (log_rec,) = aggregate_text_sentiments(items, engagement, weighting="log")
+        (lin_rec,) = aggregate_text_sentiments(items, engagement, weighting="linear")
+        (flat,) = aggregate_text_sentiments(items, engagement, weighting="none")
+
+        self.assertEqual(log_rec.symbol, "GME")
+        self.assertGreater(log_rec.sentiment_score, 0.5)
+        self.assertGreater(lin_rec.sentiment_score, log_rec.sentiment_score)
+        self.assertAlmostEqual(flat.sentiment_score, 0.0)
+        self.assertEqual(log_rec.source_text_id, "p1")
+        self.assertEqual(log_rec.source_text_snippet, "to the moon")
+        self.assertEqual(log_rec.sentiment_label, "BUY")
+
+    def test_agreement_and_volume_raise_confidence(self):
+        engagement = engagement_by_text(POSTS)
+        agree = [TextSentiment("p1", "X", 0.5, 0.8), TextSentiment("c2", "X", 0.5, 0.8)]
+        split = [TextSentiment("p1", "X", 0.5, 0.8), TextSentiment("c2", "X", -0.5, 0.8)]
+        single = [TextSentiment("p1", "X", 0.5, 0.8)]
+
+        conf = lambda items: aggregate_text_sentiments(items, engagement)[0].sentiment_confidence
+        self.assertGreater(conf(agree), conf(split))
+        self.assertGreater(conf(agree), conf(single))
+
+    def test_engagement_weights_floor_negative_scores(self):
+        self.assertEqual(engagement_weights(np.array([-50.0]), "linear").tolist(), [1.0])
+
+    def test_records_from_text_level_output(self):
+        output = [
+            {"text_id": "p2", "symbol": "AAPL", "sentiment": -0.6, "confidence": 0.9},
+            {"text_id": "p1", "symbol": "GME", "sentiment": 0.4, "confidence": 0.7},
+            {"text_id": "p1", "symbol": "BAD", "sentiment": 3.0, "confidence": 0.7},
+        ]
+        records = records_from_llm_output(output, json.dumps(POSTS))
+        self.assertEqual([r.symbol for r in records], ["AAPL", "GME"])
+        self.assertEqual(records[0].sentiment_label, "SELL")
+
+    def test_records_from_legacy_output(self):
+        output = [{
+            "symbol": "AAPL", "sentiment_score": 0.8, "sentiment_confidence": 0.9,
+            "sentiment_label": "BUY", "key_rationale": "Strong earnings",
+        }]
+        records = records_from_llm_output(output)
+        self.assertEqual(records[0].sentiment_score, 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
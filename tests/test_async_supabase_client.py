@@ -0,0 +1,162 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+from functools import partial
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import SentimentRecord
+from database.async_supabase_client import AsyncSupabaseClient
+from data.ticker_universe import TickerUniverse
+from database.batching import insert_chunked_async
+
+
+def _record(symbol: str, source_text_id: str = "t1") -> SentimentRecord:
+    return SentimentRecord(
+        symbol=symbol,
+        sentiment_score=0.5,
+        sentiment_confidence=0.8,
+        sentiment_label="BUY",
+        key_rationale="test",
+        source_text_id=source_text_id,
+        source_id="batch.json",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+@patch("database.async_supabase_client.SUPABASE_URL", "https://test.supabase.co")
+class TestAsyncSupabaseClient(unittest.IsolatedAsyncioTestCase):
+
+    def _client(self) -> AsyncSupabaseClient:
+        client = AsyncSupabaseClient(client=MagicMock(), http_client=AsyncMock())
+        self.mock_table = MagicMock()
+        self.mock_table.upsert.return_value.execute = AsyncMock()
+        client.client.table = MagicMock(return_value=self.mock_table)
+        return client
+
+    @patch(
+        "database.async_supabase_client.insert_chunked_async",
+        partial(insert_chunked_async, max_rows=2),
+    )
+    async def test_insert_analysis_chunks(self):
+        """Mentions are split into chunks, each sent as its own upsert."""
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=100)
+        client._prefetch_asset_ids = AsyncMock(side_effect=[
+            {"AAPL": 201},  # Initial pre-fetch: TSLA missing
+            {"TSLA": 202},  # After upsert
+        ])
+
+        records = [_record("AAPL", "t1"), _record("TSLA", "t1"), _record("AAPL", "t2"),
+                   _record("TSLA", "t2"), _record("AAPL", "t3")]
+        await client.insert_analysis(records, "TestPlatform")
+
+        # 1 asset upsert + 3 mention chunks
+        self.assertEqual(self.mock_table.upsert.call_count, 4)
+        inserted = [row for call in self.mock_table.upsert.call_args_list[1:] for row in call.args[0]]
+        self.assertEqual(len(inserted), 5)
+        self.assertTrue(all(row["platform_id"] == 100 for row in inserted))
+        self.assertEqual({row["asset_id"] for row in inserted}, {201, 202})
+
+    @patch(
+        "data.ticker_universe.get_ticker_universe",
+        return_value=TickerUniverse({"BTC": "Crypto", "AAPL": "Stock"}, {}),
+    )
+    async def test_new_assets_take_universe_type(self, _universe):
+        """New assets are created with the universe's type; unknown ones default to Stock."""
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=7)
+        client._prefetch_asset_ids = AsyncMock(side_effect=[{}, {"BTC": 1, "NEWCO": 2}])
+
+        await client.insert_analysis([_record("BTC"), _record("NEWCO", "t2")], "Reddit")
+
+        (assets,), _ = self.mock_table.upsert.call_args_list[0]
+        self.assertEqual(
+            {a["ticker"]: a["asset_type"] for a in assets},
+            {"BTC": "Crypto", "NEWCO": "Stock"},
+        )
+
+    async def test_platform_id_is_resolved_once(self):
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=7)
+        client._prefetch_asset_ids = AsyncMock(return_value={"AAPL": 1})
+
+        self.assertEqual(await client.resolve_platform_id("Reddit"), 7)
+        await client.insert_analysis([_record("AAPL")], "Reddit")
+        await client.insert_analysis([_record("AAPL")], "Reddit")
+
+        client._get_or_create.assert_awaited_once()
+        self.assertEqual(self.mock_table.upsert.call_count, 2)
+
+    async def test_retried_mentions_are_collapsed(self):
+        """Records sharing a source identity become one upsert row (last wins)."""
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=7)
+        client._prefetch_asset_ids = AsyncMock(return_value={"AAPL": 1})
+
+        first, retry = _record("AAPL"), _record("AAPL")
+        retry.sentiment_score = -0.5
+        await client.insert_analysis([first, retry], "Reddit")
+
+        (rows,), kwargs = self.mock_table.upsert.call_args
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["sentiment_score"], -0.5)
+        self.assertEqual(rows[0]["source_id"], "batch.json")
+        self.assertEqual(kwargs["on_conflict"], "asset_id,platform_id,source_id,source_text_id,created_at")
+
+    async def test_missing_platform_skips_batch(self):
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=None)
+        client._prefetch_asset_ids = AsyncMock(return_value={"AAPL": 1})
+
+        await client.insert_analysis([_record("AAPL")], "Reddit")
+        self.mock_table.upsert.assert_not_called()
+
+    async def test_unresolved_assets_are_reported(self):
+        """If the lookups succeed but find no asset, the report says so (the outbox parks it)."""
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=7)
+        client._prefetch_asset_ids = AsyncMock(return_value={})
+
+        report = await client.insert_analysis([_record("AAPL")], "Reddit")
+        self.assertEqual((report.inserted, report.unresolved), (0, 1))
+
+    async def test_asset_lookup_errors_propagate(self):
+        """An outage while resolving assets is raised, not reported as unresolved."""
+        client = self._client()
+        client._get_or_create = AsyncMock(return_value=7)
+        client._prefetch_asset_ids = AsyncMock(side_effect=httpx.ConnectError("down"))
+
+        with self.assertRaises(httpx.ConnectError):
+            await client.insert_analysis([_record("AAPL")], "Reddit")
+        self.mock_table.upsert.assert_not_called()
+
+    @patch("database.async_supabase_client.PROCESSED_POST_LOOKUP_BATCH", 2)
+    async def test_processed_lookup_checks_only_candidates(self):
+        """Candidate IDs are looked up in batches; confirmed ones are then cached."""
+        client = self._client()
+        query = self.mock_table.select.return_value.eq.return_value.in_
+        query.return_value.execute = AsyncMock(side_effect=[
+            MagicMock(data=[{"post_id": "p1"}]),
+            MagicMock(data=[{"post_id": "p3"}]),
+        ])
+
+        processed = await client.get_processed_post_ids("reddit", ["p1", "p2", "p3"])
+        self.assertEqual(processed, {"p1", "p3"})
+        self.assertEqual([c.args[1] for c in query.call_args_list], [["p1", "p2"], ["p3"]])
+
+        # Second scrape: p1/p3 come from the cache, only p2 and p4 are queried.
+        query.reset_mock()
+        query.return_value.execute = AsyncMock(return_value=MagicMock(data=[]))
+        processed = await client.get_processed_post_ids("reddit", ["p1", "p2", "p3", "p4"])
+        self.assertEqual(processed, {"p1", "p3"})
+        self.assertEqual([c.args[1] for c in query.call_args_list], [["p2", "p4"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
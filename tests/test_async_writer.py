@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.async_writer import AsyncStorageWriter
+
+
+class TestAsyncStorageWriter(unittest.IsolatedAsyncioTestCase):
+
+    async def test_writes_do_not_block_loop_and_flush_on_close(self):
+        """Slow writes run off-loop, and close() waits for all of them."""
+        written = []
+
+        def slow_write(name, data):
+            time.sleep(0.05)
+            written.append((name, data))
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        async with AsyncStorageWriter(slow_write, max_pending=2) as writer:
+            for i in range(4):
+                await writer.submit(f"sub{i}", [i])
+        ticker_task.cancel()
+
+        self.assertEqual(written, [(f"sub{i}", [i]) for i in range(4)])
+        self.assertEqual(writer.written, 4)
+        # The loop kept running while ~200ms of blocking writes happened.
+        self.assertGreater(ticks, 10)
+
+    async def test_failed_write_is_logged_not_raised(self):
+        def broken_write(*args):
+            raise IOError("disk full")
+
+        writer = AsyncStorageWriter(broken_write)
+        await writer.submit("sub", [])
+        await writer.close()
+        self.assertEqual(writer.failed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
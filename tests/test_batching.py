@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sys
+import unittest
+
+import httpx
+import psycopg
+from postgrest.exceptions import APIError
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.batching import (
+    chunk_rows,
+    insert_chunked,
+    insert_chunked_async,
+    is_batch_error,
+    is_row_error,
+    is_transient_error,
+)
+
+ROWS = [{"asset_id": i, "rationale": "x" * 10} for i in range(10)]
+BAD_ID = 6
+
+
+def _data_error() -> APIError:
+    return APIError({"code": "23503", "message": "violates foreign key constraint"})
+
+
+class FakeTable:
+    """Insert target that rejects any chunk containing BAD_ID and can fail transiently."""
+
+    def __init__(self, transient_failures: int = 0):
+        self.transient_failures = transient_failures
+        self.calls = 0
+        self.rows = []
+
+    def _check(self, chunk):
+        self.calls += 1
+        if self.transient_failures:
+            self.transient_failures -= 1
+            raise ConnectionError("connection reset")
+        if any(row["asset_id"] == BAD_ID for row in chunk):
+            raise _data_error()
+        self.rows.extend(chunk)
+
+    def insert(self, chunk):
+        self._check(chunk)
+
+    async def ainsert(self, chunk):
+        self._check(chunk)
+
+
+class TestBatching(unittest.TestCase):
+
+    def test_chunk_rows_respects_row_and_byte_limits(self):
+        self.assertEqual([len(c) for c in chunk_rows(ROWS, max_rows=4)], [4, 4, 2])
+
+        row_bytes = len('{"asset_id": 0, "rationale": "xxxxxxxxxx"}') + 1
+        chunks = chunk_rows(ROWS, max_rows=100, max_bytes=row_bytes * 3)
+        self.assertEqual([len(c) for c in chunks], [3, 3, 3, 1])
+        self.assertEqual([r for c in chunks for r in c], ROWS)
+
+    def test_is_transient_error(self):
+        self.assertTrue(is_transient_error(ConnectionError()))
+        self.assertTrue(is_transient_error(TimeoutError()))
+        self.assertTrue(is_transient_error(httpx.ReadTimeout("timed out")))
+        self.assertTrue(is_transient_error(psycopg.OperationalError("server closed the connection")))
+        self.assertTrue(is_transient_error(APIError({"code": "57014"})))
+        self.assertTrue(is_transient_error(APIError({"code": "PGRST000"})))
+        self.assertTrue(is_transient_error(APIError({"code": "503"})))
+        self.assertTrue(is_transient_error(APIError({"code": 429})))
+        self.assertFalse(is_transient_error(_data_error()))
+        self.assertFalse(is_transient_error(APIError({"code": "400"})))
+        self.assertFalse(is_transient_error(APIError({"code": None})))
+
+        response = httpx.Response(502, request=httpx.Request("POST", "http://db"))
+        self.assertTrue(is_transient_error(
+            httpx.HTTPStatusError("bad gateway", request=response.request, response=response)
+        ))
+
+        # Values that cannot be encoded are bisected, not retried.
+        self.assertFalse(is_transient_error(ValueError("bad row")))
+        self.assertTrue(is_row_error(TypeError("not serialisable")))
+
+    def test_batch_errors_are_not_row_errors(self):
+        self.assertTrue(is_row_error(_data_error()))
+        self.assertTrue(is_row_error(APIError({"code": "22001"})))
+        for code in ("PGRST204", "PGRST301", "42501", "42703", "28000", "401", "403"):
+            with self.subTest(code=code):
+                exc = APIError({"code": code})
+                self.assertTrue(is_batch_error(exc))
+                self.assertFalse(is_row_error(exc))
+
+    def test_batch_error_is_raised_without_bisecting(self):
+        """A schema/auth error fails the whole insert in one request per chunk."""
+        calls = []
+
+        def insert(chunk):
+            calls.append(len(chunk))
+            raise APIError({"code": "PGRST204", "message": "column not found"})
+
+        with self.assertRaises(APIError):
+            insert_chunked(insert, ROWS, max_rows=64, retries=2, backoff=0)
+        self.assertEqual(calls, [10])
+
+        async def ainsert(chunk):
+            insert(chunk)
+
+        with self.assertRaises(APIError):
+            asyncio.run(insert_chunked_async(ainsert, ROWS, max_rows=64, retries=2, backoff=0))
+        self.assertEqual(calls, [10, 10])
+
+    def test_bad_row_is_isolated(self):
+        """A rejected chunk is bisected so only the offending row is lost."""
+        table = FakeTable()
+        report = insert_chunked(table.insert, ROWS, max_rows=4, retries=0)
+
+        self.assertEqual(report.inserted, 9)
+        self.assertEqual(report.rejected_rows, [ROWS[BAD_ID]])
+        self.assertEqual(report.failed_rows, [])
+        self.assertEqual(sorted(r["asset_id"] for r in table.rows),
+                         [i for i in range(10) if i != BAD_ID])
+
+    def test_transient_errors_are_retried(self):
+        table = FakeTable(transient_failures=2)
+        report = insert_chunked(table.insert, ROWS[:3], retries=2, backoff=0)
+        self.assertTrue(report.ok)
+        self.assertEqual(report.inserted, 3)
+        self.assertEqual(table.calls, 3)
+
+        table = FakeTable(transient_failures=5)
+        report = insert_chunked(table.insert, ROWS[:3], retries=1, backoff=0)
+        self.assertEqual(report.failed_rows, ROWS[:3])
+
+    def test_async_matches_sync(self):
+        table = FakeTable()
+        report = asyncio.run(
+            insert_chunked_async(table.ainsert, ROWS, max_rows=4, concurrency=2, retries=0)
+        )
+        self.assertEqual(report.inserted, 9)
+        self.assertEqual(report.rejected_rows, [ROWS[BAD_ID]])
+
+
+if __name__ == "__main__":
+    unittest.main()
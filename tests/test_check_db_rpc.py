@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tests.check_db_rpc import percentiles, plan_summary
+
+
+class TestRpcBenchmarkHelpers(unittest.TestCase):
+    def test_percentiles(self):
+        stats = percentiles([float(i) for i in range(1, 101)])
+        self.assertAlmostEqual(stats["p50_ms"], 50.5)
+        self.assertAlmostEqual(stats["p99_ms"], 99.01)
+        self.assertEqual(stats["max_ms"], 100.0)
+
+    def test_plan_summary_counts_filtered_rows_and_loops(self):
+        plan = {
+            "Planning Time": 0.1,
+            "Execution Time": 2.0,
+            "Plan": {
+                "Node Type": "Hash Join",
+                "Actual Rows": 5,
+                "Actual Loops": 1,
+                "Shared Hit Blocks": 12,
+                "Plans": [
+                    {"Node Type": "Seq Scan", "Relation Name": "sentiment_rollup_daily",
+                     "Actual Rows": 40, "Rows Removed by Filter": 60, "Actual Loops": 1},
+                    {"Node Type": "Index Scan", "Relation Name": "assets",
+                     "Actual Rows": 1, "Actual Loops": 5},
+                ],
+            },
+        }
+        summary = plan_summary(plan)
+        self.assertEqual(summary["rows_returned"], 5)
+        self.assertEqual(summary["rows_scanned_by_relation"],
+                         {"assets": 5, "sentiment_rollup_daily": 100})
+        self.assertEqual(summary["rows_scanned"], 105)
+        self.assertFalse(summary["function_not_inlined"])
+
+
+if __name__ == "__main__":
+    unittest.main()
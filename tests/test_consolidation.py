@@ -0,0 +1,114 @@
+import os
+import random
+import sys
+import unittest
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.consolidation import SOURCE_ID_MAX_LENGTH, compact_source_ids, consolidate_records
+from data.models import SentimentRecord
+from database.client_base import build_mention_rows
+
+HOUR = datetime(2024, 1, 1, 14, tzinfo=timezone.utc)
+
+
+def _record(symbol, score, confidence, source_id, minute=0, source_name="reddit", **kwargs):
+    return SentimentRecord(
+        symbol=symbol,
+        sentiment_score=score,
+        sentiment_confidence=confidence,
+        sentiment_label="NEUTRAL",
+        key_rationale=f"from {source_id}",
+        source_text_id=f"t-{source_id}",
+        source_text_snippet=f"quote {source_id}",
+        created_at=HOUR + timedelta(minutes=minute),
+        source_id=source_id,
+        source_name=source_name,
+        **kwargs,
+    )
+
+
+def _hourly_rollups(records):
+    """Python mirror of the sums refresh_sentiment_rollups writes per hour."""
+    rows = build_mention_rows(records, platform_id=1, asset_ids={"AAPL": 1, "TSLA": 2})
+    rollups = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    for row in rows:
+        bucket = datetime.fromisoformat(row["created_at"]).replace(minute=0, second=0)
+        score, confidence, count = row["sentiment_score"], row["confidence_level"], row["mention_count"]
+        sums = rollups[(row["asset_id"], bucket)]
+        sums[0] += count
+        sums[1] += row["sentiment_sum"] if row["sentiment_sum"] is not None else score * count
+        sums[2] += score * confidence * count
+        sums[3] += confidence * count
+    return dict(rollups)
+
+
+class TestConsolidation(unittest.TestCase):
+    def test_merges_per_symbol_platform_and_bucket(self):
+        records = [
+            _record("AAPL", 0.8, 0.9, "b1.json", minute=5),
+            _record("aapl", -0.2, 0.3, "b2.json", minute=40),
+            _record("AAPL", 0.5, 0.5, "b3.json", minute=70),   # next hour
+            _record("AAPL", 0.1, 0.5, "b1.json", source_name="twitter"),
+            _record("TSLA", -0.6, 0.7, "b1.json"),
+        ]
+        out = consolidate_records(records, bucket_minutes=60)
+
+        self.assertEqual(len(out), 4)
+        merged = out[0]
+        self.assertEqual(merged.symbol, "AAPL")
+        self.assertEqual(merged.mention_count, 2)
+        self.assertEqual(merged.created_at, HOUR)
+        self.assertEqual(merged.source_id, "b1.json,b2.json")
+        self.assertAlmostEqual(merged.sentiment_score, round((0.9 * 0.8 - 0.3 * 0.2) / 1.2, 4))
+        self.assertAlmostEqual(merged.sentiment_confidence, 0.6)
+        self.assertEqual(merged.sentiment_label, "BUY")
+        self.assertEqual(merged.source_text_snippet, "quote b1.json")
+        self.assertIs(out[1], records[2])
+
+    def test_mention_counts_carry_through_repeated_consolidation(self):
+        first = consolidate_records([_record("GME", 0.4, 0.5, f"b{i}") for i in range(3)])
+        again = consolidate_records(first + [_record("GME", 0.4, 0.5, "b9")])
+        self.assertEqual(again[0].mention_count, 4)
+
+    def test_rollups_match_unconsolidated_records(self):
+        """Merging must not change any hourly rollup sum, even when merged twice."""
+        rng = random.Random(7)
+        records = [
+            _record(
+                rng.choice(["AAPL", "TSLA"]),
+                round(rng.uniform(-1, 1), 4),
+                rng.choice([0.0, round(rng.uniform(0, 1), 4)]),
+                f"b{i}.json",
+                minute=rng.randrange(180),
+            )
+            for i in range(60)
+        ]
+        expected = _hourly_rollups(records)
+
+        once = consolidate_records(list(records), bucket_minutes=30)
+        twice = consolidate_records(once, bucket_minutes=60)
+        self.assertLess(len(twice), len(once))
+        for merged in (once, twice):
+            actual = _hourly_rollups(merged)
+            self.assertEqual(actual.keys(), expected.keys())
+            for key, sums in expected.items():
+                self.assertEqual(actual[key][0], sums[0])
+                for got, want in zip(actual[key][1:], sums[1:]):
+                    self.assertAlmostEqual(got, want, places=2)
+
+    def test_compact_source_ids_stays_within_column(self):
+        ids = [f"reddit_wallstreetbets_batch_{i:04d}.json" for i in range(40)]
+        compact = compact_source_ids(ids)
+        self.assertLessEqual(len(compact), SOURCE_ID_MAX_LENGTH)
+        self.assertTrue(compact.startswith(ids[0]))
+        self.assertIn("+39#", compact)
+        self.assertNotEqual(compact, compact_source_ids(ids[:-1]))
+        self.assertIsNone(compact_source_ids([None, ""]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.data_handler import DataHandler
+from data.merged_context import MergedContext
+from main import _cleanup_directories
+
+
+class TestDataHandlerConversion(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = Path("tests/temp_pool_raw_json")
+        self.input_dir = Path("tests/temp_pool_llm_input")
+        self.manifest_file = Path("tests/temp_pool_manifest.json")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.input_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        for directory in (self.output_dir, self.input_dir):
+            if directory.exists():
+                shutil.rmtree(directory)
+        if self.manifest_file.exists():
+            self.manifest_file.unlink(missing_ok=True)
+
+    def _patches(self, mode: str):
+        return [
+            patch("data.data_handler.DATA_OUTPUT_DIR", str(self.output_dir)),
+            patch("data.data_handler.LLM_INPUT_DIR", str(self.input_dir)),
+            patch("data.data_handler.MANIFEST_FILE", str(self.manifest_file)),
+            patch("data.data_handler.MERGE_LLM_OUTPUT", False),
+            patch("data.data_handler.KEEP_RAW_JSON", True),
+            patch("data.data_handler.FILE_PROCESSING_MODE", mode),
+            patch("data.data_handler.PROCESS_POOL_MIN_FILES", 2),
+            patch("data.data_handler.PROCESS_POOL_CHUNK_SIZE", 3),
+        ]
+
+    def test_clean_text_matches_regex(self):
+        """The encode/decode fast path must strip exactly what the old regex did."""
+        dh = DataHandler()
+        pattern = re.compile(r"[^\x00-\x7F]+")
+        samples = ["plain text", "rocket 🚀🚀 to the moon", "café  naïve\tdéjà", "日本語 only", ""]
+        for text in samples:
+            expected = " ".join(pattern.sub("", text).split())
+            self.assertEqual(dh._clean_text(text), expected)
+
+    def test_process_pool_matches_thread_pool(self):
+        """Process-pool mode should produce the same files as thread mode."""
+        for i in range(7):
+            with open(self.output_dir / f"sub{i}_20240101_0000.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "meta": {"subreddit": f"sub{i}"},
+                    "data": [{"id": f"p{i}", "title": f"Post {i} 🚀", "selftext": "Body", "score": i}],
+                }, f)
+        # One corrupt file must not take down the rest of its chunk.
+        (self.output_dir / "broken_20240101_0000.json").write_text("{not json", encoding="utf-8")
+
+        outputs = {}
+        for mode in ("thread", "process"):
+            for p in self._patches(mode):
+                p.start()
+            try:
+                DataHandler().process_files_to_json()
+            finally:
+                patch.stopall()
+            outputs[mode] = {
+                fp.name: json.loads(fp.read_text(encoding="utf-8"))
+                for fp in self.input_dir.glob("*.json")
+            }
+            shutil.rmtree(self.input_dir)
+            self.input_dir.mkdir(parents=True)
+            self.manifest_file.unlink(missing_ok=True)
+
+        self.assertEqual(len(outputs["process"]), 7)
+        self.assertEqual(outputs["process"], outputs["thread"])
+        self.assertEqual(outputs["process"]["sub3_20240101_0000.json"][0]["title"], "Post 3")
+
+    def _write_raw(self, name: str, posts: list) -> None:
+        with open(self.output_dir / name, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"subreddit": "sub"}, "data": posts}, f)
+
+    def _run(self, analysed: bool = True, mode: str = "thread") -> dict:
+        """Convert the raw files; *analysed* confirms them as if the LLM succeeded."""
+        for p in self._patches(mode):
+            p.start()
+        try:
+            dh = DataHandler()
+            written = dh.process_files_to_json()
+            if analysed:
+                dh.mark_analysed(fp.name for fp in written)
+        finally:
+            patch.stopall()
+        outputs = {
+            fp.name: json.loads(fp.read_text(encoding="utf-8"))
+            for fp in self.input_dir.glob("*.json")
+        }
+        for fp in self.input_dir.glob("*.json"):
+            fp.unlink()
+        return outputs
+
+    def test_manifest_skips_unchanged_content(self):
+        """Re-scrapes only forward new or edited posts, regardless of filename."""
+        post_a = {"id": "a", "title": "AAPL to the moon", "score": 10}
+        post_b = {"id": "b", "title": "TSLA is overvalued", "score": 5}
+
+        self._write_raw("sub_20240101_0000.json", [post_a, post_b])
+        first = self._run()
+        self.assertEqual(len(first["sub_20240101_0000.json"]), 2)
+
+        # Identical content under a new timestamp: skipped outright.
+        (self.output_dir / "sub_20240101_0000.json").unlink()
+        self._write_raw("sub_20240101_0001.json", [post_a, post_b])
+        self.assertEqual(self._run(), {})
+
+        # Same filename, changed content: only the edited/new posts are kept,
+        # and a score change alone does not count as an edit.
+        (self.output_dir / "sub_20240101_0001.json").unlink()
+        post_a_rescored = dict(post_a, score=500)
+        post_b_edited = dict(post_b, title="TSLA is overvalued (edit: sold)")
+        post_c = {"id": "c", "title": "NVDA earnings", "score": 1}
+        self._write_raw("sub_20240101_0001.json", [post_a_rescored, post_b_edited, post_c])
+        third = self._run()
+        ids = [p["id"] for p in third["sub_20240101_0001.json"]]
+        self.assertEqual(ids, ["b", "c"])
+
+    def test_process_pool_checks_manifest_snapshot(self):
+        """Workers skip known content using the snapshot, not a pickled manifest."""
+        posts = [{"id": f"p{i}", "title": f"Post {i}", "score": i} for i in range(3)]
+        for i, post in enumerate(posts):
+            self._write_raw(f"sub{i}_20240101_0000.json", [post])
+        self.assertEqual(len(self._run(mode="process")), 3)
+        self.assertEqual(self._run(mode="process"), {})
+
+        self._write_raw("sub1_20240101_0000.json", [dict(posts[1], title="Post 1 (edited)")])
+        self.assertEqual(list(self._run(mode="process")), ["sub1_20240101_0000.json"])
+
+        for p in self._patches("process"):
+            p.start()
+        try:
+            self.assertIsNone(pickle.loads(pickle.dumps(DataHandler())).manifest)
+        finally:
+            patch.stopall()
+
+    def test_failed_analysis_leaves_manifest_untouched(self):
+        """Posts whose LLM call failed are converted again on the next run."""
+        post = {"id": "a", "title": "AAPL to the moon", "score": 10}
+        self._write_raw("sub_20240101_0000.json", [post])
+
+        self.assertEqual(len(self._run(analysed=False)["sub_20240101_0000.json"]), 1)
+        manifest = json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        self.assertEqual(manifest["posts"], {})
+        self.assertEqual(list(manifest["pending"]), ["sub_20240101_0000.json"])
+
+        retried = self._run()
+        self.assertEqual([p["id"] for p in retried["sub_20240101_0000.json"]], ["a"])
+        self.assertEqual(self._run(), {})
+
+    def test_kept_input_is_confirmed_after_a_restart(self):
+        """A failed file's LLM input is kept, and analysing it in a later process records it."""
+        self._write_raw("sub_20240101_0000.json", [{"id": "a", "title": "AAPL", "score": 1}])
+        for p in self._patches("thread"):
+            p.start()
+        try:
+            DataHandler().process_files_to_json()
+            (self.output_dir / "sub_20240101_0000.json").unlink()
+            with patch("main.KEEP_LLM_INPUT", False), patch("main.KEEP_LLM_OUTPUT", True):
+                _cleanup_directories(self.input_dir, self.output_dir, DataHandler().pending)
+            self.assertTrue((self.input_dir / "sub_20240101_0000.json").exists())
+
+            restarted = DataHandler()
+            self.assertEqual(restarted.mark_analysed(["sub_20240101_0000.json"]), 1)
+            self.assertEqual(restarted.pending, {})
+            self.assertFalse(DataHandler().manifest.is_post_changed("a", restarted.manifest.posts["a"]["hash"]))
+        finally:
+            patch.stopall()
+
+
+class TestMergedContext(unittest.TestCase):
+    def setUp(self):
+        self.data_path = Path("tests/temp_merged/FULL_CONTEXT.ndjson")
+
+    def tearDown(self):
+        shutil.rmtree(self.data_path.parent, ignore_errors=True)
+
+    def test_unindexed_tail_is_truncated(self):
+        """A crash between the data and index writes must not corrupt records."""
+        merged = MergedContext(self.data_path)
+        merged.append([{"id": "a"}, {"id": "b"}])
+
+        # Simulate a crash: data appended, index never written.
+        with open(self.data_path, "ab") as f:
+            f.write(b'{"id":"partial"')
+
+        self.assertEqual(len(merged), 2)
+        self.assertEqual([r["id"] for r in merged], ["a", "b"])
+
+        merged.append([{"id": "c"}])
+        self.assertEqual([r["id"] for r in merged], ["a", "b", "c"])
+        self.assertEqual(merged[2], {"id": "c"})
+        with self.assertRaises(IndexError):
+            merged[3]
+
+
+if __name__ == "__main__":
+    unittest.main()
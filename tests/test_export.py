@@ -0,0 +1,141 @@
+import os
+import shutil
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database.export as export
+from database.export import (
+    advance_watermark,
+    group_by_partition,
+    is_unexported,
+    partition_path,
+    read_watermark,
+    write_watermark,
+)
+
+DAY = datetime(2024, 3, 1, 23, 30, tzinfo=timezone.utc)
+
+
+def _row(mention_id: int, created_at: datetime, platform: str = "r/stocks") -> tuple:
+    return (
+        mention_id, created_at, "AAPL", "Stock", platform, 0.5, 0.8, 1,
+        f"post{mention_id}", platform, f"t{mention_id}", "to the moon", "hype",
+    )
+
+
+class TestExportLayout(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_export")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_partition_path_is_hive_style(self):
+        path = partition_path(self.tmp_dir, "2024-03-01", "r_stocks", 42, "parquet")
+        self.assertEqual(
+            path, self.tmp_dir / "date=2024-03-01" / "platform=r_stocks" / "part-000000000042.parquet"
+        )
+        self.assertEqual(partition_path(self.tmp_dir, "2024-03-01", "x", 1, "arrow").suffix, ".arrow")
+
+    def test_group_by_partition_uses_utc_date_and_safe_platform(self):
+        local = DAY.astimezone(timezone(timedelta(hours=2)))  # Already 2024-03-02 locally
+        rows = [_row(1, DAY), _row(2, local), _row(3, DAY + timedelta(hours=1)), _row(4, DAY, None)]
+
+        groups = group_by_partition(rows)
+
+        self.assertEqual([r[0] for r in groups[("2024-03-01", "r_stocks")]], [1, 2])
+        self.assertEqual([r[0] for r in groups[("2024-03-02", "r_stocks")]], [3])
+        self.assertEqual([r[0] for r in groups[("2024-03-01", "unknown")]], [4])
+
+    def test_watermark_round_trip(self):
+        self.assertEqual(read_watermark(self.tmp_dir), (0, []))
+        write_watermark(self.tmp_dir, 1234, [(5, 7)])
+        self.assertEqual(read_watermark(self.tmp_dir), (1234, [(5, 7)]))
+
+    def test_skipped_ids_become_gaps_until_filled_or_too_old(self):
+        after, gaps = advance_watermark(2, [], [3, 6, 7, 10])
+        self.assertEqual((after, gaps), (10, [(4, 5), (8, 9)]))
+        self.assertTrue(is_unexported(5, after, gaps))
+        self.assertFalse(is_unexported(6, after, gaps))
+        self.assertTrue(is_unexported(11, after, gaps))
+
+        self.assertEqual(advance_watermark(after, gaps, [4, 9]), (10, [(5, 5), (8, 8)]))
+        self.assertEqual(advance_watermark(after, gaps, [14], rescan_ids=6), (14, [(9, 9), (11, 13)]))
+
+    def test_corrupt_watermark_raises(self):
+        (self.tmp_dir / export.WATERMARK_FILE).write_text("{", encoding="utf-8")
+        with self.assertRaises(RuntimeError):
+            read_watermark(self.tmp_dir)
+
+    def test_export_requires_pyarrow(self):
+        with patch.object(export, "pa", None):
+            with self.assertRaises(ImportError):
+                export.export_mentions(dsn="postgresql://test", directory=str(self.tmp_dir))
+
+
+@unittest.skipUnless(export.pa is not None, "pyarrow not installed")
+class TestExportMentions(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_export_files")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _export(self, batches, fmt="parquet", full=False):
+        cursor = MagicMock()
+        cursor.fetchmany.side_effect = batches + [[]]
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cursor
+        with patch.object(export.psycopg, "connect") as connect:
+            connect.return_value.__enter__.return_value = conn
+            written = export.export_mentions(
+                dsn="postgresql://test", directory=str(self.tmp_dir), fmt=fmt, batch_rows=2, full=full
+            )
+        return written, cursor
+
+    def test_batches_are_partitioned_and_watermarked(self):
+        written, cursor = self._export([[_row(1, DAY), _row(2, DAY, "r/wsb")], [_row(3, DAY)]])
+
+        self.assertEqual(written, 3)
+        self.assertEqual(cursor.execute.call_args[0][1], {"after": 0})
+        self.assertEqual(read_watermark(self.tmp_dir), (3, []))
+        self.assertEqual(len(list(self.tmp_dir.glob("date=2024-03-01/platform=r_stocks/*.parquet"))), 2)
+
+        table = export.open_exports(str(self.tmp_dir)).to_table()
+        self.assertEqual(sorted(table.column("mention_id").to_pylist()), [1, 2, 3])
+        self.assertIn("platform", table.column_names)
+
+    def test_incremental_run_starts_after_watermark(self):
+        self._export([[_row(1, DAY)]])
+        _, cursor = self._export([[_row(2, DAY)]])
+        self.assertEqual(cursor.execute.call_args[0][1], {"after": 1})
+
+    def test_late_commit_below_watermark_is_exported_once(self):
+        self._export([[_row(1, DAY), _row(3, DAY)]])  # mention 2 not committed yet
+        self.assertEqual(read_watermark(self.tmp_dir), (3, [(2, 2)]))
+
+        written, cursor = self._export([[_row(2, DAY), _row(3, DAY)], [_row(4, DAY)]])
+
+        self.assertEqual(cursor.execute.call_args[0][1], {"after": 1})
+        self.assertEqual(written, 2)
+        self.assertEqual(read_watermark(self.tmp_dir), (4, []))
+        table = export.open_exports(str(self.tmp_dir)).to_table()
+        self.assertEqual(sorted(table.column("mention_id").to_pylist()), [1, 2, 3, 4])
+
+    def test_arrow_files_are_memory_mappable(self):
+        self._export([[_row(1, DAY)]], fmt="arrow")
+        path = next(self.tmp_dir.rglob("*.arrow"))
+        with export.pa.memory_map(str(path)) as source:
+            table = export.pa.ipc.open_file(source).read_all()
+        self.assertEqual(table.column("ticker").to_pylist(), ["AAPL"])
+
+
+if __name__ == "__main__":
+    unittest.main()
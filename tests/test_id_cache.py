@@ -0,0 +1,89 @@
+import os
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import SentimentRecord
+from database.async_supabase_client import AsyncSupabaseClient
+from database.id_cache import IdCache
+
+
+def _record(symbol: str) -> SentimentRecord:
+    return SentimentRecord(
+        symbol=symbol,
+        sentiment_score=0.5,
+        sentiment_confidence=0.8,
+        sentiment_label="BUY",
+        key_rationale="test",
+    )
+
+
+class TestIdCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_id_cache")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_lru_eviction_and_metrics(self):
+        cache = IdCache(max_size=2)
+        cache.update({"AAPL": 1, "TSLA": 2})
+        self.assertEqual(cache.get("AAPL"), 1)   # AAPL now most recent
+        cache.put("MSFT", 3)                     # evicts TSLA
+
+        self.assertEqual(cache.get_many(["AAPL", "TSLA", "MSFT"]), {"AAPL": 1, "MSFT": 3})
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(cache.hit_rate, 0.75)
+
+    def test_invalidate_ids(self):
+        cache = IdCache()
+        cache.update({"AAPL": 1, "TSLA": 2})
+        cache.invalidate_ids([2])
+        self.assertNotIn("TSLA", cache)
+        self.assertIn("AAPL", cache)
+
+    def test_file_backing_is_per_namespace(self):
+        path = self.tmp_dir / "assets.json"
+        cache = IdCache(path=path, namespace="db-a")
+        cache.put("AAPL", 1)
+        cache.save()
+
+        self.assertEqual(IdCache(path=path, namespace="db-a").get("AAPL"), 1)
+        self.assertIsNone(IdCache(path=path, namespace="db-b").get("AAPL"))
+
+    def test_missing_namespace_is_allowed(self):
+        """Clients pass SUPABASE_URL, which is None when the env var is unset."""
+        self.assertEqual(IdCache(namespace=None).namespace, IdCache(namespace="").namespace)
+
+
+@patch("database.async_supabase_client.SUPABASE_URL", "https://test.supabase.co")
+class TestClientCaching(unittest.IsolatedAsyncioTestCase):
+
+    async def test_steady_state_needs_no_lookups(self):
+        """Once warmed, inserts for known tickers and platforms skip every lookup."""
+        client = AsyncSupabaseClient(client=MagicMock(), http_client=AsyncMock())
+        mock_table = MagicMock()
+        mock_table.upsert.return_value.execute = AsyncMock()
+        client.client.table = MagicMock(return_value=mock_table)
+        client._get_or_create = AsyncMock()
+
+        client.platform_ids.put("Reddit", 7)
+        client.asset_ids.update({"AAPL": 1, "TSLA": 2})
+
+        report = await client.insert_analysis([_record("AAPL"), _record("TSLA")], "Reddit")
+
+        self.assertEqual(report.inserted, 2)
+        client._get_or_create.assert_not_awaited()
+        mock_table.select.assert_not_called()
+        client.client.table.assert_called_once_with("asset_mentions")
+        self.assertEqual(client.asset_ids.hit_rate, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import re
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.migrate import MIGRATIONS_DIR, apply_migrations, ensure_partitions
+
+
+class TestMigrate(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_migrations")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        for name in ("002_second.sql", "001_first.sql", "003_third.sql"):
+            (self.tmp_dir / name).write_text(f"-- {name}", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _conn(self, applied):
+        conn = MagicMock()
+        conn.execute.side_effect = lambda sql, *args: (
+            [(v,) for v in applied] if sql.startswith("SELECT version") else MagicMock()
+        )
+        return conn
+
+    def test_applies_pending_in_order(self):
+        conn = self._conn(applied=["001_first"])
+        done = apply_migrations(conn, self.tmp_dir)
+
+        self.assertEqual(done, ["002_second", "003_third"])
+        executed = [c.args[0] for c in conn.execute.call_args_list]
+        self.assertIn("-- 002_second.sql", executed)
+        self.assertNotIn("-- 001_first.sql", executed)
+        self.assertLess(executed.index("-- 002_second.sql"), executed.index("-- 003_third.sql"))
+
+    def test_ensure_partitions_includes_current_month(self):
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = (2,)
+        self.assertEqual(ensure_partitions(conn, months_ahead=3), 2)
+        self.assertEqual(conn.execute.call_args.args[1], (4,))
+
+    def test_schema_lists_every_migration(self):
+        """A fresh database from schema.sql must not re-run migrations it already contains."""
+        schema = (MIGRATIONS_DIR.parent / "schema.sql").read_text(encoding="utf-8")
+        listed = set(re.findall(r"\('(\d{3}_\w+)'\)", schema))
+        self.assertEqual(listed, {p.stem for p in MIGRATIONS_DIR.glob("*.sql")})
+
+
+if __name__ == "__main__":
+    unittest.main()
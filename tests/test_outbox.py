@@ -0,0 +1,134 @@
+import asyncio
+import os
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from postgrest.exceptions import APIError
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import SentimentRecord
+from database.batching import InsertReport, insert_chunked
+from database.outbox import Outbox
+
+
+def _record(symbol: str) -> SentimentRecord:
+    return SentimentRecord(
+        symbol=symbol,
+        sentiment_score=0.5,
+        sentiment_confidence=0.8,
+        sentiment_label="BUY",
+        key_rationale="test",
+        source_text_id="t1",
+        source_id="batch.txt",
+        source_name="Reddit",
+    )
+
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_outbox")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.outbox = Outbox(self.tmp_dir / "outbox.sqlite3")
+
+    def tearDown(self):
+        self.outbox.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_batches_survive_restart_with_fixed_created_at(self):
+        self.outbox.enqueue([_record("AAPL")], "Reddit")
+        self.outbox.close()
+
+        self.outbox = Outbox(self.tmp_dir / "outbox.sqlite3")
+        (batch,) = self.outbox.pending()
+        self.assertEqual(batch.platform_name, "Reddit")
+        self.assertEqual(batch.records[0].symbol, "AAPL")
+        self.assertIsNotNone(batch.records[0].created_at)
+
+        # Replays must carry the same timestamp so they hit the same upsert key.
+        self.assertEqual(self.outbox.pending()[0].records[0].created_at, batch.records[0].created_at)
+
+    def test_flush_delivers_in_order_and_acks(self):
+        self.outbox.enqueue([_record("AAPL")], "Reddit")
+        self.outbox.enqueue([_record("TSLA")], "Reddit")
+        insert_fn = MagicMock(return_value=InsertReport(inserted=1))
+
+        self.assertEqual(self.outbox.flush(insert_fn), 2)
+        symbols = [c.args[0][0].symbol for c in insert_fn.call_args_list]
+        self.assertEqual(symbols, ["AAPL", "TSLA"])
+        self.assertEqual(len(self.outbox), 0)
+
+    def test_failure_keeps_batch_and_holds_back_later_ones(self):
+        self.outbox.enqueue([_record("AAPL")], "Reddit")
+        self.outbox.enqueue([_record("TSLA")], "Reddit")
+        insert_fn = MagicMock(side_effect=ConnectionError("network down"))
+
+        self.assertEqual(self.outbox.flush(insert_fn), 0)
+        insert_fn.assert_called_once()
+        self.assertEqual(len(self.outbox), 2)
+
+        # The failed head is in backoff, so nothing behind it may jump ahead.
+        insert_fn.reset_mock()
+        self.assertEqual(self.outbox.flush(insert_fn), 0)
+        insert_fn.assert_not_called()
+
+        insert_fn.side_effect = None
+        insert_fn.return_value = InsertReport(inserted=1)
+        self.assertEqual(self.outbox.flush(insert_fn, ignore_backoff=True), 2)
+        self.assertEqual(len(self.outbox), 0)
+
+    def test_transient_row_failures_are_retried_but_rejections_are_not(self):
+        self.outbox.enqueue([_record("AAPL")], "Reddit")
+        self.outbox.flush(MagicMock(return_value=InsertReport(failed_rows=[{}])))
+        self.assertEqual(len(self.outbox), 1)
+
+        self.outbox.flush(MagicMock(return_value=InsertReport(rejected_rows=[{}])), ignore_backoff=True)
+        self.assertEqual(len(self.outbox), 0)
+
+    def test_batch_level_error_keeps_batch(self):
+        """A schema/auth error on the upsert must not ack (and lose) the batch."""
+        self.outbox.enqueue([_record(f"T{i}") for i in range(64)], "Reddit")
+
+        def insert_fn(records, platform_name):
+            def upsert(chunk):
+                raise APIError({"code": "PGRST204", "message": "column not found"})
+            return insert_chunked(upsert, [{"asset_id": i} for i in range(len(records))], retries=0)
+
+        self.assertEqual(self.outbox.flush(insert_fn), 0)
+        self.assertEqual(len(self.outbox), 1)
+        self.assertEqual(self.outbox.pending()[0].attempts, 1)
+
+    def test_unresolvable_batch_is_parked_without_blocking(self):
+        """A batch with no insertable rows is parked after one attempt, not retried."""
+        self.outbox.enqueue([_record("???")], "Reddit")
+        self.outbox.enqueue([_record("TSLA")], "Reddit")
+        insert_fn = MagicMock(side_effect=[InsertReport(unresolved=1), InsertReport(inserted=1)])
+
+        self.assertEqual(self.outbox.flush(insert_fn), 1)
+        self.assertEqual(insert_fn.call_count, 2)
+        self.assertEqual(len(self.outbox), 0)
+        (status,) = self.outbox._conn.execute("SELECT status FROM batches").fetchone()
+        self.assertEqual(status, "dead")
+
+        # An empty report for any other reason (e.g. no platform) is still retried.
+        self.outbox.enqueue([_record("AAPL")], "Reddit")
+        self.outbox.flush(MagicMock(return_value=InsertReport()), ignore_backoff=True)
+        self.assertEqual(len(self.outbox), 1)
+
+    def test_flush_async(self):
+        self.outbox.enqueue([_record("AAPL")], "Reddit")
+        insert_fn = AsyncMock(return_value=InsertReport(inserted=1))
+
+        delivered = asyncio.run(self.outbox.flush_async(insert_fn))
+
+        self.assertEqual(delivered, 1)
+        insert_fn.assert_awaited_once()
+        self.assertEqual(len(self.outbox), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
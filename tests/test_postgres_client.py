@@ -0,0 +1,130 @@
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from psycopg.adapt import PyFormat, Transformer
+from psycopg.postgres import types as pg_types
+from psycopg.pq import Format
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import SentimentRecord
+from database.factory import create_db_client
+from database.id_cache import IdCache
+from database.processed_cache import ProcessedPostCache
+from database.postgres_client import (
+    MENTION_COPY_TYPES,
+    SQL_CLEAR_MENTIONS,
+    SQL_CREATE_STAGE,
+    SQL_MERGE_MENTIONS,
+    PostgresClient,
+    to_copy_row,
+)
+
+
+def _record(symbol: str, source_text_id: str = "t1") -> SentimentRecord:
+    return SentimentRecord(
+        symbol=symbol,
+        source_text_id=source_text_id,
+        sentiment_score=0.5,
+        sentiment_confidence=0.8,
+        sentiment_label="BUY",
+        key_rationale="test",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+class TestPostgresClient(unittest.TestCase):
+
+    def _client(self) -> PostgresClient:
+        """A client whose pool hands out one mocked connection."""
+        client = PostgresClient.__new__(PostgresClient)
+        client.pool = MagicMock()
+        client.asset_ids = IdCache()
+        client.platform_ids = IdCache()
+        client.processed_posts = ProcessedPostCache()
+        self.conn = client.pool.connection.return_value.__enter__.return_value
+        self.copy = (
+            self.conn.cursor.return_value.__enter__.return_value
+            .copy.return_value.__enter__.return_value
+        )
+        return client
+
+    def test_copy_row_dumps_as_binary(self):
+        """COPY tuples must be dumpable with the declared binary column types."""
+        row = {
+            "asset_id": 1,
+            "platform_id": 2,
+            "sentiment_score": -0.25,
+            "confidence_level": 0.9,
+            "source_id": "batch.json",
+            "source_name": "reddit",
+            "source_text_id": "abc",
+            "source_text_snippet": None,
+            "key_rationale": "why",
+            "created_at": "2024-01-01T12:00:00+00:00",
+        }
+        copy_row = to_copy_row(row)
+        self.assertEqual(copy_row[2], Decimal("-0.25"))
+        self.assertEqual(copy_row[-1], datetime(2024, 1, 1, 12, tzinfo=timezone.utc))
+
+        tx = Transformer()
+        tx.set_dumper_types([pg_types[t].oid for t in MENTION_COPY_TYPES], Format.BINARY)
+        dumped = tx.dump_sequence(copy_row, [PyFormat.BINARY] * len(copy_row))
+        self.assertEqual(len(dumped), len(MENTION_COPY_TYPES))
+
+    @patch("database.postgres_client.POSTGRES_COPY_CHUNK_ROWS", 2)
+    def test_insert_analysis_copies_in_chunks(self):
+        client = self._client()
+        client.resolve_platform_id = MagicMock(return_value=3)
+        client._resolve_asset_ids = MagicMock(return_value={"AAPL": 1, "TSLA": 2})
+
+        records = [_record("AAPL"), _record("TSLA"), _record("AAPL", "t2"), _record("MSFT")]
+        report = client.insert_analysis(records, "Reddit")
+
+        # MSFT has no asset_id and is skipped; 3 rows → 2 staged COPY + merge rounds.
+        self.assertEqual(report.inserted, 3)
+        self.assertEqual(self.copy.write_row.call_count, 3)
+        self.assertEqual(self.copy.set_types.call_count, 2)
+        cursor = self.conn.cursor.return_value.__enter__.return_value
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        # Chunks run on parallel threads, so only the counts are deterministic.
+        self.assertEqual(sorted(statements), sorted([SQL_CREATE_STAGE, SQL_MERGE_MENTIONS] * 2))
+        self.assertEqual({c.args[0][0] for c in self.copy.write_row.call_args_list}, {1, 2})
+
+    def test_missing_platform_skips_batch(self):
+        client = self._client()
+        client.resolve_platform_id = MagicMock(return_value=None)
+
+        report = client.insert_analysis([_record("AAPL")], "Reddit")
+        self.assertEqual(report.inserted, 0)
+        self.copy.write_row.assert_not_called()
+
+    def test_mark_posts_processed(self):
+        client = self._client()
+        client.mark_posts_processed(["p1", "p2"], "reddit")
+        params = self.conn.execute.call_args.args[1]
+        self.assertEqual(params, {"post_ids": ["p1", "p2"], "source_name": "reddit"})
+
+        # Freshly marked IDs are answered locally without another query.
+        self.conn.execute.reset_mock()
+        self.assertEqual(client.get_processed_post_ids("reddit", ["p1", "p2"]), {"p1", "p2"})
+        self.conn.execute.assert_not_called()
+
+    def test_clear_mentions_also_clears_rollups(self):
+        """The reset goes through clear_mentions(), which truncates the rollups too."""
+        client = self._client()
+        client.clear_mentions()
+        self.conn.execute.assert_called_once_with(SQL_CLEAR_MENTIONS)
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            create_db_client("mysql")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.correlation import daily_log_returns, lagged_correlations
+from analytics.prices import PriceStore, StubFetcher
+from config import PRICE_REFETCH_DAYS
+
+
+class TestPriceStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = PriceStore(self.dir)
+        self.fetcher = StubFetcher()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_update_fetches_only_missing_ranges(self):
+        self.store.update("AAPL", self.fetcher, date(2024, 1, 1), date(2024, 1, 31))
+        self.store.update("AAPL", self.fetcher, date(2024, 1, 10), date(2024, 1, 20))
+        self.store.update("AAPL", self.fetcher, date(2023, 12, 20), date(2024, 2, 10))
+
+        self.assertEqual(self.fetcher.calls, [
+            ("AAPL", date(2024, 1, 1), date(2024, 1, 31)),
+            ("AAPL", date(2023, 12, 20), date(2023, 12, 31)),
+            ("AAPL", date(2024, 2, 1), date(2024, 2, 10)),
+        ])
+        bars = self.store.load("AAPL")
+        self.assertTrue((np.diff(bars["date"].astype(np.int64)) > 0).all())
+        self.assertEqual(bars["date"][0], np.datetime64("2023-12-20"))
+
+        # Bars fetched piecewise match a single fetch of the whole range.
+        whole = StubFetcher().fetch("AAPL", date(2023, 12, 20), date(2024, 2, 10))
+        self.assertTrue(np.allclose(bars["close"], whole["close"]))
+
+    def test_gaps_between_fetched_ranges_are_filled(self):
+        self.store.update("AAPL", self.fetcher, date(2024, 1, 1), date(2024, 1, 31))
+        self.store.update("AAPL", self.fetcher, date(2024, 3, 1), date(2024, 3, 31))
+        self.assertEqual(
+            self.store.missing_ranges("AAPL", date(2024, 1, 15), date(2024, 4, 5)),
+            [(date(2024, 2, 1), date(2024, 2, 29)), (date(2024, 4, 1), date(2024, 4, 5))],
+        )
+
+        self.store.update("AAPL", self.fetcher, date(2024, 1, 1), date(2024, 3, 31))
+        self.assertEqual(self.fetcher.calls[-1], ("AAPL", date(2024, 2, 1), date(2024, 2, 29)))
+        self.assertEqual(self.store.coverage["AAPL"], [(date(2024, 1, 1), date(2024, 3, 31))])
+
+    def test_trailing_days_are_refetched(self):
+        today = date.today()
+        start = today - timedelta(days=30)
+        self.store.update("AAPL", self.fetcher, start, today)
+        self.store.update("AAPL", self.fetcher, start, today)
+
+        settled = today - timedelta(days=PRICE_REFETCH_DAYS)
+        self.assertEqual(self.fetcher.calls[-1], ("AAPL", settled + timedelta(days=1), today))
+
+    def test_legacy_coverage_span_is_read(self):
+        with open(os.path.join(self.dir, "coverage.json"), "w", encoding="utf-8") as f:
+            json.dump({"MSFT": ["2024-01-01", "2024-01-31"]}, f)
+        reloaded = PriceStore(self.dir)
+        self.assertEqual(reloaded.missing_ranges("MSFT", date(2024, 1, 5), date(2024, 2, 2)),
+                         [(date(2024, 2, 1), date(2024, 2, 2))])
+
+    def test_coverage_survives_reload(self):
+        self.store.update("MSFT", self.fetcher, date(2024, 1, 1), date(2024, 1, 31))
+        reloaded = PriceStore(self.dir)
+        self.assertEqual(reloaded.missing_ranges("MSFT", date(2024, 1, 5), date(2024, 1, 25)), [])
+
+    def test_close_matrix_has_nan_on_non_trading_days(self):
+        self.store.update("AAPL", self.fetcher, date(2024, 1, 1), date(2024, 1, 14))
+        days, closes = self.store.close_matrix(["AAPL", "NOPE"], date(2024, 1, 1), date(2024, 1, 14))
+
+        self.assertEqual(closes.shape, (2, 14))
+        self.assertTrue(np.isnan(closes[1]).all())
+        self.assertEqual(np.isfinite(closes[0]).tolist(), np.is_busday(days).tolist())
+
+
+class TestCorrelation(unittest.TestCase):
+    def test_daily_log_returns_span_gaps(self):
+        closes = np.array([[100.0, np.nan, 110.0, 121.0]])
+        returns = daily_log_returns(closes)
+        self.assertTrue(math.isnan(returns[0, 0]) and math.isnan(returns[0, 1]))
+        self.assertAlmostEqual(returns[0, 2], math.log(1.1))
+        self.assertAlmostEqual(returns[0, 3], math.log(1.1))
+
+    def test_lagged_correlation_finds_the_lag(self):
+        rng = np.random.default_rng(0)
+        sentiment = rng.normal(size=(2, 200))
+        returns = np.full((2, 200), np.nan)
+        returns[0, 2:] = 0.01 * sentiment[0, :-2]  # sentiment leads returns by 2 days
+        returns[1] = rng.normal(size=200)
+        sentiment[0, ::7] = np.nan
+
+        corr, n_obs = lagged_correlations(sentiment, returns, lags=(0, 2), min_obs=20)
+
+        self.assertAlmostEqual(corr[0, 1], 1.0)
+        self.assertLess(abs(corr[0, 0]), 0.3)
+        self.assertLess(abs(corr[1, 1]), 0.3)
+        self.assertEqual(n_obs[0, 1], 198 - np.isnan(sentiment[0, :198]).sum())
+
+    def test_too_few_observations_is_nan(self):
+        corr, n_obs = lagged_correlations(np.ones((1, 5)), np.arange(5.0)[None, :], lags=(0,), min_obs=3)
+        self.assertTrue(math.isnan(corr[0, 0]))  # constant sentiment
+        self.assertEqual(n_obs[0, 0], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
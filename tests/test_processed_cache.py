@@ -0,0 +1,52 @@
+import os
+import shutil
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.processed_cache import ProcessedPostCache
+
+
+class TestProcessedPostCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_processed_cache")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_split_is_per_source(self):
+        cache = ProcessedPostCache()
+        cache.add("reddit", ["p1"])
+
+        known, unknown = cache.split("reddit", ["p1", "p2", "p2"])
+        self.assertEqual(known, {"p1"})
+        self.assertEqual(unknown, ["p2"])
+        self.assertEqual(cache.split("twitter", ["p1"]), (set(), ["p1"]))
+
+    def test_entries_expire_after_ttl(self):
+        cache = ProcessedPostCache(ttl_days=1)
+        cache.add("reddit", ["p1"])
+
+        with patch("database.processed_cache.time.time", return_value=time.time() + 2 * 86400):
+            self.assertEqual(cache.split("reddit", ["p1"]), (set(), ["p1"]))
+            cache.prune()
+        self.assertEqual(len(cache), 0)
+
+    def test_persistence(self):
+        path = self.tmp_dir / "processed.json"
+        cache = ProcessedPostCache(path=path)
+        cache.add("reddit", ["p1", "p2"])
+        cache.save()
+
+        reloaded = ProcessedPostCache(path=path)
+        self.assertEqual(reloaded.split("reddit", ["p1", "p2"])[0], {"p1", "p2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import shutil
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.retention import apply_retention, archive_storage
+
+WATERMARK = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _mention(mention_id: int) -> dict:
+    return {
+        "mention_id": mention_id,
+        "asset_id": 1,
+        "platform_id": 2,
+        "sentiment_score": 0.5,
+        "source_text_snippet": "to the moon",
+        "key_rationale": "hype",
+        "created_at": f"2023-12-01T00:00:{mention_id:02d}+00:00",
+    }
+
+
+class TestRetention(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_retention")
+        self.db = MagicMock()
+        self.db.compact_mention_rollups.return_value = WATERMARK
+        self.db.fetch_mentions_before.side_effect = [
+            [_mention(1), _mention(2)],
+            [_mention(3)],
+            [],
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_archives_then_deletes_in_batches(self):
+        removed = apply_retention(self.db, older_than_days=30, batch_size=2, archive_dir=str(self.tmp_dir))
+
+        self.assertEqual(removed, 3)
+        self.db.fetch_mentions_before.assert_called_with(WATERMARK, 2)
+        deleted = [c.args[0] for c in self.db.delete_mentions.call_args_list]
+        self.assertEqual(deleted, [[1, 2], [3]])
+
+        storage = archive_storage()
+        files = sorted(storage.glob(self.tmp_dir))
+        self.assertEqual(len(files), 2)
+        archived = [r for f in files for r in storage.read_records(f)]
+        self.assertEqual([r["mention_id"] for r in archived], [1, 2, 3])
+        self.assertEqual(archived[0]["source_text_snippet"], "to the moon")
+
+    def test_failed_archive_keeps_rows(self):
+        storage_dir = self.tmp_dir / "not_a_dir"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        storage_dir.write_text("")  # a file where the archive directory should be
+
+        with self.assertRaises(OSError):
+            apply_retention(self.db, older_than_days=30, archive_dir=str(storage_dir))
+        self.db.delete_mentions.assert_not_called()
+
+    def test_rejects_window_shorter_than_hourly_view(self):
+        with self.assertRaises(ValueError):
+            apply_retention(self.db, older_than_days=1, archive_dir=None)
+        self.db.compact_mention_rollups.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
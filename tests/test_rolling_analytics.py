@@ -0,0 +1,61 @@
+import math
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.rolling import SentimentFrame, compute_metrics, trailing_sum, weighted_ema
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+DAY = timedelta(days=1)
+
+
+class TestRollingAnalytics(unittest.TestCase):
+    def test_from_rows_pivots_onto_grid(self):
+        rows = [
+            (7, START + 2 * DAY, 4, 2.0, 4.0),
+            (3, START, 1, 0.5, 1.0),
+            (7, START, 2, -1.0, 2.0),
+        ]
+        frame = SentimentFrame.from_rows(rows, START, START + 3 * DAY, DAY)
+
+        self.assertEqual(frame.asset_ids.tolist(), [3, 7])
+        self.assertEqual(frame.counts.shape, (2, 4))
+        self.assertEqual(frame.counts[1].tolist(), [2, 0, 4, 0])
+        self.assertEqual(frame.weighted_sum[0, 0], 0.5)
+
+    def test_trailing_sum(self):
+        x = np.array([[1.0, 2.0, 3.0, 4.0]])
+        self.assertEqual(trailing_sum(x, 2).tolist(), [[1, 3, 5, 7]])
+        self.assertEqual(trailing_sum(x, 2, exclude_current=True).tolist(), [[0, 1, 3, 5]])
+
+    def test_weighted_ema_carries_value_over_empty_buckets(self):
+        ws = np.array([[0.5, 0.0, 0.0]])
+        cs = np.array([[1.0, 0.0, 0.0]])
+        ema = weighted_ema(ws, cs, span=3)
+        self.assertTrue(np.allclose(ema, 0.5))
+
+    def test_volume_spike_has_high_zscore(self):
+        counts = np.array([[10, 12, 8, 10, 11, 9, 10, 60]], dtype=float)
+        frame = SentimentFrame(
+            asset_ids=np.array([1]),
+            buckets=np.arange(counts.shape[1]).astype("datetime64[D]"),
+            counts=counts,
+            weighted_sum=counts * 0.2,
+            weight_sum=counts.copy(),
+        )
+        metrics = compute_metrics(frame, window=7, fast_span=2, slow_span=5)
+
+        self.assertTrue(math.isnan(metrics["volume_zscore"][0, 0]))
+        self.assertGreater(metrics["volume_zscore"][0, -1], 10)
+        self.assertAlmostEqual(metrics["rolling_sentiment"][0, -1], 0.2)
+        self.assertAlmostEqual(metrics["momentum"][0, -1], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
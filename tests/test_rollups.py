@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.models import SentimentRecord
+from database.async_supabase_client import AsyncSupabaseClient
+from database.rollups import RPC_REFRESH_ROLLUPS, touched_buckets
+
+
+def _row(asset_id: int, created_at: str, platform_id: int = 1) -> dict:
+    return {"asset_id": asset_id, "platform_id": platform_id, "created_at": created_at}
+
+
+class TestRollups(unittest.TestCase):
+
+    def test_touched_buckets_are_distinct_utc_hours(self):
+        rows = [
+            _row(1, "2024-01-01T10:05:00+00:00"),
+            _row(1, "2024-01-01T10:55:00+00:00"),         # same hour
+            _row(1, "2024-01-01T12:30:00+02:00"),         # 10:30 UTC, same hour
+            _row(2, "2024-01-01T10:05:00+00:00"),         # other asset
+            _row(1, "2023-12-31T23:59:00+00:00"),         # late-arriving, older day
+        ]
+        params = touched_buckets(rows)
+
+        self.assertEqual(params["p_asset_ids"], [1, 1, 2])
+        self.assertEqual(params["p_platform_ids"], [1, 1, 1])
+        self.assertEqual(params["p_buckets"], [
+            "2023-12-31T23:00:00+00:00",
+            "2024-01-01T10:00:00+00:00",
+            "2024-01-01T10:00:00+00:00",
+        ])
+
+
+@patch("database.async_supabase_client.SUPABASE_URL", "https://test.supabase.co")
+class TestRollupRefresh(unittest.IsolatedAsyncioTestCase):
+
+    async def test_insert_refreshes_touched_buckets(self):
+        client = AsyncSupabaseClient(client=MagicMock(), http_client=AsyncMock())
+        client.client.table.return_value.upsert.return_value.execute = AsyncMock()
+        client.client.rpc.return_value.execute = AsyncMock()
+        client.platform_ids.put("Reddit", 7)
+        client.asset_ids.put("AAPL", 1)
+
+        record = SentimentRecord(
+            symbol="AAPL",
+            sentiment_score=0.5,
+            sentiment_confidence=0.8,
+            sentiment_label="BUY",
+            key_rationale="test",
+        )
+        await client.insert_analysis([record], "Reddit")
+
+        name, params = client.client.rpc.call_args.args
+        self.assertEqual(name, RPC_REFRESH_ROLLUPS)
+        self.assertEqual((params["p_asset_ids"], params["p_platform_ids"]), ([1], [7]))
+        client.client.rpc.return_value.execute.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
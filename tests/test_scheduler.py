@@ -0,0 +1,40 @@
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scheduler import IntervalSchedule
+
+
+class TestIntervalSchedule(unittest.TestCase):
+    def setUp(self):
+        self.schedule = IntervalSchedule(["stocks", "wsb"], {"wsb": 60}, default=300, now=0)
+
+    def test_everything_is_due_at_start(self):
+        self.assertEqual(self.schedule.due(0), ["stocks", "wsb"])
+
+    def test_per_job_intervals(self):
+        self.schedule.mark_run(["stocks", "wsb"], now=5)
+
+        self.assertEqual(self.schedule.due(59), [])
+        self.assertEqual(self.schedule.seconds_until_next(5), 55)
+        self.assertEqual(self.schedule.due(60), ["wsb"])
+        self.assertEqual(self.schedule.due(300), ["stocks", "wsb"])
+
+    def test_cadence_is_anchored_to_due_time(self):
+        self.schedule.mark_run(["wsb"], now=40)  # Slow run finishing at 40s
+        self.assertEqual(self.schedule.next_run["wsb"], 60)
+
+    def test_missed_runs_are_skipped(self):
+        self.schedule.mark_run(["wsb"], now=250)  # Overran three intervals
+        self.assertEqual(self.schedule.next_run["wsb"], 300)
+
+    def test_rejects_non_positive_intervals(self):
+        with self.assertRaises(ValueError):
+            IntervalSchedule(["stocks"], {"stocks": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics.spikes import FileAlertSink, SpikeDetector
+from data.models import SentimentRecord
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HOUR = timedelta(hours=1)
+
+
+def _record(symbol, at, score=0.1):
+    return SentimentRecord(
+        symbol=symbol,
+        sentiment_score=score,
+        sentiment_confidence=0.8,
+        sentiment_label="NEUTRAL",
+        key_rationale="",
+        created_at=at,
+    )
+
+
+def _history(symbol, hours, per_hour, score=0.1):
+    return [
+        _record(symbol, START + h * HOUR, score)
+        for h in range(hours)
+        for _ in range(per_hour)
+    ]
+
+
+class TestSpikeDetector(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.alerts = Path(self.dir) / "alerts.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _detector(self, **kwargs):
+        kwargs.setdefault("sink", FileAlertSink(str(self.alerts)))
+        return SpikeDetector(
+            bucket_minutes=60, half_life=12, zscore=3.0, min_mentions=5, warmup=6, **kwargs
+        )
+
+    def test_volume_spike_alerts_once(self):
+        detector = self._detector()
+        self.assertEqual(detector.observe_many(_history("GME", 24, 3)), [])
+
+        spike = [_record("GME", START + 24 * HOUR) for _ in range(40)]
+        alerts = detector.observe_many(spike)
+
+        self.assertEqual([a.kind for a in alerts], ["volume"])
+        self.assertEqual(alerts[0].ticker, "GME")
+        self.assertEqual(alerts[0].bucket_start, START + 24 * HOUR)
+        lines = self.alerts.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(json.loads(lines[0])["kind"], "volume")
+
+    def test_sentiment_flip_alerts(self):
+        detector = self._detector()
+        detector.observe_many(_history("TSLA", 24, 6, score=0.4))
+
+        alerts = detector.observe_many(
+            [_record("TSLA", START + 24 * HOUR, score=-0.8) for _ in range(6)]
+        )
+
+        self.assertEqual([a.kind for a in alerts], ["sentiment"])
+        self.assertLess(alerts[0].zscore, 0)
+
+    def test_no_alert_during_warmup(self):
+        detector = self._detector()
+        records = _history("AMC", 3, 2) + [_record("AMC", START + 3 * HOUR) for _ in range(50)]
+        self.assertEqual(detector.observe_many(records), [])
+
+    def test_state_survives_reload(self):
+        path = Path(self.dir) / "state.json"
+        detector = self._detector(path=path)
+        detector.observe_many(_history("NVDA", 24, 3))
+        detector.save()
+
+        reloaded = self._detector(path=path)
+        self.assertEqual(len(reloaded), 1)
+        alerts = reloaded.observe_many([_record("NVDA", START + 24 * HOUR) for _ in range(40)])
+        self.assertEqual([a.kind for a in alerts], ["volume"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.data_handler import DataHandler
+from data.storage import Storage
+
+POSTS = [
+    {"id": "a", "title": "AAPL 🚀", "score": 10, "comments": [{"id": "c1", "body": "nice", "score": 3}]},
+    {"id": "b", "title": "TSLA", "selftext": None, "score": 5, "comments": []},
+]
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = Path("tests/temp_storage")
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_round_trip_all_formats(self):
+        """Every format/compression pair must return the records unchanged."""
+        for fmt in ("json", "ndjson", "msgpack"):
+            for compression in (None, "zstd"):
+                with self.subTest(fmt=fmt, compression=compression):
+                    storage = Storage(fmt, compression)
+                    path = self.tmp_dir / f"sub_20240101_0000{storage.suffix}"
+                    storage.write(path, iter(POSTS), meta={"subreddit": "sub", "count": 2})
+
+                    self.assertEqual(list(storage.read_records(path)), POSTS)
+                    self.assertEqual(list(storage.loads_records(path.read_bytes())), POSTS)
+                    self.assertEqual(json.loads(storage.read_text(path)), POSTS)
+                    self.assertEqual(storage.glob(self.tmp_dir), [path])
+                    self.assertEqual(storage.stem(path), "sub_20240101_0000")
+                    path.unlink()
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            Storage("xml")
+
+    def test_pipeline_with_compressed_ndjson(self):
+        """Switching format in config is all it takes for save → convert."""
+        raw_dir = self.tmp_dir / "raw"
+        input_dir = self.tmp_dir / "input"
+        with patch("data.data_handler.DATA_OUTPUT_DIR", str(raw_dir)), \
+             patch("data.data_handler.LLM_INPUT_DIR", str(input_dir)), \
+             patch("data.data_handler.MANIFEST_FILE", str(self.tmp_dir / "manifest.json")), \
+             patch("data.data_handler.MERGE_LLM_OUTPUT", False), \
+             patch("data.data_handler.KEEP_RAW_JSON", False):
+            dh = DataHandler()
+            dh.storage = Storage("ndjson", "zstd")
+            dh.save_subreddit_data("sub", POSTS)
+            dh.process_files_to_json()
+
+            outputs = dh.storage.glob(input_dir)
+            self.assertEqual(len(outputs), 1)
+            self.assertTrue(outputs[0].name.endswith(".ndjson.zst"))
+            records = list(dh.storage.read_records(outputs[0]))
+            self.assertEqual([r["id"] for r in records], ["a", "b"])
+            self.assertEqual(records[0]["title"], "AAPL")
+            self.assertEqual(list(raw_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TICKER_UNIVERSE_FILE
+from data.models import SentimentRecord
+from data.ticker_universe import TickerUniverse, normalise_name
+
+UNIVERSE = """\
+# comment
+AAPL|Stock|Apple Inc.|apple computer
+XAU|Commodity|Gold|spot gold
+WTI|Commodity|Crude Oil WTI|crude;oil
+BRK.B|Stock|Berkshire Hathaway Inc. Class B|berkshire
+"""
+
+
+def _record(symbol):
+    return SentimentRecord(
+        symbol=symbol,
+        sentiment_score=0.5,
+        sentiment_confidence=0.5,
+        sentiment_label="BUY",
+        key_rationale="",
+    )
+
+
+class TestTickerUniverse(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            f.write(UNIVERSE)
+            cls.path = f.name
+        cls.universe = TickerUniverse.load(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.unlink(cls.path)
+
+    def test_normalise(self):
+        cases = {
+            "AAPL": "AAPL",
+            "$aapl": "AAPL",
+            " Apple ": "AAPL",
+            "APPLE INC": "AAPL",
+            "GOLD": "XAU",
+            "Crude": "WTI",
+            "BRK-B": "BRK.B",
+            "brk/b": "BRK.B",
+            "Tech": None,
+            "AAPLX": None,
+        }
+        for symbol, expected in cases.items():
+            with self.subTest(symbol=symbol):
+                self.assertEqual(self.universe.normalise(symbol), expected)
+
+    def test_filter_rewrites_and_drops(self):
+        records = [_record("$AAPL"), _record("Gold"), _record("Private Equity")]
+        kept = self.universe.filter(records, strict=True)
+        self.assertEqual([r.symbol for r in kept], ["AAPL", "XAU"])
+
+        lenient = self.universe.filter([_record("$newco")], strict=False)
+        self.assertEqual([r.symbol for r in lenient], ["NEWCO"])
+
+    def test_lenient_filter_keeps_only_ticker_shaped_symbols(self):
+        symbols = ["NEWCO", "ABC.B", "$xyz", "THE MARKET", "FED", "Acme Widgets", "newco", "TOOLONG"]
+        kept = self.universe.filter([_record(s) for s in symbols], strict=False)
+        self.assertEqual([r.symbol for r in kept], ["NEWCO", "ABC.B", "XYZ"])
+
+    def test_normalise_name(self):
+        self.assertEqual(normalise_name("The Coca-Cola Company"), normalise_name("coca cola"))
+        self.assertEqual(normalise_name("Johnson & Johnson"), normalise_name("johnson and johnson"))
+        self.assertEqual(normalise_name("McDonald's Corp."), normalise_name("mcdonalds"))
+
+    def test_shipped_universe_loads(self):
+        universe = TickerUniverse.load(TICKER_UNIVERSE_FILE)
+        self.assertGreater(len(universe), 100)
+        self.assertEqual(universe.normalise("Gold"), "XAU")
+        self.assertEqual(universe.normalise("Nvidia"), "NVDA")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -54,17 +54,13 @@ class TestBatchInsert(unittest.TestCase):
             # 1. Check _get_or_create calls (only 1 for platform)
             assert client._get_or_create.call_count == 1
             
-            # 2. Check upsert for assets
-            mock_table.upsert.assert_called_once()
+            # 2. Check upsert for assets, then for mentions (keyed on source identity)
+            assert mock_table.upsert.call_count == 2
+            mock_table.insert.assert_not_called()
             
-            # 3. Check insert call for mentions
-            # Note: insert() is called on the "asset_mentions" table
-            # The test code should verify which table was used.
-            # However, for simplicity let's just check the insert was called.
-            mock_table.insert.assert_called_once()
-            
-            args, _ = mock_table.insert.call_args
+            args, kwargs = mock_table.upsert.call_args
             inserted_data = args[0]
+            assert kwargs["on_conflict"] == "asset_id,platform_id,source_id,source_text_id,created_at"
             
             assert isinstance(inserted_data, list)
             assert len(inserted_data) == 2
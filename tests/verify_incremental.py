@@ -15,6 +15,7 @@ class TestIncrementalProcessing(unittest.TestCase):
         # Setup temporary directories
         self.output_dir = Path("tests/temp_raw_json")
         self.input_dir = Path("tests/temp_llm_input")
+        self.manifest_file = Path("tests/temp_manifest.json")
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.input_dir.mkdir(parents=True, exist_ok=True)
 
@@ -25,6 +26,8 @@ class TestIncrementalProcessing(unittest.TestCase):
             shutil.rmtree(self.output_dir)
         if self.input_dir.exists():
             shutil.rmtree(self.input_dir)
+        if self.manifest_file.exists():
+            self.manifest_file.unlink()
 
     def test_incremental_skip(self):
         print("Testing incremental skipping...")
@@ -45,6 +48,7 @@ class TestIncrementalProcessing(unittest.TestCase):
         
         with patch("data.data_handler.DATA_OUTPUT_DIR", str(self.output_dir)), \
              patch("data.data_handler.LLM_INPUT_DIR", str(self.input_dir)), \
+             patch("data.data_handler.MANIFEST_FILE", str(self.manifest_file)), \
              patch("data.data_handler.MERGE_LLM_OUTPUT", False), \
              patch("data.data_handler.KEEP_RAW_JSON", True): # Keep raw to simulate re-run
             
@@ -53,8 +57,9 @@ class TestIncrementalProcessing(unittest.TestCase):
             # No, patches are active during init.
             # But wait, DataHandler init uses Path(DATA_OUTPUT_DIR).
             
-            # RUN 1: Should process
-            dh.process_files_to_json()
+            # RUN 1: Should process (and be confirmed as analysed)
+            written = dh.process_files_to_json()
+            dh.mark_analysed(fp.name for fp in written)
             
             # Verify output file exists
             target_file = self.input_dir / filename
@@ -1,6 +1,7 @@
 import asyncio
 import os
 import sys
+import threading
 import unittest
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -8,7 +9,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 # Add project root to path
 sys.path.append(os.getcwd())
 
-from main import _process_single_file, _run_scraping_phase
+from main import PipelineDaemon, _process_single_file, _run_scraping_phase
 
 
 class TestMainAsync(unittest.IsolatedAsyncioTestCase):
@@ -20,6 +21,7 @@ class TestMainAsync(unittest.IsolatedAsyncioTestCase):
 
         mock_file_path = MagicMock(spec=Path)
         mock_file_path.name = "test.json"
+        mock_file_path.stat.return_value.st_mtime = 1_700_000_000
 
         from data.models import SentimentRecord
         mock_client = AsyncMock()
@@ -43,6 +45,33 @@ class TestMainAsync(unittest.IsolatedAsyncioTestCase):
         mock_client.get_response.assert_awaited_once()
         print("_process_single_file async verification passed.")
 
+    @patch("main.asyncio.to_thread", new_callable=AsyncMock)
+    async def test_process_single_file_keys_records_by_post(self, mock_to_thread: AsyncMock) -> None:
+        """Records take source_id and created_at from their driving text's post, not the file."""
+        from datetime import datetime, timezone
+        from data.models import SentimentRecord
+
+        mock_file_path = MagicMock(spec=Path)
+        mock_file_path.name = "stocks_20240101_1200.json"
+        mock_file_path.stat.return_value.st_mtime = 1_700_000_000
+        mock_to_thread.return_value = (
+            '[{"id": "p1", "created_utc": 1600000000, "title": "t", '
+            '"comments": [{"id": "c1", "body": "b"}]}]'
+        )
+        records = [
+            SentimentRecord("GME", 0.5, 0.8, "BUY", "r", source_text_id="c1"),
+            SentimentRecord("AMC", 0.5, 0.8, "BUY", "r", source_text_id="typo"),
+        ]
+        mock_client = AsyncMock()
+        mock_client.get_response.return_value = records
+
+        results = await _process_single_file(mock_file_path, mock_client)
+
+        self.assertEqual(results[0].source_id, "p1")
+        self.assertEqual(results[0].created_at, datetime.fromtimestamp(1_600_000_000, timezone.utc))
+        self.assertEqual(results[1].source_id, "stocks_20240101_1200.json")
+        self.assertEqual(results[1].created_at, datetime.fromtimestamp(1_700_000_000, timezone.utc))
+
     @patch("main.asyncio.to_thread", new_callable=AsyncMock)
     @patch("main.RedditClient")
     @patch("main.DataHandler")
@@ -69,6 +98,95 @@ class TestMainAsync(unittest.IsolatedAsyncioTestCase):
         mock_to_thread.assert_called_with(mock_data_handler.process_files_to_json)
         print("_run_scraping_phase async verification passed.")
 
+    @patch("main._cleanup_directories")
+    @patch("main._run_llm_analysis_phase", new_callable=AsyncMock)
+    @patch("main._run_scraping_phase", new_callable=AsyncMock)
+    async def test_daemon_run_reuses_clients(
+        self,
+        mock_scrape: AsyncMock,
+        mock_analyse: AsyncMock,
+        mock_cleanup: MagicMock,
+    ) -> None:
+        """Daemon runs should pass the warm clients to each phase and flush the outbox."""
+        from data.models import SentimentRecord
+        record = SentimentRecord(
+            symbol="TSLA", sentiment_score=0.5, sentiment_confidence=0.8,
+            sentiment_label="BUY", key_rationale="test",
+        )
+        mock_analyse.return_value = ([record], ["stocks_1.json"])
+
+        daemon = PipelineDaemon(["stocks"])
+        daemon.reddit_client, daemon.data_handler, daemon.llm_client = MagicMock(), MagicMock(), MagicMock()
+        daemon.outbox = MagicMock()
+        daemon.outbox.__len__.return_value = 1
+        daemon.outbox.flush_async = AsyncMock()
+        daemon.db_client = MagicMock()
+
+        with patch("main.CONSOLIDATE_RECORDS", False), patch("main.SPIKE_DETECTION", False):
+            await daemon.run_once(["stocks"])
+            await daemon.run_once(["stocks"])
+
+        mock_scrape.assert_awaited_with(["stocks"], daemon.reddit_client, daemon.data_handler)
+        mock_analyse.assert_awaited_with(daemon.input_dir, daemon.llm_client)
+        self.assertEqual(daemon.outbox.enqueue.call_count, 2)
+        daemon.data_handler.mark_analysed.assert_called_with(["stocks_1.json"])
+        daemon.outbox.flush_async.assert_awaited_with(daemon.db_client.insert_analysis, ignore_backoff=False)
+
+    async def test_daemon_stop_drains_and_closes(self) -> None:
+        """A stop request should let the current run finish, then drain and close clients."""
+        daemon = PipelineDaemon(["stocks"])
+
+        async def start() -> None:
+            daemon.reddit_client = MagicMock(close=AsyncMock())
+            daemon.db_client = MagicMock(aclose=AsyncMock())
+            daemon.outbox = MagicMock()
+            daemon.outbox.__len__.return_value = 0
+
+        async def run_once(subreddits) -> None:
+            daemon.request_stop()  # e.g. SIGTERM arriving mid-run
+            await asyncio.sleep(0)
+
+        with patch.object(daemon, "start", side_effect=start), \
+             patch.object(daemon, "run_once", side_effect=run_once) as mock_run_once:
+            await asyncio.wait_for(daemon.run(), timeout=5)
+
+        mock_run_once.assert_awaited_once_with(["stocks"])
+        daemon.reddit_client.close.assert_awaited_once()
+        daemon.db_client.aclose.assert_awaited_once()
+        daemon.outbox.close.assert_called_once()
+
+    @patch("main._cleanup_directories")
+    @patch("main._run_llm_analysis_phase", new_callable=AsyncMock)
+    @patch("main._run_scraping_phase", new_callable=AsyncMock)
+    async def test_daemon_emits_alerts_off_the_event_loop(
+        self,
+        mock_scrape: AsyncMock,
+        mock_analyse: AsyncMock,
+        mock_cleanup: MagicMock,
+    ) -> None:
+        """Spike alerts (e.g. a blocking webhook POST) should not run on the loop's thread."""
+        from data.models import SentimentRecord
+        record = SentimentRecord(
+            symbol="TSLA", sentiment_score=0.5, sentiment_confidence=0.8,
+            sentiment_label="BUY", key_rationale="test",
+        )
+        mock_analyse.return_value = ([record], [])
+
+        loop_thread = threading.get_ident()
+        observed_on = []
+        daemon = PipelineDaemon(["stocks"])
+        daemon.reddit_client, daemon.data_handler, daemon.llm_client = MagicMock(), MagicMock(), MagicMock()
+        daemon.outbox = MagicMock()
+        daemon.outbox.__len__.return_value = 0
+        daemon.detector = MagicMock()
+        daemon.detector.observe_many.side_effect = lambda records: observed_on.append(threading.get_ident())
+
+        with patch("main.CONSOLIDATE_RECORDS", False), patch("main.SPIKE_DETECTION", True):
+            await daemon.run_once(["stocks"])
+
+        self.assertEqual(len(observed_on), 1)
+        self.assertNotEqual(observed_on[0], loop_thread)
+
 
 if __name__ == "__main__":
     asyncio.run(unittest.main())
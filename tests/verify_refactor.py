@@ -82,7 +82,7 @@ class TestRefactorAsync(unittest.IsolatedAsyncioTestCase):
             mock_response = MagicMock()
             mock_response.text = (
                 '```json\n'
-                '[{"symbol": "TEST", "sentiment_score": 0.8, '
+                '[{"symbol": "TSLA", "sentiment_score": 0.8, '
                 '"sentiment_confidence": 0.9, "sentiment_label": "positive", '
                 '"key_rationale": "good"}]\n'
                 '```'
@@ -95,7 +95,7 @@ class TestRefactorAsync(unittest.IsolatedAsyncioTestCase):
             self.assertEqual(client.system_prompt, "test prompt")
             self.assertIsNotNone(result)
             self.assertEqual(len(result), 1)
-            self.assertEqual(result[0].symbol, "TEST")
+            self.assertEqual(result[0].symbol, "TSLA")
             print("GeminiClient flow passed.")
 
     @patch("LLM.gemini_client.genai")
@@ -134,7 +134,7 @@ class TestRefactorAsync(unittest.IsolatedAsyncioTestCase):
             mock_choice = MagicMock()
             mock_choice.message.content = (
                 '```json\n'
-                '[{"symbol": "MISTRAL", "sentiment_score": -0.5, '
+                '[{"symbol": "NVDA", "sentiment_score": -0.5, '
                 '"sentiment_confidence": 0.8, "sentiment_label": "negative", '
                 '"key_rationale": "bad"}]\n'
                 '```'
@@ -146,7 +146,7 @@ class TestRefactorAsync(unittest.IsolatedAsyncioTestCase):
 
             self.assertIsNotNone(result)
             self.assertEqual(len(result), 1)
-            self.assertEqual(result[0].symbol, "MISTRAL")
+            self.assertEqual(result[0].symbol, "NVDA")
             print("MistralClient flow passed.")
 
     @patch("utils.rate_limiter.asyncio.to_thread")
@@ -0,0 +1,61 @@
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+from config import DAEMON_INTERVAL_MINUTES, DAEMON_SUBREDDIT_INTERVALS
+from utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class IntervalSchedule:
+    """Fixed-interval schedule for a set of named jobs (here: subreddits).
+
+    Every job is due immediately, then every ``intervals[name]`` seconds
+    (*default* for the others). Runs are anchored to their due time, so a
+    slow run does not shift the cadence; runs missed entirely (e.g. while
+    an earlier run overran) are skipped rather than replayed. Times are
+    ``time.monotonic()`` seconds.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        intervals: Optional[Dict[str, float]] = None,
+        default: float = DAEMON_INTERVAL_MINUTES * 60,
+        now: Optional[float] = None,
+    ) -> None:
+        intervals = intervals or {}
+        self.intervals = {name: float(intervals.get(name, default)) for name in names}
+        bad = [name for name, seconds in self.intervals.items() if seconds <= 0]
+        if bad:
+            raise ValueError(f"Schedule intervals must be positive: {bad}")
+        start = time.monotonic() if now is None else now
+        self.next_run = {name: start for name in names}
+
+    @classmethod
+    def from_config(cls, names: Sequence[str]) -> "IntervalSchedule":
+        """Schedule *names* with ``DAEMON_SUBREDDIT_INTERVALS`` (minutes) over ``DAEMON_INTERVAL_MINUTES``."""
+        intervals = {name: minutes * 60 for name, minutes in DAEMON_SUBREDDIT_INTERVALS.items()}
+        return cls(names, intervals)
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Jobs whose next run is at or before *now*, in schedule order."""
+        now = time.monotonic() if now is None else now
+        return [name for name, at in self.next_run.items() if at <= now]
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        return max(min(self.next_run.values(), default=math.inf) - now, 0.0)
+
+    def mark_run(self, names: Sequence[str], now: Optional[float] = None) -> None:
+        """Advance *names* to their first due time after *now*."""
+        now = time.monotonic() if now is None else now
+        for name in names:
+            interval = self.intervals[name]
+            at = self.next_run[name] + interval
+            if at <= now:
+                skipped = math.floor((now - at) / interval) + 1
+                log.warning(f"Schedule: {name} is {skipped} run(s) behind; skipping them.")
+                at += skipped * interval
+            self.next_run[name] = at